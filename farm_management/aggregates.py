@@ -0,0 +1,61 @@
+from datetime import date, datetime
+
+from django.db.models import Count, F, IntegerField, Subquery
+
+
+class SubqueryCount(Subquery):
+    """
+    COUNT(*) over a correlated subquery, usable as an annotation:
+
+        User.objects.annotate(
+            plots_count=SubqueryCount(Plot.objects.filter(farmer=OuterRef('pk')))
+        )
+
+    Unlike Count() over a join, several of these can be combined on one
+    queryset without multiplying rows.
+    """
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = IntegerField()
+
+    def __init__(self, queryset, **extra):
+        super().__init__(queryset.order_by().values('pk'), **extra)
+
+
+def grouped_counts(queryset, dimensions):
+    """
+    Distinct row counts grouped by one or more dimensions, in a single GROUP BY query.
+
+    Args:
+        queryset: Already scoped queryset to count
+        dimensions: Ordered mapping of output name -> field path
+            (e.g. 'irrigation_type__name') or expression (e.g. TruncMonth('created_at'))
+
+    Returns:
+        list: One dict per group with the dimension values and 'count',
+            largest groups first
+    """
+    annotations = {
+        f"_dim_{name}": value if hasattr(value, 'resolve_expression') else F(value)
+        for name, value in dimensions.items()
+    }
+    rows = (
+        queryset.order_by()
+        .annotate(**annotations)
+        .values(*annotations)
+        .annotate(count=Count('pk', distinct=True))
+        .order_by('-count', *annotations)
+    )
+    return [
+        {
+            **{name: _serialize_dimension(row[f"_dim_{name}"]) for name in dimensions},
+            'count': row['count'],
+        }
+        for row in rows
+    ]
+
+
+def _serialize_dimension(value):
+    """Dates from Trunc* dimensions as ISO strings, everything else unchanged"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
@@ -0,0 +1,98 @@
+import logging
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisCache
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+class FailSafeRedisCache(RedisCache):
+    """
+    RedisCache that treats an unreachable Redis as an empty cache.
+
+    Response caches, change versions, hierarchy snapshots, the auth user
+    cache and idempotency claims all sit on the default cache, so a Redis
+    outage must not fail the request: reads miss, writes are dropped and
+    incr() reports a missing key (ValueError), which every caller already
+    handles. Responses are then built from the database until Redis is back.
+    """
+
+    def get(self, key, default=None, version=None):
+        try:
+            return super().get(key, default, version)
+        except RedisError as e:
+            self._failed('get', e)
+            return default
+
+    def get_many(self, keys, version=None):
+        try:
+            return super().get_many(keys, version)
+        except RedisError as e:
+            self._failed('get_many', e)
+            return {}
+
+    def has_key(self, key, version=None):
+        try:
+            return super().has_key(key, version)
+        except RedisError as e:
+            self._failed('has_key', e)
+            return False
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        try:
+            return super().add(key, value, timeout, version)
+        except RedisError as e:
+            self._failed('add', e)
+            return False
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        try:
+            super().set(key, value, timeout, version)
+        except RedisError as e:
+            self._failed('set', e)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        try:
+            return super().set_many(data, timeout, version)
+        except RedisError as e:
+            self._failed('set_many', e)
+            return list(data)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        try:
+            return super().touch(key, timeout, version)
+        except RedisError as e:
+            self._failed('touch', e)
+            return False
+
+    def delete(self, key, version=None):
+        try:
+            return super().delete(key, version)
+        except RedisError as e:
+            self._failed('delete', e)
+            return False
+
+    def delete_many(self, keys, version=None):
+        try:
+            super().delete_many(keys, version)
+        except RedisError as e:
+            self._failed('delete_many', e)
+
+    def incr(self, key, delta=1, version=None):
+        try:
+            return super().incr(key, delta, version)
+        except RedisError as e:
+            self._failed('incr', e)
+            raise ValueError(f"Key '{key}' not found")
+
+    def clear(self):
+        try:
+            return super().clear()
+        except RedisError as e:
+            self._failed('clear', e)
+            return False
+
+    @staticmethod
+    def _failed(operation, error):
+        logger.warning(f"Cache {operation} failed, treated as a miss: {str(error)}")
@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyKeyInProgress(Exception):
+    """The first request with this key is still running after the wait timeout"""
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a request with a different body"""
+
+
+class IdempotencyService:
+    """
+    Stores the first successful response per Idempotency-Key so retries replay it.
+
+    A request claims its key with an atomic cache add before the handler
+    runs. A retry arriving while the first request is still running waits
+    for it (polling the cache) and then replays its response instead of
+    running the handler again. Only 2xx responses are stored: on errors
+    the key is released and the next retry runs normally. A claim left by
+    a crashed process expires after LOCK_TIMEOUT.
+    """
+
+    KEY_PREFIX = 'idempotency'
+    IN_PROGRESS = 'in_progress'
+    COMPLETED = 'completed'
+    # Longest a first request may hold its key without finishing
+    LOCK_TIMEOUT = 300
+    POLL_INTERVAL = 0.2
+
+    @staticmethod
+    def make_key(scope, idempotency_key: str) -> str:
+        """
+        Cache key for a client key within a scope.
+
+        Args:
+            scope: What the key is unique within (user, endpoint, URL kwargs)
+            idempotency_key: The Idempotency-Key header
+
+        Returns:
+            str: Cache key
+        """
+        digest = hashlib.sha256(f"{scope!r}:{idempotency_key}".encode()).hexdigest()
+        return f"{IdempotencyService.KEY_PREFIX}:{digest}"
+
+    @staticmethod
+    def acquire(key: str, fingerprint: str, wait_timeout: Optional[float] = None) -> Optional[dict]:
+        """
+        Claim a key, or wait for the request that holds it.
+
+        Args:
+            key: Cache key from make_key
+            fingerprint: Hash of the request body
+            wait_timeout: Seconds to wait for an in-flight first request (IDEMPOTENCY_WAIT_TIMEOUT)
+
+        Returns:
+            dict: The stored response ({'status', 'data'}) to replay, or None if this request now holds the key
+
+        Raises:
+            IdempotencyKeyReused: The key belongs to a request with a different body
+            IdempotencyKeyInProgress: The first request did not finish within wait_timeout
+        """
+        if wait_timeout is None:
+            wait_timeout = getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 30)
+        deadline = time.monotonic() + wait_timeout
+        claim = {'state': IdempotencyService.IN_PROGRESS, 'fingerprint': fingerprint}
+
+        vanished = False
+        while True:
+            if cache.add(key, claim, IdempotencyService.LOCK_TIMEOUT):
+                return None
+            record = cache.get(key)
+            if record is None:
+                if vanished:
+                    # Neither claimed nor readable twice running: the cache is unavailable
+                    logger.warning(f"Idempotency key {key} could not be claimed; running without it")
+                    return None
+                # Released (first request failed) or expired in between: try to claim it
+                vanished = True
+                continue
+            vanished = False
+            if record['fingerprint'] != fingerprint:
+                raise IdempotencyKeyReused()
+            if record['state'] == IdempotencyService.COMPLETED:
+                return record
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgress()
+            time.sleep(IdempotencyService.POLL_INTERVAL)
+
+    @staticmethod
+    def complete(key: str, fingerprint: str, status: int, data) -> None:
+        """Store the response of the request holding the key, for IDEMPOTENCY_KEY_TTL"""
+        cache.set(
+            key,
+            {'state': IdempotencyService.COMPLETED, 'fingerprint': fingerprint, 'status': status, 'data': data},
+            getattr(settings, 'IDEMPOTENCY_KEY_TTL', 60 * 60 * 24),
+        )
+
+    @staticmethod
+    def release(key: str) -> None:
+        """Give up a claimed key so the next retry runs the request"""
+        cache.delete(key)
@@ -0,0 +1,367 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import RequestDataTooBig
+from django.http.request import RawPostDataException
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .aggregates import grouped_counts
+from .idempotency import IdempotencyKeyInProgress, IdempotencyKeyReused, IdempotencyService
+from .response_cache import ResponseCacheService
+from .versions import ModelVersionService
+
+
+class GroupedStatsMixin:
+    """
+    Adds a ``stats`` action to a viewset: counts over the user's scoped
+    queryset grouped by up to MAX_STATS_DIMENSIONS dimensions, e.g.
+
+        GET /api/farms/irrigations/stats/?group_by=irrigation_type,month
+
+    Viewsets declare the dimensions they support in ``stats_dimensions``
+    (output name -> field path or expression). Each request runs one
+    GROUP BY query; results are cached per user and query string for
+    ``stats_cache_timeout`` seconds, and keyed by the change versions of
+    the viewset's ``version_models`` so a write is never hidden by the cache.
+    """
+
+    stats_dimensions = {}
+    stats_cache_timeout = 60
+    MAX_STATS_DIMENSIONS = 3
+
+    @action(detail=False, methods=['get'], url_path='stats')
+    def stats(self, request):
+        """Counts grouped by ?group_by=<dimension>[,<dimension>...]"""
+        group_by = [name.strip() for name in request.query_params.get('group_by', '').split(',') if name.strip()]
+        if not group_by:
+            return Response({
+                'error': 'group_by is required',
+                'available_dimensions': list(self.stats_dimensions)
+            }, status=400)
+        unknown = [name for name in group_by if name not in self.stats_dimensions]
+        if unknown:
+            return Response({
+                'error': f"Unknown dimension(s): {', '.join(unknown)}",
+                'available_dimensions': list(self.stats_dimensions)
+            }, status=400)
+        if len(group_by) > self.MAX_STATS_DIMENSIONS:
+            return Response({
+                'error': f"At most {self.MAX_STATS_DIMENSIONS} dimensions can be combined"
+            }, status=400)
+
+        groups = self.get_grouped_stats(group_by)
+        return Response({
+            'group_by': group_by,
+            'total': sum(group['count'] for group in groups),
+            'groups': groups
+        })
+
+    def get_grouped_stats(self, group_by, queryset=None):
+        """
+        Cached grouped counts over the viewset's scoped and filtered queryset.
+
+        Args:
+            group_by: Dimension names from stats_dimensions
+            queryset: Queryset to count instead of the filtered get_queryset()
+
+        Returns:
+            list: Groups as returned by grouped_counts
+        """
+        key = self._get_stats_cache_key(group_by)
+        groups = cache.get(key)
+        if groups is None:
+            if queryset is None:
+                # The query string is part of the cache key, so its filters must apply
+                queryset = self.filter_queryset(self.get_queryset())
+            groups = grouped_counts(queryset, {name: self.stats_dimensions[name] for name in group_by})
+            cache.set(key, groups, self.stats_cache_timeout)
+        return groups
+
+    def _get_stats_cache_key(self, group_by):
+        """Stats depend on the user's scope, the filters in the query string, the dimensions and the data"""
+        params = sorted(
+            (key, value) for key, values in self.request.query_params.lists()
+            for value in values if key != 'group_by'
+        )
+        versions, _ = ModelVersionService.get_versions(getattr(self, 'version_models', ()))
+        digest = hashlib.md5(repr((group_by, params, sorted(versions.items()))).encode()).hexdigest()
+        return f"stats:{self.__class__.__name__}:{self.request.user.pk}:{digest}"
+
+
+class RoleScopedQuerysetMixin:
+    """
+    Declarative per-role queryset scoping for viewsets.
+
+    ``role_scopes`` maps a role name to a function (queryset, user) ->
+    queryset; a '*' entry applies to every other role. Superusers and
+    ``unscoped_roles`` see the queryset unchanged. The user's role is read
+    once from the already-loaded request.user, so scoping adds no queries.
+    """
+
+    role_scopes = {}
+    unscoped_roles = ()
+
+    def scope_queryset(self, queryset, role_scopes=None):
+        """
+        Restrict a queryset to what the requesting user's role may see.
+
+        Args:
+            queryset: Queryset to restrict
+            role_scopes: Scopes to apply instead of ``role_scopes`` (for another model's queryset)
+        """
+        user = self.request.user
+        if self.is_unscoped_user(user):
+            return queryset
+        if role_scopes is None:
+            role_scopes = self.role_scopes
+        scope = role_scopes.get(user.role_name, role_scopes.get('*'))
+        return scope(queryset, user) if scope else queryset
+
+    def is_unscoped_user(self, user):
+        """Whether the user sees every row, so their list/detail responses match their role peers'"""
+        return user.is_superuser or user.has_any_role(self.unscoped_roles)
+
+
+class _NotModified(Exception):
+    """Raised from initial() to answer a conditional GET before the handler runs"""
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified conditional GETs for viewsets.
+
+    ``version_models`` lists the model labels a viewset's responses are
+    built from. The ETag hashes their change versions (ModelVersionService)
+    with the requesting user, their role, the action, URL kwargs and query
+    params. A matching If-None-Match (or, without one, an If-Modified-Since
+    at or after the last change) is answered with 304 after authentication
+    and permission checks, before the handler and its queries run.
+    """
+
+    version_models = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._conditional_validators = None
+        if request.method in ('GET', 'HEAD') and self.version_models:
+            self._conditional_validators = self.get_conditional_validators(request)
+            if self._is_not_modified(request, *self._conditional_validators):
+                raise _NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _NotModified):
+            return Response(status=304)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, '_conditional_validators', None)
+        # Actions that set their own validators (e.g. public endpoints) keep them
+        if validators and response.status_code in (200, 304) and not response.has_header('ETag'):
+            etag, last_modified = validators
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            # Responses are per user: shared caches must not store them, clients revalidate
+            response['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def get_conditional_validators(self, request):
+        """
+        Compute the ETag and Last-Modified for the current request.
+
+        Returns:
+            tuple: (quoted ETag, unix time of the last change)
+        """
+        versions, last_modified = ModelVersionService.get_versions(self.version_models)
+        params = sorted(
+            (key, value) for key, values in request.query_params.lists() for value in values
+        )
+        fingerprint = (
+            self.__class__.__name__,
+            self.action,
+            sorted((key, str(value)) for key, value in self.kwargs.items()),
+            self.get_response_scope(request),
+            params,
+            getattr(request.accepted_renderer, 'format', None),
+            sorted(versions.items()),
+        )
+        return quote_etag(hashlib.md5(repr(fingerprint).encode()).hexdigest()), last_modified
+
+    def get_response_scope(self, request):
+        """Who the response is built for: by default the individual user and their role"""
+        user = request.user
+        return ('user', user.pk, getattr(user, 'role_name', None))
+
+    @staticmethod
+    def _is_not_modified(request, etag, last_modified):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags or f'W/{etag}' in tags
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+        return bool(if_modified_since and int(last_modified) <= if_modified_since)
+
+
+class _CachedResponse(Exception):
+    """Raised from initial() to serve a cached body before the handler runs"""
+
+    def __init__(self, data):
+        super().__init__()
+        self.data = data
+
+
+class ResponseCacheMixin(ConditionalGetMixin):
+    """
+    Serves repeated GETs of ``response_cache_actions`` from ResponseCacheService.
+
+    The entry key is the conditional-GET ETag, so it is scoped to the
+    requester and tagged with the versions of ``version_models``: any save
+    or delete of those models invalidates the dependent entries. Viewsets
+    whose output is the same for everyone set ``response_cache_shared``;
+    users who see every row (superusers and ``unscoped_roles``) share
+    list/detail entries with their role, except for requests carrying one
+    of ``user_scoped_params`` (filters on the requester, e.g. ?my_farms=true).
+    Responses carry X-Cache: HIT/MISS.
+    """
+
+    response_cache_actions = ('list', 'retrieve')
+    response_cache_shared = False
+    response_cache_timeout = None
+    user_scoped_params = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        ResponseCacheService.register(cls.__name__)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._response_cache_key = None
+        if getattr(self, '_conditional_validators', None) and self.action in self.response_cache_actions:
+            etag = self._conditional_validators[0]
+            key = hashlib.md5(f"{etag}:{request.get_host()}".encode()).hexdigest()
+            data = ResponseCacheService.get(self.__class__.__name__, key)
+            if data is not None:
+                raise _CachedResponse(data)
+            self._response_cache_key = key
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _CachedResponse):
+            response = Response(exc.data)
+            response['X-Cache'] = 'HIT'
+            return response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, '_response_cache_key', None)
+        if key and response.status_code == 200 and not response.has_header('X-Cache'):
+            ResponseCacheService.set(self.__class__.__name__, key, response.data, self.response_cache_timeout)
+            response['X-Cache'] = 'MISS'
+        return response
+
+    def get_response_scope(self, request):
+        user = request.user
+        if self.response_cache_shared:
+            return ('shared',)
+        if (
+            self.action in ('list', 'retrieve')
+            and hasattr(self, 'is_unscoped_user')
+            and user.is_authenticated
+            and self.is_unscoped_user(user)
+            and not any(param in request.query_params for param in self.user_scoped_params)
+        ):
+            return ('role', user.role_name, user.is_superuser)
+        return super().get_response_scope(request)
+
+
+class _ReplayedResponse(Exception):
+    """Raised from initial() to replay a stored response before the handler runs"""
+
+    def __init__(self, record):
+        super().__init__()
+        self.record = record
+
+
+class IdempotentPostMixin:
+    """
+    Idempotency-Key support for the POST actions in ``idempotent_actions``.
+
+    The first successful response per key, user and endpoint is stored
+    (IdempotencyService) and replayed to retries with Idempotent-Replayed:
+    true; a retry arriving while the first request still runs waits for
+    it instead of running again. Reusing a key with a different body is
+    answered with 422, a first request still running after the wait with
+    409. Requests without the header are not affected.
+    """
+
+    idempotent_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._idempotency_key = None
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if request.method != 'POST' or not idempotency_key or self.action not in self.idempotent_actions:
+            return
+        if len(idempotency_key) > 255:
+            raise ValidationError({'Idempotency-Key': 'Must be at most 255 characters'})
+
+        scope = (
+            self.__class__.__name__,
+            self.action,
+            sorted((key, str(value)) for key, value in self.kwargs.items()),
+            request.user.pk,
+        )
+        key = IdempotencyService.make_key(scope, idempotency_key)
+        fingerprint = self._request_fingerprint(request)
+        record = IdempotencyService.acquire(key, fingerprint)
+        if record is not None:
+            raise _ReplayedResponse(record)
+        self._idempotency_key, self._idempotency_fingerprint = key, fingerprint
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _ReplayedResponse):
+            response = Response(exc.record['data'], status=exc.record['status'])
+            response['Idempotent-Replayed'] = 'true'
+            return response
+        if isinstance(exc, IdempotencyKeyReused):
+            return Response(
+                {'error': 'Idempotency-Key was already used with a different request body'}, status=422
+            )
+        if isinstance(exc, IdempotencyKeyInProgress):
+            return Response(
+                {'error': 'A request with this Idempotency-Key is still being processed; retry later'}, status=409
+            )
+        # The handler failed: let the next retry run it again
+        self._release_idempotency_key()
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, '_idempotency_key', None)
+        if key:
+            if 200 <= response.status_code < 300:
+                IdempotencyService.complete(key, self._idempotency_fingerprint, response.status_code, response.data)
+                self._idempotency_key = None
+            else:
+                self._release_idempotency_key()
+        return response
+
+    def _release_idempotency_key(self):
+        key = getattr(self, '_idempotency_key', None)
+        if key:
+            IdempotencyService.release(key)
+            self._idempotency_key = None
+
+    @staticmethod
+    def _request_fingerprint(request):
+        try:
+            body = request.body
+        except (RawPostDataException, RequestDataTooBig):
+            # Large uploads are not read into memory just to fingerprint them
+            body = f"{request.content_type}:{request.META.get('CONTENT_LENGTH')}".encode()
+        return hashlib.sha256(body).hexdigest()
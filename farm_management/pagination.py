@@ -0,0 +1,230 @@
+import json
+from base64 import b64decode, b64encode
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import BooleanField, F, Func, Q, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class StandardPagination(PageNumberPagination):
+    """
+    Page-number pagination with a client-selectable page size
+    (?page=2&page_size=100), capped at max_page_size.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_page_metadata(self):
+        """Pagination block for custom action responses that keep their own envelope"""
+        return {
+            'count': self.page.paginator.count,
+            'page': self.page.number,
+            'num_pages': self.page.paginator.num_pages,
+            'page_size': self.page.paginator.per_page,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+
+
+class StandardCursorPagination(CursorPagination):
+    """
+    Cursor pagination (?cursor=...&page_size=100) for large, frequently
+    appended lists: pages stay stable while rows are inserted and the
+    database never has to skip over an OFFSET.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = '-date_joined'
+
+    def get_page_metadata(self):
+        """Pagination block for custom action responses that keep their own envelope"""
+        return {
+            'page_size': self.page_size,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+
+
+class _RowComparison(Func):
+    """(a, b, ...) < (x, y, ...) as a filter condition (> with operator='>')"""
+    output_field = BooleanField()
+
+    def __init__(self, expressions, values, operator):
+        self.operator = operator
+        super().__init__(*expressions, *values)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sqls, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            sqls.append(sql)
+            params.extend(expression_params)
+        count = len(sqls) // 2
+        return f"({', '.join(sqls[:count])}) {self.operator} ({', '.join(sqls[count:])})", params
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over a unique ordering such as ('-created_at', '-id').
+
+    The cursor carries the ordering values of the last row served, and the
+    next page is fetched with a row comparison against them
+    (WHERE (created_at, id) < (...) ORDER BY created_at DESC, id DESC
+    LIMIT n), so every page costs the same index range scan however deep
+    the client scrolls, and no COUNT(*) is run.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+
+    def __init__(self, ordering=None):
+        if ordering:
+            self.ordering = tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        queryset = queryset.order_by(*self.ordering)
+        if encoded := request.query_params.get(self.cursor_query_param):
+            queryset = queryset.filter(self._after_cursor(queryset.model, self._decode_cursor(encoded)))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [
+            getattr(last, field.lstrip('-')) for field in self.ordering
+        ]
+        return replace_query_param(self.base_url, self.cursor_query_param, self._encode_cursor(values))
+
+    def get_page_metadata(self):
+        """Pagination block for custom action responses that keep their own envelope"""
+        return {
+            'page_size': self.page_size,
+            'next': self.get_next_link(),
+            'previous': None,
+        }
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'page_size': self.page_size,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'page_size': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    def _after_cursor(self, model, raw_values):
+        """
+        Rows strictly after the cursor in ordering order.
+
+        When every field is sorted the same way this is one row comparison,
+        (a, b) < (x, y) for descending (> for ascending), which the database
+        answers with a single range scan of the matching composite index.
+        Mixed directions fall back to (a > x) OR (a = x AND b < y) OR ...
+        """
+        if len(raw_values) != len(self.ordering):
+            raise NotFound('Invalid cursor')
+        fields, values = [], []
+        for field_name, raw in zip(self.ordering, raw_values):
+            try:
+                field = model._meta.get_field(field_name.lstrip('-'))
+                values.append(field.to_python(raw))
+            except (FieldDoesNotExist, DjangoValidationError):
+                raise NotFound('Invalid cursor')
+            fields.append(field)
+
+        descending = {field_name.startswith('-') for field_name in self.ordering}
+        if len(descending) == 1:
+            return _RowComparison(
+                [F(field_name.lstrip('-')) for field_name in self.ordering],
+                [Value(value, output_field=field) for value, field in zip(values, fields)],
+                '<' if descending.pop() else '>',
+            )
+
+        condition = Q()
+        for position, field_name in enumerate(self.ordering):
+            name = field_name.lstrip('-')
+            lookup = 'lt' if field_name.startswith('-') else 'gt'
+            step = Q(**{f"{name}__{lookup}": values[position]})
+            for earlier_name, earlier_value in zip(self.ordering[:position], values):
+                step &= Q(**{earlier_name.lstrip('-'): earlier_value})
+            condition |= step
+        return condition
+
+    @staticmethod
+    def _encode_cursor(values):
+        payload = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values], default=str)
+        return b64encode(payload.encode()).decode()
+
+    def _decode_cursor(self, encoded):
+        try:
+            values = json.loads(b64decode(encoded.encode()).decode())
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound('Invalid cursor')
+        if not isinstance(values, list):
+            raise NotFound('Invalid cursor')
+        return values
+
+
+class DefaultPageNumberPagination(PageNumberPagination):
+    """The project-wide PAGE_SIZE, with a client-selectable page size"""
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class SelectablePagination(BasePagination):
+    """
+    Page numbers by default (?page=3&page_size=50); keyset pagination when
+    the client asks for it with ?pagination=keyset or sends a ?cursor=.
+
+    Viewsets choose the keyset ordering with a ``keyset_ordering``
+    attribute; it must end in a unique field (normally '-id') and should be
+    backed by a matching composite index.
+    """
+    mode_query_param = 'pagination'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            request.query_params.get(self.mode_query_param) == 'keyset'
+            or KeysetPagination.cursor_query_param in request.query_params
+        ):
+            self.delegate = KeysetPagination(ordering=getattr(view, 'keyset_ordering', None))
+        else:
+            self.delegate = DefaultPageNumberPagination()
+        return self.delegate.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return DefaultPageNumberPagination().get_paginated_response_schema(schema)
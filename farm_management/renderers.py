@@ -0,0 +1,83 @@
+import json
+import logging
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _is_geometry(obj):
+    # Duck-typed so rendering never needs GEOS/GDAL to be importable
+    return hasattr(obj, 'geojson') and hasattr(obj, 'geom_type')
+
+
+class FastJSONEncoder(JSONEncoder):
+    """DRF's encoder plus GEOS geometries (as GeoJSON)"""
+
+    def default(self, obj):
+        if _is_geometry(obj):
+            return json.loads(obj.geojson)
+        return super().default(obj)
+
+
+# orjson hands datetimes and non-native types to this, so they are encoded
+# exactly as DRF's encoder would (e.g. UTC datetimes ending in 'Z')
+_default = FastJSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson, falling back to DRF's stdlib renderer.
+
+    Output matches JSONRenderer: dates, times, Decimals and other
+    non-native values go through DRF's encoder, UUIDs are strings and GEOS
+    geometries become GeoJSON.
+    Requests asking for indented output (the browsable API, or an
+    ``indent`` media type parameter) take the stdlib path.
+
+    Enabled for every view through REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'],
+    or per viewset with ``renderer_classes``.
+    """
+
+    encoder_class = FastJSONEncoder
+    options = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson.dumps(data, default=_default, option=self.options)
+        except TypeError as e:
+            # e.g. integers beyond 64 bits; the stdlib encoder handles those
+            logger.debug(f"orjson could not render response, using stdlib json: {str(e)}")
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONParser(JSONParser):
+    """JSON request parser backed by orjson, falling back to DRF's stdlib parser"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as e:
+            raise ParseError(f"JSON parse error - {str(e)}")
+
+
+def is_fast_json_available():
+    """Whether orjson is installed, so FastJSONRenderer is not on its fallback path"""
+    return orjson is not None
@@ -0,0 +1,123 @@
+import logging
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCacheService:
+    """
+    Storage and hit/miss metrics for cached API response bodies.
+
+    Entries are keyed by the ETag ConditionalGetMixin computes, which
+    already folds in the change versions of the view's models (its tags),
+    the requesting scope and the query params. Saving or deleting a
+    tagged model therefore moves every dependent key on at once; the
+    orphaned entries simply expire.
+
+    Uses the RESPONSE_CACHE_ALIAS cache (Redis, or the database cache
+    table when REDIS_URL is not set).
+    """
+
+    KEY_PREFIX = 'response_cache'
+    METRICS_TIMEOUT = 7 * 24 * 60 * 60
+
+    # Names of views using the cache, for reporting metrics
+    _registered_views = set()
+
+    @staticmethod
+    def register(view_name: str) -> None:
+        """Make a view's hits and misses part of the reported metrics"""
+        ResponseCacheService._registered_views.add(view_name)
+
+    @staticmethod
+    def get(view_name: str, key: str) -> Optional[Any]:
+        """
+        Get a cached response body and record the hit or miss.
+
+        Args:
+            view_name: Name the metrics are recorded under
+            key: Entry key
+
+        Returns:
+            The cached body, or None on a miss
+        """
+        data = ResponseCacheService._cache().get(ResponseCacheService._entry_key(view_name, key))
+        ResponseCacheService._record(view_name, 'hits' if data is not None else 'misses')
+        return data
+
+    @staticmethod
+    def set(view_name: str, key: str, data: Any, timeout: Optional[int] = None) -> None:
+        """
+        Store a response body.
+
+        Args:
+            view_name: Name of the view the body belongs to
+            key: Entry key
+            data: Serializable response body
+            timeout: Seconds to keep it (RESPONSE_CACHE_TIMEOUT by default)
+        """
+        if timeout is None:
+            timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+        ResponseCacheService._cache().set(ResponseCacheService._entry_key(view_name, key), data, timeout)
+
+    @staticmethod
+    def get_metrics() -> dict:
+        """
+        Hit and miss counts per view and in total.
+
+        Returns:
+            dict: {'views': {name: {hits, misses, hit_ratio}}, 'total': {...}}
+        """
+        names = sorted(ResponseCacheService._registered_views)
+        counters = ResponseCacheService._cache().get_many([
+            ResponseCacheService._metric_key(name, kind) for name in names for kind in ('hits', 'misses')
+        ])
+
+        def summarize(hits, misses):
+            lookups = hits + misses
+            return {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / lookups, 4) if lookups else None}
+
+        views = {
+            name: summarize(
+                counters.get(ResponseCacheService._metric_key(name, 'hits'), 0),
+                counters.get(ResponseCacheService._metric_key(name, 'misses'), 0),
+            )
+            for name in names
+        }
+        return {
+            'views': views,
+            'total': summarize(sum(v['hits'] for v in views.values()), sum(v['misses'] for v in views.values())),
+        }
+
+    @staticmethod
+    def reset_metrics() -> None:
+        """Zero the hit and miss counters of every registered view"""
+        ResponseCacheService._cache().delete_many([
+            ResponseCacheService._metric_key(name, kind)
+            for name in ResponseCacheService._registered_views for kind in ('hits', 'misses')
+        ])
+
+    @staticmethod
+    def _record(view_name: str, kind: str) -> None:
+        cache = ResponseCacheService._cache()
+        key = ResponseCacheService._metric_key(view_name, kind)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, ResponseCacheService.METRICS_TIMEOUT):
+                cache.incr(key)
+
+    @staticmethod
+    def _cache():
+        return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+    @staticmethod
+    def _entry_key(view_name: str, key: str) -> str:
+        return f"{ResponseCacheService.KEY_PREFIX}:{view_name}:{key}"
+
+    @staticmethod
+    def _metric_key(view_name: str, kind: str) -> str:
+        return f"{ResponseCacheService.KEY_PREFIX}:metrics:{view_name}:{kind}"
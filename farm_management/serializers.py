@@ -0,0 +1,181 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+class CompactRelatedField(serializers.Field):
+    """Read-only {"id", "label"} representation of a related object"""
+
+    def __init__(self, label_attr, **kwargs):
+        self.label_attr = label_attr
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        label = getattr(value, self.label_attr, None)
+        return {'id': value.pk, 'label': str(label) if label is not None else str(value)}
+
+
+class SparseFieldsetMixin:
+    """
+    Client-selected fields and expansions for read requests.
+
+    ``?fields=id,farm_uid,plot`` limits the output to the listed fields.
+    ``?expand=plot`` renders only the listed relations in full; the other
+    relations in ``Meta.expandable_fields`` collapse to {"id", "label"}.
+    Without ``?expand`` every relation is rendered in full, as before.
+
+    ``Meta.expandable_fields`` maps a field name to its label attribute and
+    any select_related/prefetch_related paths a full rendering needs beyond
+    what the nested serializer declares itself::
+
+        expandable_fields = {
+            'created_by': {'label': 'username', 'select_related': ['created_by__role']},
+        }
+
+    Views pass their queryset through ``setup_eager_loading`` so only the
+    relations that will actually be rendered are joined. The relations of a
+    nested serializer are composed in under the field's path: a nested
+    SparseFieldsetMixin serializer contributes its own full eager loading,
+    a plain nested serializer the joins of its own nested serializers.
+    """
+
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or not self._is_top_level():
+            return
+
+        fields, expand = self.get_requested_fields(request)
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields:
+                    self.fields.pop(name)
+        if expand is not None:
+            for name, spec in self._get_expandable_fields().items():
+                if name in self.fields and name not in expand:
+                    source = self.fields[name].source
+                    self.fields[name] = CompactRelatedField(
+                        label_attr=spec.get('label', 'pk'),
+                        **({'source': source} if source != name else {})
+                    )
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        """
+        Parse ?fields= and ?expand=.
+
+        Returns:
+            tuple: (set of field names or None, set of expansions or None);
+                None means the parameter was not sent
+        """
+        def parse(param):
+            if param not in request.query_params:
+                return None
+            return {name.strip() for name in request.query_params[param].split(',') if name.strip()}
+
+        return parse(cls.fields_query_param), parse(cls.expand_query_param)
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, request):
+        """
+        Join only the relations this request will render.
+
+        Args:
+            queryset: Queryset the view is about to serialize
+            request: Current request
+
+        Returns:
+            QuerySet: queryset with matching select_related/prefetch_related
+        """
+        if request.method not in SAFE_METHODS:
+            return queryset
+        fields, expand = cls.get_requested_fields(request)
+        select_related, prefetch_related = [], []
+        for name, spec in cls._get_expandable_fields().items():
+            if fields is not None and name not in fields:
+                continue
+            if expand is None or name in expand:
+                field_select, field_prefetch = cls._get_full_eager_loading(name, spec)
+                select_related += field_select
+                prefetch_related += field_prefetch
+            else:
+                select_related.append(spec.get('source', name))
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    @classmethod
+    def get_eager_loading(cls, prefix):
+        """
+        Relations rendered when this serializer is nested with every field in full.
+
+        Args:
+            prefix: Path from the outer queryset's model to this serializer's instance
+
+        Returns:
+            tuple: (select_related paths, prefetch_related paths)
+        """
+        select_related, prefetch_related = [], []
+        for name, spec in cls._get_expandable_fields().items():
+            field_select, field_prefetch = cls._get_full_eager_loading(name, spec)
+            select_related += [f"{prefix}__{path}" for path in field_select]
+            prefetch_related += [f"{prefix}__{path}" for path in field_prefetch]
+        return select_related, prefetch_related
+
+    @classmethod
+    def _get_full_eager_loading(cls, name, spec):
+        """Paths for rendering one expandable field in full, including its nested serializer's"""
+        source = spec.get('source', name)
+        nested_select, nested_prefetch = _get_nested_eager_loading(cls._declared_fields.get(name), source)
+        return (
+            [source, *spec.get('select_related', []), *nested_select],
+            [*spec.get('prefetch_related', []), *nested_prefetch],
+        )
+
+    @classmethod
+    def _get_expandable_fields(cls):
+        return getattr(cls.Meta, 'expandable_fields', {})
+
+    def _is_top_level(self):
+        """Only the serializer a view created reads the query params, not nested ones"""
+        parent = getattr(self, 'parent', None)
+        if isinstance(parent, serializers.ListSerializer):
+            parent = getattr(parent, 'parent', None)
+        return parent is None
+
+
+def _get_nested_eager_loading(field, prefix):
+    """
+    Relations a nested serializer field reads from its own instance.
+
+    Args:
+        field: Declared field of the outer serializer
+        prefix: Path from the outer queryset's model to the field's instance
+
+    Returns:
+        tuple: (select_related paths, prefetch_related paths)
+    """
+    if isinstance(field, SparseFieldsetMixin):
+        return field.get_eager_loading(prefix)
+    select_related, prefetch_related = [], []
+    if isinstance(field, serializers.Serializer):
+        for name, nested in field._declared_fields.items():
+            # Only to-one nested serializers can be joined; many=True ones are ListSerializers
+            if isinstance(nested, serializers.Serializer) and not nested.write_only and nested.source != '*':
+                path = f"{prefix}__{nested.source or name}"
+                nested_select, nested_prefetch = _get_nested_eager_loading(nested, path)
+                select_related += [path, *nested_select]
+                prefetch_related += nested_prefetch
+    return select_related, prefetch_related
+
+
+def setup_eager_loading(serializer_class, queryset, request):
+    """Apply a serializer's setup_eager_loading when it supports sparse fieldsets"""
+    if hasattr(serializer_class, 'setup_eager_loading'):
+        return serializer_class.setup_eager_loading(queryset, request)
+    return queryset
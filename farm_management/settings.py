@@ -137,13 +137,28 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.RoleAwareJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # orjson-backed JSON (falls back to the stdlib when orjson is missing)
+    'DEFAULT_RENDERER_CLASSES': [
+        'farm_management.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'farm_management.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Per client IP for the unauthenticated OTP login actions
+    'DEFAULT_THROTTLE_RATES': {
+        'otp_send': os.environ.get('OTP_SEND_THROTTLE_RATE', '5/min'),
+        'otp_verify': os.environ.get('OTP_VERIFY_THROTTLE_RATE', '10/min'),
+    },
 }
 
 # JWT settings
@@ -159,6 +174,42 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Cache: Redis when REDIS_URL is set, otherwise a table shared by every worker
+# process (python manage.py createcachetable), as in settings_production. wsgi.py
+# and the Procfile/start.sh gunicorn workers run under this module too, and the
+# change versions, response cache, idempotency claims, auth user cache and OTP
+# rate limit only work when all workers see the same cache.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'farm_management.cache.FailSafeRedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'OPTIONS': {
+                'socket_connect_timeout': 1,
+                'socket_timeout': 1,
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        }
+    }
+
+# Cached API responses (farm_management.response_cache)
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '300'))
+
+# Seconds an authenticated user (with role) stays cached between requests; 0 disables
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', '60'))
+
+# Idempotency-Key on registration POSTs (farm_management.idempotency)
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', str(60 * 60 * 24)))
+IDEMPOTENCY_WAIT_TIMEOUT = 30
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -180,6 +231,7 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'idempotency-key',
 ]
 
 # Swagger settings
@@ -235,6 +287,27 @@ TWILIO_WHATSAPP_NUMBER = os.environ.get('TWILIO_WHATSAPP_NUMBER', '')
 # OTP Configuration
 WHATSAPP_OTP_ENABLED = os.environ.get('WHATSAPP_OTP_ENABLED', 'True').lower() == 'true'
 EMAIL_OTP_FALLBACK = os.environ.get('EMAIL_OTP_FALLBACK', 'True').lower() == 'true'
+# Farmers registered without a password log in with an OTP and set one on first login
+FARMER_OTP_ONLY_REGISTRATION = os.environ.get('FARMER_OTP_ONLY_REGISTRATION', 'False').lower() == 'true'
+OTP_VALIDITY_MINUTES = 10
+# Wrong codes after which an OTP is discarded and a new one must be requested
+OTP_MAX_FAILED_ATTEMPTS = 5
+
+# Background OTP delivery (users.otp_delivery); tests use users.otp_delivery.LocalTransport
+OTP_TRANSPORTS = {
+    'whatsapp': 'users.otp_delivery.TwilioWhatsAppTransport',
+    'email': 'users.otp_delivery.EmailTransport',
+}
+OTP_DELIVERY_BATCH_SIZE = 50
+OTP_DELIVERY_MAX_ATTEMPTS = 3
+OTP_DELIVERY_RETRY_DELAY = 2
+# Per recipient, protecting the WhatsApp/email provider quota
+OTP_RATE_LIMIT_COUNT = int(os.environ.get('OTP_RATE_LIMIT_COUNT', '3'))
+OTP_RATE_LIMIT_WINDOW = int(os.environ.get('OTP_RATE_LIMIT_WINDOW', '600'))
+
+# Batch user creation hashes passwords in a process pool (0 workers = one per core)
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', '0'))
+PASSWORD_HASHING_PARALLEL_MIN = 4
 import os
 import dj_database_url
 
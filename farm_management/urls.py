@@ -6,10 +6,21 @@ from django.http import JsonResponse
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
 
 def health_check(request):
     return JsonResponse({"status": "healthy", "service": "farm-management-api"})
 
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAdminUser])
+def response_cache_metrics(request):
+    """Response cache hit/miss counts per view; DELETE resets them"""
+    from .response_cache import ResponseCacheService
+    if request.method == 'DELETE':
+        ResponseCacheService.reset_metrics()
+    return Response(ResponseCacheService.get_metrics())
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Farm Management API",
@@ -28,6 +39,7 @@ urlpatterns = [
     
     # Health check endpoint
     path('api/health/', health_check, name='health-check'),
+    path('api/cache/metrics/', response_cache_metrics, name='response-cache-metrics'),
     
     # API endpoints
     path('api/', include('users.urls')),
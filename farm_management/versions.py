@@ -0,0 +1,86 @@
+import logging
+import time
+import uuid
+from typing import Dict, Iterable, Tuple
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class ModelVersionService:
+    """
+    Per-model change versions kept in the cache.
+
+    Every save or delete of a tracked model replaces its version with a
+    fresh random token (see the signal receivers in farms.signals and
+    users.signals), so a response built from a set of models is unchanged
+    for as long as their versions are. Views use this to answer
+    conditional GETs without querying. Versions are only ever compared for
+    equality; a new token rather than cache.incr() keeps concurrent bumps
+    distinct on backends whose incr is a get and a set (the database cache).
+
+    Changes made with queryset.update()/bulk_create() send no signals;
+    code doing those calls ``bump`` itself.
+    """
+
+    KEY_PREFIX = 'model_version'
+
+    @staticmethod
+    def bump(*labels: str) -> None:
+        """
+        Record a change to one or more models.
+
+        Args:
+            labels: Model labels, e.g. 'farms.Plot'
+        """
+        now = time.time()
+        values = {}
+        for label in labels:
+            values[ModelVersionService._version_key(label)] = ModelVersionService._new_version()
+            values[ModelVersionService._changed_key(label)] = now
+        cache.set_many(values, None)
+
+    @staticmethod
+    def get_versions(labels: Iterable[str]) -> Tuple[Dict[str, str], float]:
+        """
+        Current versions of a set of models and when the latest of them changed.
+
+        Args:
+            labels: Model labels, e.g. ['farms.Farm', 'users.User']
+
+        Returns:
+            tuple: ({label: version}, unix time of the most recent change)
+        """
+        labels = sorted(set(labels))
+        keys = [ModelVersionService._version_key(label) for label in labels]
+        changed_keys = [ModelVersionService._changed_key(label) for label in labels]
+        values = cache.get_many(keys + changed_keys)
+
+        now = time.time()
+        versions = {}
+        for label, key in zip(labels, keys):
+            version = values.get(key)
+            if version is None:
+                # Never bumped (or evicted): seed a new token; add() keeps a concurrent seed
+                seed = ModelVersionService._new_version()
+                cache.add(key, seed, None)
+                version = cache.get(key, seed)
+                cache.add(ModelVersionService._changed_key(label), now, None)
+            versions[label] = version
+
+        changed = [values[key] for key in changed_keys if key in values]
+        last_modified = max(changed) if len(changed) == len(labels) else now
+        return versions, last_modified
+
+    @staticmethod
+    def _new_version() -> str:
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def _version_key(label: str) -> str:
+        return f"{ModelVersionService.KEY_PREFIX}:{label.lower()}"
+
+    @staticmethod
+    def _changed_key(label: str) -> str:
+        return f"{ModelVersionService.KEY_PREFIX}:{label.lower()}:changed_at"
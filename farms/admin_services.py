@@ -109,10 +109,20 @@ class AdminSyncService:
         Returns:
             bool: True if sync successful, False otherwise
         """
-        try:
-            from .models import Plot
+        from .models import Plot
+        return self.sync_plots(Plot.objects.all())
+    
+    def sync_plots(self, plots) -> bool:
+        """
+        Sync a batch of plots to Admin.py service in a single request
+        
+        Args:
+            plots: Iterable of Plot model instances
             
-            plots = Plot.objects.all()
+        Returns:
+            bool: True if sync successful, False otherwise
+        """
+        try:
             plot_list = []
             
             for plot in plots:
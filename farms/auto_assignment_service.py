@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.utils import timezone
 from datetime import timedelta
 from typing import Optional
@@ -13,10 +14,21 @@ class AutoAssignmentService:
     created by field officers in the enrollment workflow.
     """
     
+    # Per-officer "last registered farmer": (farmer_id, date_joined timestamp), or NO_FARMER
+    LAST_FARMER_KEY = 'auto_assignment:last_farmer:{officer_id}'
+    LAST_FARMER_TIMEOUT = 60 * 60 * 24
+    NO_FARMER = (None, 0)
+
     @staticmethod
     def get_most_recent_farmer_by_field_officer(field_officer: User, within_minutes: int = 30) -> Optional[User]:
         """
         Get the most recently created farmer by a specific field officer.
+
+        The officer's last registered farmer is kept in the cache (updated
+        whenever a farmer is created), so a lookup costs at most one
+        primary-key query; on a cache miss, or if the cached farmer was
+        deleted or moved, it is found again with the
+        (created_by, role, date_joined) index.
         
         Args:
             field_officer: The field officer user
@@ -26,31 +38,71 @@ class AutoAssignmentService:
             User: Most recent farmer or None if not found
         """
         try:
-            # Calculate the time threshold
             time_threshold = timezone.now() - timedelta(minutes=within_minutes)
-            
-            # Find the most recent farmer created by this field officer
-            recent_farmer = User.objects.filter(
-                # Farmer role
-                role__name='farmer',
-                # Created by this field officer (assuming there's a created_by field)
-                # If there's no created_by field, we'll use a different approach
-                date_joined__gte=time_threshold
-            ).order_by('-date_joined').first()
-            
-            # If no direct created_by relationship, find farmers created around the same time
-            # This is a fallback approach - we look for farmers created recently
-            if not recent_farmer:
-                recent_farmer = User.objects.filter(
-                    role__name='farmer',
-                    date_joined__gte=time_threshold
-                ).order_by('-date_joined').first()
-            
-            return recent_farmer
+
+            # Second pass only if the cached farmer was deleted, moved or changed role
+            for _ in range(2):
+                farmer_id, joined_at = AutoAssignmentService._last_farmer(field_officer.pk)
+                if farmer_id is None or joined_at < time_threshold.timestamp():
+                    return None
+                recent_farmer = AutoAssignmentService._farmers_of(field_officer).filter(pk=farmer_id).first()
+                if recent_farmer is not None:
+                    return recent_farmer
+                AutoAssignmentService.forget_last_farmer(field_officer.pk)
+            return None
             
         except Exception as e:
             logger.error(f"Error getting recent farmer for field officer {field_officer.id}: {str(e)}")
             return None
+
+    @staticmethod
+    def farmer_registered(farmer: User) -> None:
+        """
+        Record a new farmer as their field officer's last registered farmer.
+
+        Args:
+            farmer: The newly created farmer
+        """
+        if not farmer.created_by_id:
+            return
+        key = AutoAssignmentService._last_farmer_key(farmer.created_by_id)
+        joined_at = farmer.date_joined.timestamp()
+        # Officers enrolling concurrently use separate keys; for one officer keep the newest
+        cached = cache.get(key)
+        if cached is None or cached[0] is None or cached[1] <= joined_at:
+            cache.set(key, (farmer.pk, joined_at), AutoAssignmentService.LAST_FARMER_TIMEOUT)
+
+    @staticmethod
+    def forget_last_farmer(officer_id: Optional[int]) -> None:
+        """Drop an officer's cached last farmer (looked up again on next use)"""
+        if officer_id:
+            cache.delete(AutoAssignmentService._last_farmer_key(officer_id))
+
+    @staticmethod
+    def _last_farmer(officer_id: int):
+        """(farmer_id, date_joined timestamp) of the officer's newest farmer, from the cache or the index"""
+        key = AutoAssignmentService._last_farmer_key(officer_id)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        latest = (
+            User.objects.filter(created_by_id=officer_id, role__name='farmer')
+            .order_by('-date_joined', '-id')
+            .values_list('pk', 'date_joined')
+            .first()
+        )
+        cached = (latest[0], latest[1].timestamp()) if latest else AutoAssignmentService.NO_FARMER
+        cache.set(key, cached, AutoAssignmentService.LAST_FARMER_TIMEOUT)
+        return cached
+
+    @staticmethod
+    def _farmers_of(field_officer: User):
+        return User.objects.select_related('role').filter(created_by=field_officer, role__name='farmer')
+
+    @staticmethod
+    def _last_farmer_key(officer_id: int) -> str:
+        return AutoAssignmentService.LAST_FARMER_KEY.format(officer_id=officer_id)
     
     @staticmethod
     def get_farmers_by_field_officer_today(field_officer: User) -> User.objects:
@@ -66,8 +118,7 @@ class AutoAssignmentService:
         try:
             today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
             
-            return User.objects.filter(
-                role__name='farmer',
+            return AutoAssignmentService._farmers_of(field_officer).filter(
                 date_joined__gte=today_start
             ).order_by('-date_joined')
             
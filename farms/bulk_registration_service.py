@@ -0,0 +1,639 @@
+import csv
+import io
+import json
+import logging
+import threading
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import BaseUserManager
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import DatabaseError, transaction
+
+from .farmer_registration_service import CompleteFarmerRegistrationService
+from .models import Farm, FarmIrrigation, Plot, SoilType, CropType, IrrigationType
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+class BulkFarmerRegistrationService:
+    """
+    Registers batches of farmers (with a plot, farm and irrigation each)
+    from CSV or JSON, e.g. a cooperative's spreadsheet.
+
+    The whole batch is validated first: required fields, duplicates within
+    the batch and against the database (one IN query per key), reference
+    types (looked up once per batch) and geometries (one vectorised pass).
+    Valid rows are then written with bulk_create in chunked transactions.
+
+    bulk_create sends no signals, so the work the signals would do is done
+    here once per chunk or batch: closure-table links, user stats, hierarchy
+    caches, change versions, the plot lookup cache, and one coalesced
+    FastAPI sync per service.
+    """
+
+    CHUNK_SIZE = 200
+    MAX_ROWS = 5000
+
+    FARMER_FIELDS = [
+        'username', 'email', 'password', 'first_name', 'last_name',
+        'phone_number', 'address', 'village', 'taluka', 'district', 'state',
+    ]
+    REQUIRED_PLOT_FIELDS = ['gat_number', 'village', 'district', 'state']
+
+    # (label, module, class, batch method) of the FastAPI services plots are synced to
+    SYNC_SERVICES = [
+        ('events.py', 'services', 'EventsSyncService'),
+        ('soil.py/main.py', 'soil_services', 'SoilSyncService'),
+        ('Admin.py', 'admin_services', 'AdminSyncService'),
+        ('ET.py', 'et_services', 'ETSyncService'),
+        ('field.py', 'field_services', 'FieldSyncService'),
+    ]
+
+    @staticmethod
+    def parse_csv(content):
+        """
+        Convert CSV text into registration rows.
+
+        Farmer columns are unprefixed (username, email, ...); plot, farm and
+        irrigation columns are prefixed with plot_, farm_ and irrigation_
+        (e.g. plot_gat_number, farm_area_size, irrigation_irrigation_type_name).
+        plot_latitude/plot_longitude give the plot location and plot_boundary
+        a GeoJSON polygon.
+
+        Args:
+            content: CSV text (str or bytes)
+
+        Returns:
+            list: Rows in the register_complete_farmer JSON shape
+        """
+        if isinstance(content, bytes):
+            content = content.decode('utf-8-sig')
+        rows = []
+        for record in csv.DictReader(io.StringIO(content)):
+            row = {'farmer': {}, 'plot': {}, 'farm': {}, 'irrigation': {}}
+            for column, value in record.items():
+                if column is None or value is None or not value.strip():
+                    continue
+                column, value = column.strip(), value.strip()
+                section, _, field = column.partition('_')
+                if section in ('plot', 'farm', 'irrigation') and field:
+                    row[section][field] = value
+                else:
+                    row['farmer'][column] = value
+
+            plot = row['plot']
+            if 'latitude' in plot and 'longitude' in plot:
+                try:
+                    plot['location'] = {
+                        'type': 'Point',
+                        'coordinates': [float(plot.pop('longitude')), float(plot.pop('latitude'))]
+                    }
+                except ValueError:
+                    plot['location'] = 'invalid latitude/longitude'
+            if isinstance(plot.get('boundary'), str):
+                try:
+                    plot['boundary'] = json.loads(plot['boundary'])
+                except ValueError:
+                    pass
+            rows.append({key: value for key, value in row.items() if value})
+        return rows
+
+    @staticmethod
+    def register_farmers(rows, field_officer, skip_invalid=False, dry_run=False, chunk_size=None, background_sync=True):
+        """
+        Validate and register a batch of farmers.
+
+        Args:
+            rows: List of rows shaped like register-farmer requests
+                ({'farmer', 'plot', 'farm', 'irrigation'} or {'farmer', 'plots': [...]})
+            field_officer: User registering the farmers (their created_by)
+            skip_invalid: Register the valid rows even if some rows are invalid
+            dry_run: Only validate
+            chunk_size: Rows per insert transaction
+            background_sync: Sync to FastAPI in a background thread (False waits for it)
+
+        Returns:
+            dict: Report with per-row errors and the created IDs
+        """
+        if len(rows) > BulkFarmerRegistrationService.MAX_ROWS:
+            raise DjangoValidationError(
+                f"A batch can contain at most {BulkFarmerRegistrationService.MAX_ROWS} rows, got {len(rows)}"
+            )
+
+        prepared = [BulkFarmerRegistrationService._normalize_row(i, row) for i, row in enumerate(rows)]
+        references = BulkFarmerRegistrationService._validate(prepared)
+
+        invalid = [row for row in prepared if row['errors']]
+        report = {
+            'success': False,
+            'dry_run': dry_run,
+            'total_rows': len(prepared),
+            'valid_rows': len(prepared) - len(invalid),
+            'created_count': 0,
+            'failed_count': len(invalid),
+            'created': [],
+            'errors': [
+                {'row': row['row'], 'username': row['farmer'].get('username'), 'errors': row['errors']}
+                for row in invalid
+            ],
+            'sync_queued': False,
+        }
+        if dry_run or (invalid and not skip_invalid):
+            report['success'] = not invalid
+            if invalid and not dry_run:
+                report['message'] = 'Batch rejected: fix the row errors or resend with skip_invalid'
+            return report
+
+        valid = [row for row in prepared if not row['errors']]
+        if not valid:
+            return report
+
+        BulkFarmerRegistrationService._create_missing_references(references)
+
+        # Hash every password up front, across cores, outside the insert transactions
+        from users.password_service import PasswordHashingService
+        hashes = PasswordHashingService.hash_many([row['farmer'].get('password') or None for row in valid])
+        for row, encoded in zip(valid, hashes):
+            row['farmer']['password'] = encoded
+
+        chunk_size = chunk_size or BulkFarmerRegistrationService.CHUNK_SIZE
+        created_user_ids, created_plot_ids = [], []
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            try:
+                created = BulkFarmerRegistrationService._insert_chunk(chunk, field_officer, references)
+            except (DatabaseError, DjangoValidationError, ValueError, TypeError) as e:
+                # A concurrent registration took a username/email/plot after validation, or a
+                # value got past validation: report this chunk and keep the committed ones
+                message = BulkFarmerRegistrationService._message(e)
+                logger.warning(f"Bulk registration chunk at row {chunk[0]['row']} failed: {message}")
+                report['failed_count'] += len(chunk)
+                report['errors'].extend(
+                    {'row': row['row'], 'username': row['farmer'].get('username'), 'errors': [f"Insert failed: {message}"]}
+                    for row in chunk
+                )
+                continue
+            report['created'].extend(created)
+            report['created_count'] += len(created)
+            created_user_ids.extend(item['farmer_id'] for item in created)
+            created_plot_ids.extend(pk for item in created for pk in item['plot_ids'])
+
+        if created_user_ids:
+            BulkFarmerRegistrationService._after_insert(created_user_ids, created_plot_ids, references, background_sync)
+            report['sync_queued'] = bool(created_plot_ids)
+
+        report['success'] = report['failed_count'] == 0
+        logger.info(
+            f"Bulk registration by {field_officer.username}: {report['created_count']} created, "
+            f"{report['failed_count']} failed of {report['total_rows']} rows"
+        )
+        return report
+
+    @staticmethod
+    def _normalize_row(index, row):
+        """Bring a row into {'row', 'farmer', 'entities', 'errors'} form"""
+        if not isinstance(row, dict):
+            return {'row': index + 1, 'farmer': {}, 'entities': [], 'errors': ['Row must be an object']}
+        entities = [
+            {'plot': entity.get('plot') or {}, 'farm': entity.get('farm') or {}, 'irrigation': entity.get('irrigation') or {}}
+            for entity in row.get('plots') or []
+        ]
+        if not entities and (row.get('plot') or row.get('farm')):
+            entities = [{'plot': row.get('plot') or {}, 'farm': row.get('farm') or {}, 'irrigation': row.get('irrigation') or {}}]
+        return {'row': index + 1, 'farmer': dict(row.get('farmer') or {}), 'entities': entities, 'errors': []}
+
+    @staticmethod
+    def _validate(prepared):
+        """
+        Record every problem of every row in its 'errors' list.
+
+        Returns:
+            dict: Reference lookups for the insert step
+        """
+        from .geometry_batch_service import GeometryBatchService
+
+        # Required fields
+        required_farmer_fields = CompleteFarmerRegistrationService.required_farmer_fields()
+        for row in prepared:
+            farmer = row['farmer']
+            missing = [field for field in required_farmer_fields if not farmer.get(field)]
+            if missing:
+                row['errors'].append(f"Farmer {', '.join(missing)} required")
+            if farmer.get('email'):
+                farmer['email'] = BaseUserManager.normalize_email(farmer['email'])
+            if farmer.get('username'):
+                farmer['username'] = User.normalize_username(farmer['username'])
+            for position, entity in enumerate(row['entities'], start=1):
+                plot, farm = entity['plot'], entity['farm']
+                missing = [field for field in BulkFarmerRegistrationService.REQUIRED_PLOT_FIELDS if not plot.get(field)]
+                if missing:
+                    row['errors'].append(f"Plot {position}: {', '.join(missing)} required")
+                if farm and not plot:
+                    row['errors'].append(f"Plot {position}: a farm needs a plot")
+                if farm and (not farm.get('address') or not farm.get('area_size')):
+                    row['errors'].append(f"Plot {position}: farm address and area_size are required")
+                if entity['irrigation'] and not farm:
+                    row['errors'].append(f"Plot {position}: an irrigation needs a farm")
+
+        BulkFarmerRegistrationService._check_uniqueness(prepared)
+        references = BulkFarmerRegistrationService._resolve_references(prepared)
+
+        # Geometries: point conversion per plot, boundaries in one vectorised batch
+        entities = [(row, position, entity) for row in prepared for position, entity in enumerate(row['entities'], start=1)]
+        for row, position, entity in entities:
+            location = entity['plot'].get('location')
+            if location:
+                try:
+                    entity['location'] = CompleteFarmerRegistrationService._convert_geojson_to_geometry(location)
+                except Exception as e:
+                    row['errors'].append(f"Plot {position}: {BulkFarmerRegistrationService._message(e)}")
+        with_boundary = [item for item in entities if item[2]['plot'].get('boundary')]
+        if with_boundary:
+            results = GeometryBatchService.process_polygons([entity['plot']['boundary'] for _, _, entity in with_boundary])
+            for (row, position, entity), result in zip(with_boundary, results):
+                if result['error']:
+                    row['errors'].append(f"Plot {position}: invalid boundary: {result['error']}")
+                else:
+                    entity['boundary'] = result['geometry']
+
+        # Field values (lengths, decimals, dates, numbers) and FarmIrrigation.clean() as saving
+        # would check them, without touching the database: a bad value is reported for its row
+        # instead of failing bulk_create after earlier chunks have committed
+        for row in prepared:
+            if row['errors']:
+                continue
+            farmer = BulkFarmerRegistrationService._build_farmer(dict(row['farmer'], password=''), None, references)
+            BulkFarmerRegistrationService._clean_fields(farmer, row, 'Farmer', exclude=['password'])
+            for position, entity in enumerate(row['entities'], start=1):
+                label = f"Plot {position}"
+                plot = BulkFarmerRegistrationService._build_plot(entity, None, None)
+                BulkFarmerRegistrationService._clean_fields(plot, row, label)
+                if not entity['farm']:
+                    continue
+                farm = BulkFarmerRegistrationService._build_farm(dict(entity, plot_obj=plot), None, None, references)
+                BulkFarmerRegistrationService._clean_fields(farm, row, f"{label} farm")
+                if not entity['irrigation']:
+                    continue
+                try:
+                    irrigation = BulkFarmerRegistrationService._build_irrigation(entity, references, farm=None)
+                except Exception as e:
+                    row['errors'].append(f"{label} irrigation: {BulkFarmerRegistrationService._message(e)}")
+                    continue
+                if BulkFarmerRegistrationService._clean_fields(irrigation, row, f"{label} irrigation"):
+                    try:
+                        irrigation.clean()
+                    except Exception as e:
+                        row['errors'].append(f"{label}: {BulkFarmerRegistrationService._message(e)}")
+
+        return references
+
+    @staticmethod
+    def _clean_fields(instance, row, label, exclude=()):
+        """
+        Run a built instance's field validation and record its errors on the row.
+
+        Relations are skipped: they point at rows that are only inserted later.
+
+        Returns:
+            bool: Whether the fields are valid
+        """
+        relations = [field.name for field in instance._meta.concrete_fields if field.is_relation]
+        try:
+            instance.clean_fields(exclude=relations + list(exclude))
+        except DjangoValidationError as e:
+            row['errors'].extend(
+                f"{label} {field}: {'; '.join(messages)}" for field, messages in e.message_dict.items()
+            )
+            return False
+        return True
+
+    @staticmethod
+    def _check_uniqueness(prepared):
+        """Duplicate usernames, emails and plots, within the batch and against the database (one query each)"""
+        from users.uniqueness_service import UserUniquenessService
+
+        farmers = [row['farmer'] for row in prepared]
+        for index, fields in UserUniquenessService.find_conflicts(farmers).items():
+            for field, earlier_index in fields.items():
+                prepared[index]['errors'].append(
+                    UserUniquenessService.describe(field, farmers[index][field], earlier_index, entry_label='row')
+                )
+
+        plots = [(row, entity['plot']) for row in prepared for entity in row['entities']]
+        conflicts = CompleteFarmerRegistrationService.find_plot_conflicts([plot for _, plot in plots])
+        for index, earlier_index in conflicts.items():
+            row, plot = plots[index]
+            if earlier_index is None:
+                row['errors'].append(CompleteFarmerRegistrationService.describe_plot_conflict(plot, None))
+            else:
+                row['errors'].append(f"Plot GAT {plot['gat_number']} in {plot.get('village')} repeats row {plots[earlier_index][0]['row']}")
+
+    @staticmethod
+    def _resolve_references(prepared):
+        """
+        Look up the farmer role and every soil, crop and irrigation type the batch names, once.
+
+        Types referenced by name that do not exist yet are created (once)
+        just before inserting, like register-farmer's get_or_create.
+        """
+        from users.models import Role
+
+        farms = [(row, position, entity['farm']) for row in prepared for position, entity in enumerate(row['entities'], start=1) if entity['farm']]
+        irrigations = [(row, position, entity['irrigation']) for row in prepared for position, entity in enumerate(row['entities'], start=1) if entity['irrigation']]
+
+        # IDs arrive as text from CSV: make them ints, or an error for their row
+        for row, position, data in farms + irrigations:
+            for field in ('soil_type_id', 'crop_type_id', 'irrigation_type_id'):
+                if data.get(field) in (None, ''):
+                    continue
+                try:
+                    data[field] = int(str(data[field]).strip())
+                except ValueError:
+                    value = data.pop(field)
+                    row['errors'].append(f"Plot {position}: {field.replace('_', ' ')} must be a whole number, got {value!r}")
+
+        references = {
+            'farmer_role': Role.objects.filter(name='farmer').first(),
+            'soil_by_id': SoilType.objects.in_bulk({farm['soil_type_id'] for _, _, farm in farms if farm.get('soil_type_id')}),
+            'crop_by_id': CropType.objects.in_bulk({farm['crop_type_id'] for _, _, farm in farms if farm.get('crop_type_id')}),
+            'irrigation_by_id': IrrigationType.objects.in_bulk(
+                {irrigation['irrigation_type_id'] for _, _, irrigation in irrigations if irrigation.get('irrigation_type_id')}
+            ),
+            'soil_by_name': {},
+            'crop_by_key': {},
+            'irrigation_by_name': {},
+        }
+        if references['farmer_role'] is None:
+            for row in prepared:
+                row['errors'].append("Farmer role not found in system")
+
+        soil_names = {farm['soil_type_name'] for _, _, farm in farms if farm.get('soil_type_name') and not farm.get('soil_type_id')}
+        for soil_type in SoilType.objects.filter(name__in=soil_names).order_by('id'):
+            references['soil_by_name'].setdefault(soil_type.name, soil_type)
+        for name in soil_names - set(references['soil_by_name']):
+            references['soil_by_name'][name] = SoilType(name=name, description=f"Auto-created: {name}")
+
+        crop_keys = {
+            BulkFarmerRegistrationService._crop_key(farm)
+            for _, _, farm in farms if farm.get('crop_type_name') and not farm.get('crop_type_id')
+        }
+        for crop_type in CropType.objects.filter(crop_type__in={key[0] for key in crop_keys}).order_by('id'):
+            references['crop_by_key'].setdefault((crop_type.crop_type, crop_type.plantation_type, crop_type.planting_method), crop_type)
+        for key in crop_keys - set(references['crop_by_key']):
+            references['crop_by_key'][key] = CropType(crop_type=key[0], plantation_type=key[1], planting_method=key[2])
+
+        irrigation_names = {
+            irrigation['irrigation_type_name'] for _, _, irrigation in irrigations
+            if irrigation.get('irrigation_type_name') and not irrigation.get('irrigation_type_id')
+        }
+        for irrigation_type in IrrigationType.objects.filter(name__in=irrigation_names).order_by('id'):
+            references['irrigation_by_name'].setdefault(irrigation_type.name, irrigation_type)
+        for name in irrigation_names - set(references['irrigation_by_name']):
+            references['irrigation_by_name'][name] = IrrigationType(name=name, description=f"Auto-created: {name}")
+
+        for row, position, farm in farms:
+            if farm.get('soil_type_id') and farm['soil_type_id'] not in references['soil_by_id']:
+                row['errors'].append(f"Plot {position}: soil type ID {farm['soil_type_id']} not found")
+            if farm.get('crop_type_id') and farm['crop_type_id'] not in references['crop_by_id']:
+                row['errors'].append(f"Plot {position}: crop type ID {farm['crop_type_id']} not found")
+        for row, position, irrigation in irrigations:
+            if irrigation.get('irrigation_type_id') and irrigation['irrigation_type_id'] not in references['irrigation_by_id']:
+                row['errors'].append(f"Plot {position}: irrigation type ID {irrigation['irrigation_type_id']} not found")
+        return references
+
+    @staticmethod
+    def _create_missing_references(references):
+        """Save the name-referenced types that did not exist, in one go per table"""
+        for key, model in (('soil_by_name', SoilType), ('crop_by_key', CropType), ('irrigation_by_name', IrrigationType)):
+            missing = [instance for instance in references[key].values() if instance.pk is None]
+            if missing:
+                # Postgres returns the new primary keys onto the instances
+                model.objects.bulk_create(missing)
+                references['created_types'] = True
+
+    @staticmethod
+    def _insert_chunk(chunk, field_officer, references):
+        """Insert one chunk of valid rows in a single transaction"""
+        from users.hierarchy_service import UserHierarchyService
+        from users.stats_service import UserStatsService
+        from .auto_assignment_service import AutoAssignmentService
+
+        with transaction.atomic():
+            farmers = User.objects.bulk_create([
+                BulkFarmerRegistrationService._build_farmer(row['farmer'], field_officer, references)
+                for row in chunk
+            ])
+
+            plots, farms, irrigations = [], [], []
+            for row, farmer in zip(chunk, farmers):
+                for entity in row['entities']:
+                    entity['plot_obj'] = BulkFarmerRegistrationService._build_plot(entity, farmer, field_officer)
+                    plots.append(entity['plot_obj'])
+            Plot.objects.bulk_create(plots)
+
+            for row, farmer in zip(chunk, farmers):
+                for entity in row['entities']:
+                    if entity['farm']:
+                        entity['farm_obj'] = BulkFarmerRegistrationService._build_farm(entity, farmer, field_officer, references)
+                        farms.append(entity['farm_obj'])
+            Farm.objects.bulk_create(farms)
+
+            for row in chunk:
+                for entity in row['entities']:
+                    if entity['irrigation'] and entity.get('farm_obj'):
+                        irrigations.append(
+                            BulkFarmerRegistrationService._build_irrigation(entity, references, farm=entity['farm_obj'])
+                        )
+            FarmIrrigation.objects.bulk_create(irrigations)
+
+            # What the post_save signals would have done for these rows
+            UserHierarchyService.add_users(farmers)
+            AutoAssignmentService.farmer_registered(farmers[-1])
+            UserStatsService.recompute(
+                [farmer.pk for farmer in farmers] + [field_officer.pk] + UserStatsService.ancestor_ids([field_officer.pk])
+            )
+
+        return [
+            {
+                'row': row['row'],
+                'farmer_id': farmer.pk,
+                'username': farmer.username,
+                'plot_ids': [entity['plot_obj'].pk for entity in row['entities']],
+                'farm_ids': [entity['farm_obj'].pk for entity in row['entities'] if entity.get('farm_obj')],
+            }
+            for row, farmer in zip(chunk, farmers)
+        ]
+
+    @staticmethod
+    def _after_insert(user_ids, plot_ids, references, background_sync=True):
+        """Invalidate caches once for the whole batch and queue the FastAPI syncs"""
+        from farm_management.versions import ModelVersionService
+        from users.hierarchy_cache_service import HierarchyCacheService
+        from .plot_lookup_service import PlotLookupService
+
+        HierarchyCacheService.user_moved(user_ids)
+        PlotLookupService.clear_cache()
+        labels = ['users.User', 'farms.Plot', 'farms.Farm', 'farms.FarmIrrigation']
+        if references.get('created_types'):
+            labels += ['farms.SoilType', 'farms.CropType', 'farms.IrrigationType']
+        ModelVersionService.bump(*labels)
+
+        if plot_ids:
+            sync = BulkFarmerRegistrationService.queue_sync if background_sync else BulkFarmerRegistrationService.sync_plots
+            transaction.on_commit(lambda: sync(plot_ids))
+
+    @staticmethod
+    def queue_sync(plot_ids):
+        """
+        Sync new plots to every FastAPI service in the background: one
+        batched request per service instead of one per plot and service.
+        """
+        thread = threading.Thread(
+            target=BulkFarmerRegistrationService.sync_plots,
+            args=(list(plot_ids),),
+            name='bulk-plot-sync',
+            daemon=True,
+        )
+        thread.start()
+
+    @staticmethod
+    def sync_plots(plot_ids):
+        """
+        Send plots to each FastAPI service with a single batched request.
+
+        Returns:
+            dict: {'successful': [...], 'failed': [...]} service labels
+        """
+        from django.db import connection
+
+        results = {'successful': [], 'failed': []}
+        try:
+            plots = list(Plot.objects.filter(pk__in=plot_ids))
+            for service_name, module_name, class_name in BulkFarmerRegistrationService.SYNC_SERVICES:
+                try:
+                    module = __import__(f'farms.{module_name}', fromlist=[class_name])
+                    if getattr(module, class_name)().sync_plots(plots):
+                        results['successful'].append(service_name)
+                    else:
+                        results['failed'].append(f"{service_name} (returned False)")
+                except Exception as e:
+                    results['failed'].append(f"{service_name} ({str(e)})")
+            logger.info(
+                f"Bulk sync of {len(plots)} plots: {len(results['successful'])} services successful, "
+                f"{len(results['failed'])} failed"
+            )
+            if results['failed']:
+                logger.warning(f"❌ Failed bulk syncs: {', '.join(results['failed'])}")
+        finally:
+            # Runs in its own thread: do not leak the thread's connection
+            connection.close()
+        return results
+
+    @staticmethod
+    def _build_farmer(farmer_data, field_officer, references):
+        farmer = User(
+            **{field: farmer_data.get(field, '') for field in BulkFarmerRegistrationService.FARMER_FIELDS if field != 'password'},
+            role=references['farmer_role'],
+            created_by=field_officer,
+        )
+        # Already hashed by PasswordHashingService
+        farmer.password = farmer_data['password']
+        return farmer
+
+    @staticmethod
+    def _build_plot(entity, farmer, field_officer):
+        plot_data = entity['plot']
+        return Plot(
+            gat_number=plot_data['gat_number'],
+            plot_number=plot_data.get('plot_number', ''),
+            village=plot_data['village'],
+            taluka=plot_data.get('taluka', ''),
+            district=plot_data['district'],
+            state=plot_data['state'],
+            country=plot_data.get('country', 'India'),
+            pin_code=plot_data.get('pin_code', ''),
+            farmer=farmer,
+            created_by=field_officer,
+            location=entity.get('location'),
+            boundary=entity.get('boundary'),
+        )
+
+    @staticmethod
+    def _build_farm(entity, farmer, field_officer, references):
+        farm_data = entity['farm']
+        soil_type = (
+            references['soil_by_id'].get(farm_data['soil_type_id']) if farm_data.get('soil_type_id')
+            else references['soil_by_name'].get(farm_data.get('soil_type_name'))
+        )
+        crop_type = (
+            references['crop_by_id'].get(farm_data['crop_type_id']) if farm_data.get('crop_type_id')
+            else references['crop_by_key'].get(BulkFarmerRegistrationService._crop_key(farm_data))
+        )
+        return Farm(
+            address=farm_data['address'],
+            area_size=farm_data['area_size'],
+            farm_owner=farmer,
+            created_by=field_officer,
+            plot=entity['plot_obj'],
+            soil_type=soil_type,
+            crop_type=crop_type,
+            plantation_date=farm_data.get('plantation_date') or None,
+            spacing_a=farm_data.get('spacing_a') or None,
+            spacing_b=farm_data.get('spacing_b') or None,
+        )
+
+    @staticmethod
+    def _build_irrigation(entity, references, farm):
+        irrigation_data, farm_data = entity['irrigation'], entity['farm']
+        irrigation_type = (
+            references['irrigation_by_id'].get(irrigation_data['irrigation_type_id'])
+            if irrigation_data.get('irrigation_type_id')
+            else references['irrigation_by_name'].get(irrigation_data.get('irrigation_type_name'))
+        )
+        if irrigation_data.get('location'):
+            location = CompleteFarmerRegistrationService._convert_geojson_to_geometry(irrigation_data['location'])
+        elif entity.get('location'):
+            location = entity['location']
+        else:
+            from django.contrib.gis.geos import Point
+            location = Point(0, 0)
+
+        def number(field):
+            value = irrigation_data.get(field)
+            return None if value in (None, '') else value
+
+        status = irrigation_data.get('status', True)
+        if isinstance(status, str):
+            status = status.strip().lower() not in ('false', '0', 'no')
+        return FarmIrrigation(
+            farm=farm,
+            irrigation_type=irrigation_type,
+            location=location,
+            status=status,
+            motor_horsepower=number('motor_horsepower'),
+            pipe_width_inches=number('pipe_width_inches'),
+            distance_motor_to_plot_m=number('distance_motor_to_plot_m'),
+            plants_per_acre=CompleteFarmerRegistrationService._calculate_plants_per_acre(
+                irrigation_type, irrigation_data, farm_data
+            ),
+            flow_rate_lph=number('flow_rate_lph'),
+            emitters_count=number('emitters_count'),
+        )
+
+    @staticmethod
+    def _crop_key(farm_data):
+        return (
+            farm_data.get('crop_type_name'),
+            farm_data.get('plantation_type', 'other'),
+            farm_data.get('planting_method', 'other'),
+        )
+
+    @staticmethod
+    def _message(error):
+        if isinstance(error, DjangoValidationError):
+            return '; '.join(error.messages)
+        detail = getattr(error, 'detail', None)
+        if isinstance(detail, list):
+            return '; '.join(str(item) for item in detail)
+        return str(detail or error)
@@ -1,4 +1,5 @@
-from django.db import transaction
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework.response import Response
@@ -32,9 +33,6 @@ class CompleteFarmerRegistrationService:
             Dictionary with created objects and their IDs
         """
         try:
-            # Step 1: Create Farmer (User)
-            farmer = CompleteFarmerRegistrationService._create_farmer(data.get('farmer', {}), field_officer)
-
             # Handle multiple plots, farms, and irrigations
             created_entities = []
             plots_data = data.get('plots', [])
@@ -47,11 +45,24 @@ class CompleteFarmerRegistrationService:
                     'irrigation': data.get('irrigation')
                 })
 
-            for entity_data in plots_data:
+            # Report every taken or repeated username, email and plot at once, before writing anything
+            CompleteFarmerRegistrationService._prevalidate_uniqueness(data.get('farmer') or {}, plots_data)
+
+            # Validate and convert every plot boundary in one batch before writing anything
+            boundaries = CompleteFarmerRegistrationService._prepare_boundaries(
+                [entity_data.get('plot') or {} for entity_data in plots_data]
+            )
+
+            # Step 1: Create Farmer (User)
+            farmer = CompleteFarmerRegistrationService._create_farmer(
+                data.get('farmer', {}), field_officer, check_conflicts=False
+            )
+
+            for entity_data, boundary in zip(plots_data, boundaries):
                 plot = None
                 if entity_data.get('plot'):
                     plot = CompleteFarmerRegistrationService._create_plot(
-                        entity_data['plot'], farmer, field_officer
+                        entity_data['plot'], farmer, field_officer, boundary=boundary
                     )
 
                 farm = None
@@ -78,29 +89,109 @@ class CompleteFarmerRegistrationService:
                 'message': 'Farmer registration completed successfully'
             }
             
+        except IntegrityError as e:
+            # Lost a race with a concurrent registration after the prevalidation
+            logger.warning(f"Farmer registration conflicted with a concurrent one: {str(e)}")
+            raise serializers.ValidationError(
+                "Registration failed: the username, email or plot was just registered by another request"
+            )
         except Exception as e:
             logger.error(f"Farmer registration failed: {str(e)}")
             raise serializers.ValidationError(f"Registration failed: {str(e)}")
+
+    PLOT_KEY_FIELDS = ('gat_number', 'plot_number', 'village', 'district')
+
+    @staticmethod
+    def plot_key(plot_data):
+        """Natural key a plot must not share with another: (gat_number, plot_number, village, district)"""
+        return (
+            plot_data.get('gat_number'),
+            plot_data.get('plot_number', ''),
+            plot_data.get('village'),
+            plot_data.get('district'),
+        )
+
+    @staticmethod
+    def find_plot_conflicts(plots_data):
+        """
+        Find plots that already exist or repeat, with one query for all of them.
+
+        Args:
+            plots_data: Plot data dicts (empty ones are skipped)
+
+        Returns:
+            dict: {index: None if the plot exists, else the index of the earlier entry repeating it}
+        """
+        keys = {
+            index: CompleteFarmerRegistrationService.plot_key(plot_data)
+            for index, plot_data in enumerate(plots_data) if plot_data and plot_data.get('gat_number')
+        }
+        # The (gat_number, plot_number) index narrows to a handful of rows; compare the full keys here
+        existing = set(
+            Plot.objects.filter(gat_number__in={key[0] for key in keys.values()})
+            .values_list(*CompleteFarmerRegistrationService.PLOT_KEY_FIELDS)
+        )
+
+        conflicts, first_seen = {}, {}
+        for index, key in keys.items():
+            if key in existing:
+                conflicts[index] = None
+            elif key in first_seen:
+                conflicts[index] = first_seen[key]
+            first_seen.setdefault(key, index)
+        return conflicts
+
+    @staticmethod
+    def describe_plot_conflict(plot_data, earlier_index, entry_label='plot'):
+        """Message for one conflict from find_plot_conflicts"""
+        if earlier_index is None:
+            return f"Plot GAT {plot_data['gat_number']} in {plot_data.get('village')} already exists"
+        return f"Plot GAT {plot_data['gat_number']} in {plot_data.get('village')} repeats {entry_label} {earlier_index + 1}"
+
+    @staticmethod
+    def _prevalidate_uniqueness(farmer_data, plots_data):
+        """Raise one ValidationError listing every username, email and plot conflict"""
+        from users.uniqueness_service import UserUniquenessService
+
+        errors = [
+            UserUniquenessService.describe(field, farmer_data[field], earlier_index)
+            for field, earlier_index in UserUniquenessService.find_conflicts([farmer_data]).get(0, {}).items()
+        ]
+        plots = [entity_data.get('plot') or {} for entity_data in plots_data]
+        errors.extend(
+            CompleteFarmerRegistrationService.describe_plot_conflict(plots[index], earlier_index)
+            for index, earlier_index in sorted(CompleteFarmerRegistrationService.find_plot_conflicts(plots).items())
+        )
+        if errors:
+            raise serializers.ValidationError('; '.join(errors))
     
     @staticmethod
-    def _create_farmer(farmer_data, field_officer=None):
-        """Create farmer user"""
+    def required_farmer_fields():
+        """
+        Fields a farmer registration must include.
+
+        With FARMER_OTP_ONLY_REGISTRATION the password is optional: farmers
+        registered without one log in with an OTP and set it on first login.
+        """
+        if getattr(settings, 'FARMER_OTP_ONLY_REGISTRATION', False):
+            return ['username', 'email', 'first_name', 'last_name']
+        return ['username', 'email', 'password', 'first_name', 'last_name']
+
+    @staticmethod
+    def _create_farmer(farmer_data, field_officer=None, check_conflicts=True):
+        """Create farmer user (check_conflicts=False when the caller prevalidated the username and email)"""
         if not farmer_data:
             raise serializers.ValidationError("Farmer data is required")
         
         # Validate required fields
-        required_fields = ['username', 'email', 'password', 'first_name', 'last_name']
+        required_fields = CompleteFarmerRegistrationService.required_farmer_fields()
         for field in required_fields:
             if not farmer_data.get(field):
                 raise serializers.ValidationError(f"Farmer {field} is required")
         
-        # Check if username already exists
-        if User.objects.filter(username=farmer_data['username']).exists():
-            raise serializers.ValidationError(f"Username '{farmer_data['username']}' already exists")
-        
-        # Check if email already exists
-        if User.objects.filter(email=farmer_data['email']).exists():
-            raise serializers.ValidationError(f"Email '{farmer_data['email']}' already exists")
+        # Check if username or email already exist
+        if check_conflicts:
+            CompleteFarmerRegistrationService._prevalidate_uniqueness(farmer_data, [])
         
         # Get farmer role
         try:
@@ -113,7 +204,8 @@ class CompleteFarmerRegistrationService:
         farmer = User.objects.create_user(
             username=farmer_data['username'],
             email=farmer_data['email'],
-            password=farmer_data['password'],
+            # No password: unusable until set after the first OTP login
+            password=farmer_data.get('password') or None,
             first_name=farmer_data['first_name'],
             last_name=farmer_data['last_name'],
             phone_number=farmer_data.get('phone_number', ''),
@@ -130,7 +222,7 @@ class CompleteFarmerRegistrationService:
         return farmer
     
     @staticmethod
-    def _create_plot(plot_data, farmer, field_officer):
+    def _create_plot(plot_data, farmer, field_officer, boundary=None):
         """Create plot and assign to farmer"""
         if not plot_data:
             return None
@@ -141,18 +233,7 @@ class CompleteFarmerRegistrationService:
             if not plot_data.get(field):
                 raise serializers.ValidationError(f"Plot {field} is required")
         
-        # Check for duplicate plot
-        existing_plot = Plot.objects.filter(
-            gat_number=plot_data['gat_number'],
-            plot_number=plot_data.get('plot_number', ''),
-            village=plot_data['village'],
-            district=plot_data['district']
-        ).first()
-        
-        if existing_plot:
-            raise serializers.ValidationError(
-                f"Plot GAT {plot_data['gat_number']} in {plot_data['village']} already exists"
-            )
+        # Duplicates were prevalidated for the whole registration; the unique constraint closes the race
         
         # Create plot (skip FastAPI sync during unified registration)
         plot = Plot(
@@ -177,10 +258,10 @@ class CompleteFarmerRegistrationService:
                 plot_data['location']
             )
         
-        if plot_data.get('boundary'):
-            plot.boundary = CompleteFarmerRegistrationService._convert_geojson_to_geometry(
-                plot_data['boundary']
-            )
+        if boundary is None and plot_data.get('boundary'):
+            boundary = CompleteFarmerRegistrationService._prepare_boundaries([plot_data])[0]
+        if boundary is not None:
+            plot.boundary = boundary
         
         plot.save()
         
@@ -269,21 +350,9 @@ class CompleteFarmerRegistrationService:
             )
 
         # Calculate plants_per_acre for drip irrigation if spacing is available
-        plants_per_acre_val = irrigation_data.get('plants_per_acre')
-        if irrigation_type and irrigation_type.name.lower() == 'drip' and not plants_per_acre_val:
-            if farm_data and farm_data.get('spacing_a') and farm_data.get('spacing_b'):
-                try:
-                    spacing_a = float(farm_data['spacing_a'])
-                    spacing_b = float(farm_data['spacing_b'])
-                    # Assuming spacing is in feet. 1 acre = 43560 sq ft.
-                    # If spacing is in meters, conversion is needed: 1 meter = 3.28084 feet
-                    # For now, assuming feet as per standard agricultural practice in some regions.
-                    if spacing_a > 0 and spacing_b > 0:
-                        plants_per_acre_val = 43560 / (spacing_a * spacing_b)
-                        logger.info(f"Calculated plants_per_acre: {plants_per_acre_val} for farm {farm.id}")
-                except (ValueError, TypeError):
-                    logger.warning(f"Could not calculate plants_per_acre for farm {farm.id} due to invalid spacing values.")
-                    pass
+        plants_per_acre_val = CompleteFarmerRegistrationService._calculate_plants_per_acre(
+            irrigation_type, irrigation_data, farm_data
+        )
         
         # Create irrigation with location (use farm plot location as default)
         irrigation_location = None
@@ -316,6 +385,30 @@ class CompleteFarmerRegistrationService:
         logger.info(f"Created irrigation: {irrigation.id} for farm {farm.farm_uid}")
         return irrigation
     
+    @staticmethod
+    def _calculate_plants_per_acre(irrigation_type, irrigation_data, farm_data=None):
+        """
+        plants_per_acre as given, or calculated from the farm spacing for drip irrigation
+        
+        Returns:
+            The value to store (None when neither given nor calculable)
+        """
+        plants_per_acre_val = irrigation_data.get('plants_per_acre')
+        if irrigation_type and irrigation_type.name.lower() == 'drip' and not plants_per_acre_val:
+            if farm_data and farm_data.get('spacing_a') and farm_data.get('spacing_b'):
+                try:
+                    spacing_a = float(farm_data['spacing_a'])
+                    spacing_b = float(farm_data['spacing_b'])
+                    # Assuming spacing is in feet. 1 acre = 43560 sq ft.
+                    # If spacing is in meters, conversion is needed: 1 meter = 3.28084 feet
+                    # For now, assuming feet as per standard agricultural practice in some regions.
+                    if spacing_a > 0 and spacing_b > 0:
+                        plants_per_acre_val = 43560 / (spacing_a * spacing_b)
+                        logger.info(f"Calculated plants_per_acre: {plants_per_acre_val}")
+                except (ValueError, TypeError):
+                    logger.warning("Could not calculate plants_per_acre due to invalid spacing values.")
+        return plants_per_acre_val
+    
     @staticmethod
     def get_registration_summary(farmer, plot, farm, irrigation):
         """Get a summary of the complete registration"""
@@ -330,6 +423,43 @@ class CompleteFarmerRegistrationService:
         
         return summary
     
+    @staticmethod
+    def _prepare_boundaries(plots_data):
+        """
+        Validate, repair and convert plot boundaries as one vectorised batch
+        
+        Args:
+            plots_data: List of plot dictionaries (boundary key optional)
+            
+        Returns:
+            List of GEOS polygons (or None where no boundary was given), in input order
+        """
+        from .geometry_batch_service import GeometryBatchService
+        
+        indexes = [i for i, plot_data in enumerate(plots_data) if plot_data.get('boundary')]
+        boundaries = [None] * len(plots_data)
+        if not indexes:
+            return boundaries
+        
+        results = GeometryBatchService.process_polygons(
+            [plots_data[i]['boundary'] for i in indexes]
+        )
+        
+        errors = []
+        for i, result in zip(indexes, results):
+            if result['error']:
+                errors.append(f"Plot {i + 1} ({plots_data[i].get('gat_number', 'unknown GAT')}): {result['error']}")
+                continue
+            adjustments = [key for key in ('swapped', 'repaired', 'clipped') if result[key]]
+            if adjustments:
+                logger.warning(f"Adjusted boundary for plot {i + 1}: {', '.join(adjustments)}")
+            boundaries[i] = result['geometry']
+        
+        if errors:
+            raise serializers.ValidationError(f"Invalid plot boundary: {'; '.join(errors)}")
+        
+        return boundaries
+    
     @staticmethod
     def _convert_geojson_to_geometry(geojson_data):
         """
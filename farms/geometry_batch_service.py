@@ -0,0 +1,244 @@
+import json
+import logging
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import shapely
+from shapely.geometry.polygon import orient
+
+logger = logging.getLogger(__name__)
+
+# Approximate lng/lat bounding box of India, used for sanity checks and clipping
+INDIA_BOUNDS = (68.0, 6.0, 97.5, 37.5)
+
+EARTH_RADIUS_M = 6371008.8
+SQ_METERS_PER_ACRE = 4046.8564224
+
+POLYGON_TYPE_ID = 3
+MULTIPOLYGON_TYPE_ID = 6
+
+# Polygonal parts smaller than this fraction of the largest are floating point slivers
+SLIVER_AREA_RATIO = 1e-9
+
+
+class GeometryBatchService:
+    """
+    Vectorised validation and conversion of GeoJSON plot boundaries.
+
+    Uses shapely 2.x array functions so that parsing, validity checks,
+    repair, orientation, clipping and area computation run over a whole
+    batch at once instead of building one GEOS geometry at a time.
+    """
+
+    @staticmethod
+    def process_polygons(items: Sequence[Any], clip_to_bounds: bool = True, as_geos: bool = True) -> List[Dict[str, Any]]:
+        """
+        Validate and convert a batch of GeoJSON polygons.
+
+        Args:
+            items: GeoJSON dicts, GeoJSON strings or GEOS geometries
+            clip_to_bounds: Clip polygons to the India bounding box
+            as_geos: Return Django GEOS geometries (otherwise shapely geometries)
+
+        Returns:
+            list: One result per input, in input order, with keys
+                geometry, area_acres, error, repaired, reoriented, clipped, swapped
+        """
+        count = len(items)
+        results = [
+            {
+                'geometry': None,
+                'area_acres': None,
+                'error': None,
+                'repaired': False,
+                'reoriented': False,
+                'clipped': False,
+                'swapped': False,
+            }
+            for _ in range(count)
+        ]
+        if not count:
+            return results
+
+        # Step 1: Parse everything in one call
+        geojson_strings = np.array(
+            [GeometryBatchService._to_geojson_string(item, results[i]) for i, item in enumerate(items)],
+            dtype=object,
+        )
+        geoms = np.empty(count, dtype=object)
+        parseable = np.array([s is not None for s in geojson_strings], dtype=bool)
+        if parseable.any():
+            geoms[parseable] = shapely.from_geojson(geojson_strings[parseable], on_invalid='ignore')
+        for i in np.flatnonzero(parseable & shapely.is_missing(geoms)):
+            results[i]['error'] = 'Invalid GeoJSON geometry'
+
+        # Step 2: Only polygons (or single-part multipolygons) are accepted
+        type_ids = shapely.get_type_id(geoms)
+        single_part = (type_ids == MULTIPOLYGON_TYPE_ID) & (shapely.get_num_geometries(geoms) == 1)
+        geoms[single_part] = shapely.get_geometry(geoms[single_part], 0)
+        type_ids[single_part] = POLYGON_TYPE_ID
+        for i in np.flatnonzero(~shapely.is_missing(geoms) & (type_ids != POLYGON_TYPE_ID)):
+            results[i]['error'] = 'Geometry must be a Polygon'
+            geoms[i] = None
+
+        # Step 3: Coordinate sanity checks (ranges and swapped lat/lng)
+        active = ~shapely.is_missing(geoms)
+        bounds = shapely.bounds(geoms)
+        in_range = (
+            np.isfinite(bounds).all(axis=1)
+            & (bounds[:, 0] >= -180) & (bounds[:, 2] <= 180)
+            & (bounds[:, 1] >= -90) & (bounds[:, 3] <= 90)
+        )
+        swapped = active & GeometryBatchService._within_india(bounds[:, [1, 0, 3, 2]]) & ~GeometryBatchService._within_india(bounds)
+        if swapped.any():
+            geoms[swapped] = shapely.transform(geoms[swapped], lambda coords: coords[:, ::-1])
+            for i in np.flatnonzero(swapped):
+                results[i]['swapped'] = True
+        for i in np.flatnonzero(active & ~in_range & ~swapped):
+            results[i]['error'] = 'Coordinates out of range; expected [longitude, latitude]'
+            geoms[i] = None
+
+        # Step 4: Repair invalid polygons
+        active = ~shapely.is_missing(geoms)
+        invalid = active & ~shapely.is_valid(geoms)
+        if invalid.any():
+            repaired = shapely.make_valid(geoms[invalid])
+            for i, geom in zip(np.flatnonzero(invalid), repaired):
+                polygon, parts = GeometryBatchService._single_polygon(geom)
+                if parts > 1:
+                    # e.g. a bowtie: keeping one part would silently drop the rest of the area
+                    results[i]['error'] = (
+                        f"Polygon is self-intersecting and splits into {parts} parts; "
+                        f"send each part as a separate polygon"
+                    )
+                elif polygon is None:
+                    results[i]['error'] = 'Polygon is invalid and could not be repaired'
+                else:
+                    results[i]['repaired'] = True
+                geoms[i] = polygon
+
+        # Step 5: Exterior rings counter-clockwise (RFC 7946)
+        active = ~shapely.is_missing(geoms)
+        clockwise = np.zeros(count, dtype=bool)
+        clockwise[active] = ~shapely.is_ccw(shapely.get_exterior_ring(geoms[active]))
+        # Reversing is enough for simple polygons; rings with holes need orient()
+        simple = clockwise & (shapely.get_num_interior_rings(geoms) == 0)
+        geoms[simple] = shapely.reverse(geoms[simple])
+        for i in np.flatnonzero(clockwise & ~simple):
+            geoms[i] = orient(geoms[i], sign=1.0)
+        for i in np.flatnonzero(clockwise):
+            results[i]['reoriented'] = True
+
+        # Step 6: Clip to India
+        if clip_to_bounds:
+            active = ~shapely.is_missing(geoms)
+            india = shapely.box(*INDIA_BOUNDS)
+            shapely.prepare(india)
+            outside = active & ~shapely.within(geoms, india)
+            if outside.any():
+                clipped = shapely.intersection(geoms[outside], india)
+                for i, geom in zip(np.flatnonzero(outside), clipped):
+                    polygon, parts = GeometryBatchService._single_polygon(geom)
+                    if parts > 1:
+                        results[i]['error'] = f"Polygon is split into {parts} parts by the India boundary"
+                    elif polygon is None:
+                        results[i]['error'] = 'Polygon lies outside India'
+                    else:
+                        results[i]['clipped'] = True
+                    geoms[i] = polygon
+
+        # Step 7: Areas on a sinusoidal (equal-area) projection
+        active = ~shapely.is_missing(geoms)
+        areas = np.full(count, np.nan)
+        if active.any():
+            areas[active] = shapely.area(
+                shapely.transform(geoms[active], GeometryBatchService._project_equal_area)
+            ) / SQ_METERS_PER_ACRE
+        for i in np.flatnonzero(active & (areas <= 0)):
+            results[i]['error'] = 'Polygon has zero area'
+            geoms[i] = None
+            active[i] = False
+
+        # Step 8: Hand back GEOS (for model fields) or shapely geometries
+        if as_geos and active.any():
+            from django.contrib.gis.geos import GEOSGeometry
+            wkbs = shapely.to_wkb(geoms[active])
+            for i, wkb in zip(np.flatnonzero(active), wkbs):
+                results[i]['geometry'] = GEOSGeometry(memoryview(wkb), srid=4326)
+        else:
+            for i in np.flatnonzero(active):
+                results[i]['geometry'] = geoms[i]
+
+        for i in np.flatnonzero(active):
+            results[i]['area_acres'] = round(float(areas[i]), 4)
+
+        failed = sum(1 for result in results if result['error'])
+        if failed:
+            logger.warning(f"Geometry batch: {failed}/{count} polygons rejected")
+        return results
+
+    @staticmethod
+    def process_polygon(item: Any, clip_to_bounds: bool = True, as_geos: bool = True) -> Dict[str, Any]:
+        """Validate and convert a single GeoJSON polygon (see process_polygons)."""
+        return GeometryBatchService.process_polygons([item], clip_to_bounds=clip_to_bounds, as_geos=as_geos)[0]
+
+    @staticmethod
+    def _to_geojson_string(item: Any, result: Dict[str, Any]):
+        """Normalise one input to a GeoJSON string, recording structural errors."""
+        if hasattr(item, 'geojson'):
+            return item.geojson
+        if isinstance(item, str):
+            try:
+                item = json.loads(item)
+            except json.JSONDecodeError:
+                result['error'] = 'Geometry is not valid JSON'
+                return None
+        if not isinstance(item, dict):
+            result['error'] = f"Invalid geometry data type: {type(item).__name__}"
+            return None
+        if 'type' not in item:
+            result['error'] = "GeoJSON must have 'type' field"
+            return None
+        if 'coordinates' not in item:
+            result['error'] = "GeoJSON must have 'coordinates' field"
+            return None
+        return json.dumps(item)
+
+    @staticmethod
+    def _within_india(bounds: np.ndarray) -> np.ndarray:
+        min_x, min_y, max_x, max_y = INDIA_BOUNDS
+        return (
+            (bounds[:, 0] >= min_x) & (bounds[:, 2] <= max_x)
+            & (bounds[:, 1] >= min_y) & (bounds[:, 3] <= max_y)
+        )
+
+    @staticmethod
+    def _single_polygon(geom):
+        """
+        Get the polygon a repaired or clipped geometry reduces to.
+
+        Lines and points left over by make_valid are dropped; polygonal
+        parts are not, so a result with several of them is not a polygon.
+
+        Returns:
+            tuple: (polygon, or None unless there is exactly one part, number of polygonal parts)
+        """
+        if geom is None or shapely.is_empty(geom):
+            return None, 0
+        # Twice: collections may nest multipolygons
+        parts = shapely.get_parts(shapely.get_parts(geom))
+        polygons = parts[shapely.get_type_id(parts) == POLYGON_TYPE_ID]
+        if not len(polygons):
+            return None, 0
+        areas = shapely.area(polygons)
+        polygons = polygons[areas > areas.max() * SLIVER_AREA_RATIO]
+        if len(polygons) != 1:
+            return None, len(polygons)
+        return polygons[0], 1
+
+    @staticmethod
+    def _project_equal_area(coords: np.ndarray) -> np.ndarray:
+        """Sinusoidal projection of lng/lat degrees to metres (area preserving)."""
+        lng = np.radians(coords[:, 0])
+        lat = np.radians(coords[:, 1])
+        return np.column_stack((EARTH_RADIUS_M * lng * np.cos(lat), EARTH_RADIUS_M * lat))
@@ -0,0 +1,122 @@
+import json
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from farm_management.renderers import FastJSONRenderer, is_fast_json_available
+
+
+class Command(BaseCommand):
+    help = 'Compare stdlib and orjson rendering of payloads shaped like the large farm/plot responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plots', type=int, default=2000, help='Plots per payload')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed renders per payload (best is reported)')
+
+    def handle(self, *args, **options):
+        if not is_fast_json_available():
+            self.stdout.write(self.style.WARNING("orjson is not installed: FastJSONRenderer uses the stdlib fallback"))
+
+        payloads = {
+            'plots/public': self._public_payload(options['plots']),
+            'farms/my-profile': self._profile_payload(options['plots']),
+            'plots/geojson': self._geojson_payload(options['plots']),
+        }
+
+        self.stdout.write(f"{'payload':<20}{'size KB':>10}{'stdlib ms':>12}{'fast ms':>10}{'speedup':>10}")
+        for name, data in payloads.items():
+            stdlib_ms, stdlib_output = self._time(JSONRenderer(), data, options['repeat'])
+            fast_ms, fast_output = self._time(FastJSONRenderer(), data, options['repeat'])
+            if json.loads(stdlib_output) != json.loads(fast_output):
+                self.stdout.write(self.style.ERROR(f"{name}: renderers produced different JSON"))
+            self.stdout.write(
+                f"{name:<20}{len(fast_output) / 1024:>10.0f}{stdlib_ms:>12.1f}{fast_ms:>10.1f}"
+                f"{stdlib_ms / fast_ms:>9.1f}x"
+            )
+
+    def _time(self, renderer, data, repeat):
+        best, output = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = renderer.render(data)
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
+
+    def _public_payload(self, count):
+        now = datetime.now(timezone.utc)
+        results = []
+        for i in range(count):
+            lng, lat = 74 + random.random(), 18 + random.random()
+            results.append({
+                'id': i,
+                'fastapi_plot_id': f"{i}_{i}",
+                'gat_number': str(i),
+                'plot_number': str(i % 50),
+                'address': {
+                    'village': 'Baramati', 'taluka': 'Baramati', 'district': 'Pune',
+                    'state': 'Maharashtra', 'country': 'India', 'pin_code': '413102',
+                },
+                'location': {'type': 'Point', 'coordinates': [lng, lat], 'latitude': lat, 'longitude': lng},
+                'boundary': {
+                    'type': 'Polygon',
+                    'coordinates': [[(lng + dx / 1000, lat + dy / 1000) for dx, dy in ((0, 0), (1, 0), (1, 1), (0, 1), (0, 0))]],
+                    'has_boundary': True,
+                },
+                'farmer': {'id': i, 'username': f"farmer{i}", 'full_name': f"Farmer {i}"},
+                'created_at': (now - timedelta(days=i)).isoformat(),
+                'updated_at': now.isoformat(),
+                'farms': [{
+                    'id': i, 'plantation_date': date(2024, 6, 1).isoformat(),
+                    'plantation_type': 'Adsali', 'plantation_type_code': 'adsali',
+                }],
+                'farms_count': 1,
+            })
+        return {'count': count, 'next': None, 'previous': None, 'results': results}
+
+    def _profile_payload(self, count):
+        # Raw model values as the hand-built action responses carry them
+        now = datetime.now(timezone.utc)
+        return {
+            'success': True,
+            'farmer': {'id': 1, 'username': 'farmer1', 'date_joined': now},
+            'plots': [{
+                'id': i,
+                'gat_number': str(i),
+                'farms': [{
+                    'id': i,
+                    'farm_uid': uuid.uuid4(),
+                    'area_size': Decimal('2.50'),
+                    'plantation_date': date(2024, 6, 1),
+                    'created_at': now,
+                    'irrigations': [{
+                        'id': i,
+                        'irrigation_type': 'drip',
+                        'motor_horsepower': Decimal('5.0'),
+                        'flow_rate_lph': Decimal('1.75'),
+                        'status': True,
+                    }],
+                }],
+            } for i in range(count)],
+            'summary': {'total_plots': count, 'total_farms': count, 'total_area': Decimal(count) * Decimal('2.50')},
+        }
+
+    def _geojson_payload(self, count):
+        features = []
+        for i in range(count):
+            lng, lat = 74 + random.random(), 18 + random.random()
+            features.append({
+                'type': 'Feature',
+                'id': i,
+                'geometry': {
+                    'type': 'Polygon',
+                    'coordinates': [[[lng + dx / 1000, lat + dy / 1000] for dx, dy in ((0, 0), (1, 0), (1, 1), (0, 1), (0, 0))]],
+                },
+                'properties': {'gat_number': str(i), 'village': 'Baramati', 'area_size': Decimal('1.25')},
+            })
+        return {'type': 'FeatureCollection', 'features': features}
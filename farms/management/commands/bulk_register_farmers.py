@@ -0,0 +1,67 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from farms.bulk_registration_service import BulkFarmerRegistrationService
+
+
+class Command(BaseCommand):
+    help = 'Register farmers (with plot, farm and irrigation) in bulk from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file, or JSON file with a list of register-farmer requests')
+        parser.add_argument('--field-officer', required=True, help='Username or ID of the registering field officer')
+        parser.add_argument('--format', choices=['csv', 'json'], help='File format (default: from the extension)')
+        parser.add_argument('--skip-invalid', action='store_true', help='Register the valid rows even if some are invalid')
+        parser.add_argument('--dry-run', action='store_true', help='Only validate the file')
+        parser.add_argument('--chunk-size', type=int, default=BulkFarmerRegistrationService.CHUNK_SIZE,
+                            help='Rows per insert transaction')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        officer = options['field_officer']
+        lookup = {'pk': int(officer)} if officer.isdigit() else {'username': officer}
+        try:
+            field_officer = User.objects.select_related('role').get(**lookup)
+        except User.DoesNotExist:
+            raise CommandError(f"Field officer '{officer}' does not exist")
+        if not field_officer.has_role('fieldofficer'):
+            raise CommandError(f"User '{field_officer.username}' is not a field officer")
+
+        file_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if file_format not in ('csv', 'json'):
+            raise CommandError("Cannot tell the file format: pass --format csv or --format json")
+
+        with open(options['path'], 'rb') as f:
+            content = f.read()
+        if file_format == 'csv':
+            rows = BulkFarmerRegistrationService.parse_csv(content)
+        else:
+            rows = json.loads(content)
+            if isinstance(rows, dict):
+                rows = rows.get('farmers', [])
+
+        self.stdout.write(f"Registering {len(rows)} farmers for {field_officer.username}...")
+        report = BulkFarmerRegistrationService.register_farmers(
+            rows,
+            field_officer,
+            skip_invalid=options['skip_invalid'],
+            dry_run=options['dry_run'],
+            chunk_size=options['chunk_size'],
+            background_sync=False,
+        )
+
+        for error in report['errors']:
+            self.stdout.write(
+                self.style.ERROR(f"Row {error['row']} ({error['username'] or '-'}): {'; '.join(error['errors'])}")
+            )
+        if report['dry_run']:
+            self.stdout.write(f"Dry run: {report['valid_rows']} of {report['total_rows']} rows are valid")
+        elif report.get('message'):
+            self.stdout.write(self.style.ERROR(report['message']))
+        else:
+            style = self.style.SUCCESS if report['success'] else self.style.WARNING
+            self.stdout.write(
+                style(f"Registered {report['created_count']} farmers, {report['failed_count']} rows failed")
+            )
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farms', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='plot',
+            index=models.Index(fields=['-created_at', '-id'], name='plot_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='farm',
+            index=models.Index(fields=['-created_at', '-id'], name='farm_created_keyset_idx'),
+        ),
+    ]
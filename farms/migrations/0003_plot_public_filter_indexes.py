@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farms', '0002_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='plot',
+            index=models.Index(Upper('village'), name='plot_village_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plot',
+            index=models.Index(Upper('district'), name='plot_district_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plot',
+            index=models.Index(Upper('state'), name='plot_state_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plot',
+            index=models.Index(fields=['updated_at'], name='plot_updated_at_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ import uuid
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 from django.contrib.gis.db import models as gis_models
 
@@ -116,11 +117,31 @@ class Plot(models.Model):
         unique_together = ('gat_number', 'plot_number', 'village', 'taluka', 'district')
         indexes = [
             models.Index(fields=['gat_number', 'plot_number']),
+            models.Index(fields=['-created_at', '-id'], name='plot_created_keyset_idx'),
+            # Case-insensitive exact filters and Last-Modified on the public endpoint
+            models.Index(Upper('village'), name='plot_village_upper_idx'),
+            models.Index(Upper('district'), name='plot_district_upper_idx'),
+            models.Index(Upper('state'), name='plot_state_upper_idx'),
+            models.Index(fields=['updated_at'], name='plot_updated_at_idx'),
         ]
 
     def __str__(self):
         return f"Gat {self.gat_number} / Plot {self.plot_number or 'N/A'} – {self.village or 'Unknown'}"
 
+    @property
+    def fastapi_plot_id(self) -> str:
+        """
+        Plot ID in the format used by the FastAPI services:
+          - GAT_PLOT when both numbers are set
+          - GAT when only the GAT number is set
+          - plot_<id> otherwise
+        """
+        if self.gat_number and self.plot_number:
+            return f"{self.gat_number}_{self.plot_number}"
+        if self.gat_number:
+            return self.gat_number
+        return f"plot_{self.id}"
+
     def save(self, *args, **kwargs):
         """Override save to auto-assign farmer and sync with all FastAPI services"""
         is_new = self.pk is None
@@ -295,6 +316,9 @@ class Farm(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='farm_created_keyset_idx'),
+        ]
 
     def __str__(self):
         return f"{self.farm_owner.username} – {self.farm_uid}"
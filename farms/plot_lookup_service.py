@@ -0,0 +1,218 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from django.contrib.gis.geos import Point
+from django.db import connection
+
+from .models import Farm, Plot
+
+logger = logging.getLogger(__name__)
+
+
+class PlotLookupService:
+    """
+    Resolves GPS coordinates to the plot whose boundary contains them.
+
+    Lookups run as a single set-based query against the GiST index on
+    ``Plot.boundary`` (one round trip per batch, not per point) and results
+    are kept in a small in-process LRU cache keyed on coordinates snapped to
+    a ~1 m grid, so repeated readings from the same sensor or device are free.
+
+    Lookups restricted to a set of plots (a requester's scope) filter the
+    candidates inside the query, so an overlapping smaller plot outside the
+    scope cannot hide a match; their answers are not cached, as the cache
+    holds the unrestricted ones.
+    """
+
+    # Coordinates are snapped to this many decimal places (~1.1 m) before
+    # querying and caching, so every point in a grid cell gets the same answer.
+    CACHE_PRECISION = 5
+    CACHE_MAX_ENTRIES = 50000
+    CACHE_TTL_SECONDS = 300
+
+    # Maximum number of points sent to the database in one query
+    BATCH_SIZE = 5000
+
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    @staticmethod
+    def find_plot_id(lng: float, lat: float, plots=None) -> Optional[int]:
+        """
+        Get the ID of the plot containing a single coordinate.
+
+        Args:
+            lng: Longitude (WGS84)
+            lat: Latitude (WGS84)
+            plots: Plots that may match (the requester's scope); all plots if None
+
+        Returns:
+            int: Plot ID or None if no plot boundary contains the point
+        """
+        return PlotLookupService.find_plot_ids([(lng, lat)], plots)[0]
+
+    @staticmethod
+    def find_plot_ids(points: Iterable, plots=None) -> List[Optional[int]]:
+        """
+        Resolve a batch of coordinates to plot IDs.
+
+        Args:
+            points: Iterable of GEOS Points or (lng, lat) pairs
+            plots: Plots that may match (the requester's scope); all plots if None
+
+        Returns:
+            list: Plot ID (or None) for each input point, in input order
+        """
+        keys = [PlotLookupService._cache_key(point) for point in points]
+        results: List[Optional[int]] = [None] * len(keys)
+
+        if plots is not None:
+            resolved = PlotLookupService._resolve(list({key for key in keys if key is not None}), plots)
+            return [resolved.get(key) if key is not None else None for key in keys]
+
+        # Serve what we can from the cache and collect the unique misses
+        misses = {}
+        now = time.monotonic()
+        with PlotLookupService._cache_lock:
+            for index, key in enumerate(keys):
+                if key is None:
+                    continue
+                cached = PlotLookupService._cache.get(key)
+                if cached is not None and cached[1] > now:
+                    PlotLookupService._cache.move_to_end(key)
+                    results[index] = cached[0]
+                else:
+                    misses.setdefault(key, []).append(index)
+
+        if not misses:
+            return results
+
+        miss_keys = list(misses.keys())
+        resolved = PlotLookupService._resolve(miss_keys)
+
+        expires_at = time.monotonic() + PlotLookupService.CACHE_TTL_SECONDS
+        with PlotLookupService._cache_lock:
+            for key in miss_keys:
+                plot_id = resolved.get(key)
+                for index in misses[key]:
+                    results[index] = plot_id
+                # Negative results are cached too; points outside every plot
+                # are the common case for stray GPS readings.
+                PlotLookupService._cache[key] = (plot_id, expires_at)
+                PlotLookupService._cache.move_to_end(key)
+            while len(PlotLookupService._cache) > PlotLookupService.CACHE_MAX_ENTRIES:
+                PlotLookupService._cache.popitem(last=False)
+
+        return results
+
+    @staticmethod
+    def find_plot(lng: float, lat: float) -> Optional[Plot]:
+        """Get the Plot instance containing a coordinate, if any."""
+        plot_id = PlotLookupService.find_plot_id(lng, lat)
+        if plot_id is None:
+            return None
+        return Plot.objects.filter(id=plot_id).first()
+
+    @staticmethod
+    def find_farm_for_point(point, farms=None) -> Optional[Farm]:
+        """
+        Get the farm a located object (image, sensor, irrigation) belongs to.
+
+        Uses the most recently created farm on the plot containing the point;
+        with ``farms``, only plots carrying one of those farms are considered.
+
+        Args:
+            point: GEOS Point or (lng, lat) pair
+            farms: Farms that may be matched (the requester's scope); all farms if None
+
+        Returns:
+            Farm: Matching farm or None
+        """
+        key = PlotLookupService._cache_key(point)
+        if key is None:
+            return None
+        plots = None if farms is None else Plot.objects.filter(id__in=farms.values('plot_id'))
+        plot_id = PlotLookupService.find_plot_ids([key], plots)[0]
+        if plot_id is None:
+            return None
+        if farms is None:
+            farms = Farm.objects.all()
+        return farms.filter(plot_id=plot_id).order_by('-created_at').first()
+
+    @staticmethod
+    def clear_cache():
+        """Drop all cached lookups (called when plot boundaries change)."""
+        with PlotLookupService._cache_lock:
+            PlotLookupService._cache.clear()
+
+    @staticmethod
+    def _cache_key(point) -> Optional[Tuple[float, float]]:
+        """Normalise a point to a snapped (lng, lat) tuple, or None if invalid."""
+        try:
+            if isinstance(point, Point):
+                lng, lat = point.x, point.y
+            else:
+                lng, lat = point[0], point[1]
+            lng, lat = float(lng), float(lat)
+        except (TypeError, ValueError, IndexError):
+            return None
+
+        if not (-180.0 <= lng <= 180.0 and -90.0 <= lat <= 90.0):
+            return None
+
+        precision = PlotLookupService.CACHE_PRECISION
+        return (round(lng, precision), round(lat, precision))
+
+    @staticmethod
+    def _resolve(keys: Sequence[Tuple[float, float]], plots=None) -> dict:
+        """Query snapped coordinates in chunks of BATCH_SIZE"""
+        resolved = {}
+        for start in range(0, len(keys), PlotLookupService.BATCH_SIZE):
+            chunk = keys[start:start + PlotLookupService.BATCH_SIZE]
+            resolved.update(PlotLookupService._query_plot_ids(chunk, plots))
+        return resolved
+
+    @staticmethod
+    def _query_plot_ids(keys: Sequence[Tuple[float, float]], plots=None) -> dict:
+        """
+        Run one point-in-polygon query for a chunk of snapped coordinates.
+
+        ST_Covers on geography is index-aware, so each point probes the GiST
+        index on the boundary column. When plots overlap, the smallest one wins
+        (among ``plots``, if given).
+        """
+        table = connection.ops.quote_name(Plot._meta.db_table)
+        scope_sql, scope_params = '', []
+        if plots is not None:
+            subquery, scope_params = plots.values('id').query.sql_with_params()
+            scope_sql = f"AND p.id IN ({subquery})"
+        sql = f"""
+            SELECT pts.idx, match.id
+            FROM unnest(%s::integer[], %s::double precision[], %s::double precision[])
+                 AS pts(idx, lng, lat)
+            CROSS JOIN LATERAL (
+                SELECT p.id
+                FROM {table} p
+                WHERE p.boundary IS NOT NULL
+                  AND ST_Covers(
+                      p.boundary,
+                      ST_SetSRID(ST_MakePoint(pts.lng, pts.lat), 4326)::geography
+                  )
+                  {scope_sql}
+                ORDER BY ST_Area(p.boundary), p.id
+                LIMIT 1
+            ) AS match
+        """
+        indexes = list(range(len(keys)))
+        lngs = [key[0] for key in keys]
+        lats = [key[1] for key in keys]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [indexes, lngs, lats, *scope_params])
+            rows = cursor.fetchall()
+
+        logger.debug(f"Plot lookup resolved {len(rows)}/{len(keys)} points")
+        return {keys[idx]: plot_id for idx, plot_id in rows}
@@ -4,6 +4,8 @@ from rest_framework_gis.fields import GeometryField
 from django.contrib.auth import get_user_model
 import json
 
+from farm_management.serializers import SparseFieldsetMixin
+
 from .models import (
     SoilType,
     CropType,
@@ -36,7 +38,7 @@ class CropTypeSerializer(serializers.ModelSerializer):
         fields = ['id', 'crop_type', 'plantation_type', 'planting_method']
 
 
-class PlotSerializer(serializers.ModelSerializer):
+class PlotSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # Replace read-only method fields with writeable GeometryFields
     location = GeometryField(required=False, allow_null=True)
     boundary = GeometryField(required=False, allow_null=True)
@@ -73,9 +75,50 @@ class PlotSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ['farmer', 'created_by', 'created_at', 'updated_at']
+        expandable_fields = {
+            'farmer': {'label': 'username'},
+            'created_by': {'label': 'username'},
+        }
+
+    def validate_boundary(self, value):
+        """Repair, orient and clip the boundary with the batch geometry pipeline"""
+        if value is None:
+            return value
+        from .geometry_batch_service import GeometryBatchService
+        result = GeometryBatchService.process_polygon(value)
+        if result['error']:
+            raise serializers.ValidationError(result['error'])
+        return result['geometry']
+
+
+class FarmFromLocationMixin:
+    """
+    Lets clients omit ``farm`` when a location is supplied; the farm is then
+    resolved from the plot whose boundary contains the point, among the
+    farms in the ``location_farms`` context (the requester's scope).
+    """
+
+    def validate(self, data):
+        data = super().validate(data)
+        if data.get('farm'):
+            return data
+        if self.instance is not None and self.instance.farm_id:
+            return data
+        if not data.get('location'):
+            raise serializers.ValidationError({'farm': 'This field is required.'})
+
+        from .plot_lookup_service import PlotLookupService
+        farm = PlotLookupService.find_farm_for_point(data['location'], self.context.get('location_farms'))
+        if farm is None:
+            raise serializers.ValidationError({
+                'farm': 'No farm found at the given location. Please specify farm.'
+            })
+        data['farm'] = farm
+        return data
 
 
-class FarmImageSerializer(serializers.ModelSerializer):
+class FarmImageSerializer(FarmFromLocationMixin, serializers.ModelSerializer):
+    location = GeometryField(required=False, allow_null=True)
     uploaded_by = UserSerializer(read_only=True)
 
     class Meta:
@@ -85,19 +128,21 @@ class FarmImageSerializer(serializers.ModelSerializer):
             'farm',
             'title',
             'image',
+            'location',
             'capture_date',
             'notes',
             'uploaded_by',
             'uploaded_at',
         ]
         read_only_fields = ['uploaded_by', 'uploaded_at']
+        extra_kwargs = {'farm': {'required': False}}
 
     def create(self, validated_data):
         validated_data['uploaded_by'] = self.context['request'].user
         return super().create(validated_data)
 
 
-class FarmSensorSerializer(serializers.ModelSerializer):
+class FarmSensorSerializer(FarmFromLocationMixin, serializers.ModelSerializer):
     location = GeometryField(required=False, allow_null=True)
 
     class Meta:
@@ -112,9 +157,10 @@ class FarmSensorSerializer(serializers.ModelSerializer):
             'last_maintenance',
             'status',
         ]
+        extra_kwargs = {'farm': {'required': False}}
 
 
-class FarmIrrigationSerializer(serializers.ModelSerializer):
+class FarmIrrigationSerializer(FarmFromLocationMixin, serializers.ModelSerializer):
     location = GeometryField()
     irrigation_type_name = serializers.CharField(source='irrigation_type.name', read_only=True)
     irrigation_type_display = serializers.CharField(source='irrigation_type.get_name_display', read_only=True)
@@ -140,9 +186,11 @@ class FarmIrrigationSerializer(serializers.ModelSerializer):
             'emitters_count',
         ]
         read_only_fields = ['id', 'farm_uid', 'irrigation_type_name', 'irrigation_type_display']
+        extra_kwargs = {'farm': {'required': False}}
 
     def validate(self, data):
         """Validate irrigation-specific fields based on irrigation type"""
+        data = super().validate(data)
         irrigation_type = data.get('irrigation_type')
         
         if irrigation_type:
@@ -165,7 +213,7 @@ class FarmIrrigationSerializer(serializers.ModelSerializer):
         return data
 
 
-class FarmWithIrrigationSerializer(serializers.ModelSerializer):
+class FarmWithIrrigationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for creating farms with irrigation in a single request"""
     farm_owner = UserSerializer(read_only=True)
     farm_owner_id = serializers.PrimaryKeyRelatedField(
@@ -260,6 +308,14 @@ class FarmWithIrrigationSerializer(serializers.ModelSerializer):
             'boundary_geojson',
         ]
         read_only_fields = ['farm_uid', 'farm_owner', 'created_by', 'created_at', 'updated_at']
+        expandable_fields = {
+            'farm_owner': {'label': 'username'},
+            'created_by': {'label': 'username'},
+            # PlotSerializer's own expandable fields supply plot__farmer and plot__created_by
+            'plot': {'label': 'fastapi_plot_id'},
+            'soil_type': {'label': 'name'},
+            'crop_type': {'label': 'crop_type'},
+        }
 
     def create(self, validated_data):
         """Create farm and irrigation in a single transaction"""
@@ -325,7 +381,7 @@ class FarmWithIrrigationSerializer(serializers.ModelSerializer):
         
         return farm
 
-class FarmSerializer(serializers.ModelSerializer):
+class FarmSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     farm_owner = UserSerializer(read_only=True)
     farm_owner_id = serializers.PrimaryKeyRelatedField(
         source='farm_owner',
@@ -389,6 +445,14 @@ class FarmSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ['farm_uid', 'farm_owner', 'created_by', 'created_at', 'updated_at']
+        expandable_fields = {
+            'farm_owner': {'label': 'username'},
+            'created_by': {'label': 'username'},
+            # PlotSerializer's own expandable fields supply plot__farmer and plot__created_by
+            'plot': {'label': 'fastapi_plot_id'},
+            'soil_type': {'label': 'name'},
+            'crop_type': {'label': 'crop_type'},
+        }
 
     def create(self, validated_data):
         user = self.context['request'].user
@@ -1,7 +1,14 @@
-from django.db.models.signals import pre_delete, post_delete
+from collections import Counter
+
+from django.db.models import DEFERRED
+from django.db.models.signals import pre_delete, post_delete, post_init, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Plot, Farm, FarmIrrigation
+from farm_management.versions import ModelVersionService
+from .models import (
+    SoilType, CropType, IrrigationType, SensorType,
+    Plot, Farm, FarmIrrigation, FarmSensor, FarmImage,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -129,3 +136,188 @@ def log_irrigation_deletion(sender, instance, **kwargs):
         pass
     
     logger.info(f"Irrigation system {instance.id} deleted (farm: {farm_info})")
+
+
+@receiver(post_save, sender=User)
+def track_last_registered_farmer(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Keep each field officer's "last registered farmer" (used to auto-assign
+    new plots and farms) up to date
+    """
+    if raw or not instance.role_id or instance.role_name != 'farmer':
+        return
+    if update_fields and not {'role', 'created_by'} & set(update_fields):
+        return
+    from .auto_assignment_service import AutoAssignmentService
+    if created:
+        AutoAssignmentService.farmer_registered(instance)
+    else:
+        # An existing user may have become this officer's farmer: look it up again
+        AutoAssignmentService.forget_last_farmer(instance.created_by_id)
+
+
+@receiver(post_save, sender=Plot)
+@receiver(post_delete, sender=Plot)
+def clear_plot_lookup_cache(sender, instance, **kwargs):
+    """
+    Drop cached point-in-polygon lookups whenever a plot boundary may have changed
+    """
+    from .plot_lookup_service import PlotLookupService
+    PlotLookupService.clear_cache()
+
+
+def _loaded_owner(instance, attr):
+    """
+    Owner id as loaded from the database, before any unsaved reassignment.
+
+    The hierarchy receivers run ahead of ``count_saved_row``, which resets
+    ``_loaded_stats_owners`` once the counters have moved.
+    """
+    owner_id = getattr(instance, '_loaded_stats_owners', {}).get(attr)
+    return None if owner_id is DEFERRED else owner_id
+
+
+@receiver(post_save, sender=Plot)
+@receiver(post_delete, sender=Plot)
+def invalidate_plot_hierarchy_snapshots(sender, instance, **kwargs):
+    """
+    Plots appear in the cached manager/owner hierarchies under their farmer,
+    and a plot handed to another farmer also leaves the previous one's
+    """
+    from users.hierarchy_cache_service import HierarchyCacheService
+    HierarchyCacheService.user_updated([instance.farmer_id, _loaded_owner(instance, 'farmer_id')])
+
+
+@receiver(post_save, sender=Farm)
+@receiver(post_delete, sender=Farm)
+def invalidate_farm_hierarchy_snapshots(sender, instance, **kwargs):
+    """
+    Farms appear in the cached manager/owner hierarchies under their owner and plot
+    """
+    from users.hierarchy_cache_service import HierarchyCacheService
+    plot_farmer_id = Plot.objects.filter(pk=instance.plot_id).values_list('farmer_id', flat=True).first() if instance.plot_id else None
+    HierarchyCacheService.user_updated(
+        [instance.farm_owner_id, _loaded_owner(instance, 'farm_owner_id'), plot_farmer_id]
+    )
+
+
+@receiver(post_save, sender=SoilType)
+@receiver(post_delete, sender=SoilType)
+@receiver(post_save, sender=CropType)
+@receiver(post_delete, sender=CropType)
+@receiver(post_save, sender=IrrigationType)
+@receiver(post_delete, sender=IrrigationType)
+@receiver(post_save, sender=SensorType)
+@receiver(post_delete, sender=SensorType)
+@receiver(post_save, sender=Plot)
+@receiver(post_delete, sender=Plot)
+@receiver(post_save, sender=Farm)
+@receiver(post_delete, sender=Farm)
+@receiver(post_save, sender=FarmIrrigation)
+@receiver(post_delete, sender=FarmIrrigation)
+@receiver(post_save, sender=FarmSensor)
+@receiver(post_delete, sender=FarmSensor)
+@receiver(post_save, sender=FarmImage)
+@receiver(post_delete, sender=FarmImage)
+def bump_farm_model_version(sender, instance, raw=False, **kwargs):
+    """
+    Move the model's change version on so conditional GETs see the change
+    """
+    if raw:
+        return
+    ModelVersionService.bump(sender._meta.label)
+
+
+# UserStats counters kept per owning user: {model: {owner attribute: counter}}
+STATS_OWNER_FIELDS = {
+    Plot: {'farmer_id': 'plots_count', 'created_by_id': 'created_plots_count'},
+    Farm: {'farm_owner_id': 'farms_count', 'created_by_id': 'created_farms_count'},
+}
+IRRIGATION_OWNER_FIELDS = {'farm_owner_id': 'irrigations_count', 'created_by_id': 'created_irrigations_count'}
+
+
+def _owner_deltas(fields, old, new, weight=1):
+    """Counter deltas for a row whose owners went from ``old`` to ``new``"""
+    deltas = Counter()
+    for attr, counter in fields.items():
+        old_id, new_id = old.get(attr), new.get(attr)
+        if old_id is DEFERRED or old_id == new_id:
+            # Unchanged, or never loaded so the previous owner is unknown
+            continue
+        deltas[(old_id, counter)] -= weight
+        deltas[(new_id, counter)] += weight
+    return deltas
+
+
+def _irrigation_owners(farm_id):
+    if not farm_id:
+        return {}
+    row = Farm.objects.filter(pk=farm_id).values('farm_owner_id', 'created_by_id').first()
+    return row or {}
+
+
+@receiver(post_init, sender=Plot)
+@receiver(post_init, sender=Farm)
+@receiver(post_init, sender=FarmIrrigation)
+def remember_stats_owners(sender, instance, **kwargs):
+    """Remember the loaded owner IDs so a reassignment can be counted on save"""
+    attrs = STATS_OWNER_FIELDS.get(sender, {'farm_id': None})
+    instance._loaded_stats_owners = {attr: instance.__dict__.get(attr, DEFERRED) for attr in attrs}
+
+
+@receiver(post_save, sender=Plot)
+@receiver(post_save, sender=Farm)
+def count_saved_row(sender, instance, created, raw=False, **kwargs):
+    """Move plot/farm counters between users when a row is created or reassigned"""
+    if raw:
+        return
+    from users.stats_service import UserStatsService
+
+    fields = STATS_OWNER_FIELDS[sender]
+    old = {} if created else instance._loaded_stats_owners
+    new = {attr: instance.__dict__.get(attr) for attr in fields}
+    deltas = _owner_deltas(fields, old, new)
+
+    if sender is Farm and not created:
+        # The farm's irrigations follow its owner and creator
+        old_owners = {'farm_owner_id': old.get('farm_owner_id'), 'created_by_id': old.get('created_by_id')}
+        if _owner_deltas(IRRIGATION_OWNER_FIELDS, old_owners, new):
+            deltas.update(_owner_deltas(IRRIGATION_OWNER_FIELDS, old_owners, new, instance.irrigations.count()))
+
+    UserStatsService.apply(deltas)
+    instance._loaded_stats_owners = {attr: instance.__dict__.get(attr, DEFERRED) for attr in fields}
+
+
+@receiver(post_delete, sender=Plot)
+@receiver(post_delete, sender=Farm)
+def count_deleted_row(sender, instance, **kwargs):
+    """Take a deleted plot/farm off its users' counters"""
+    from users.stats_service import UserStatsService
+    fields = STATS_OWNER_FIELDS[sender]
+    UserStatsService.apply(_owner_deltas(fields, {attr: getattr(instance, attr) for attr in fields}, {}))
+
+
+@receiver(post_save, sender=FarmIrrigation)
+def count_saved_irrigation(sender, instance, created, raw=False, **kwargs):
+    """Count an irrigation under its farm's owner and creator"""
+    if raw:
+        return
+    from users.stats_service import UserStatsService
+
+    old_farm_id = None if created else instance._loaded_stats_owners.get('farm_id')
+    if old_farm_id is DEFERRED or old_farm_id == instance.farm_id:
+        return
+    UserStatsService.apply(_owner_deltas(
+        IRRIGATION_OWNER_FIELDS, _irrigation_owners(old_farm_id), _irrigation_owners(instance.farm_id)
+    ))
+    instance._loaded_stats_owners = {'farm_id': instance.farm_id}
+
+
+@receiver(post_delete, sender=FarmIrrigation)
+def count_deleted_irrigation(sender, instance, **kwargs):
+    """
+    Take a deleted irrigation off its farm's owner and creator. When the farm
+    itself is being deleted its row is still there at this point.
+    """
+    from users.stats_service import UserStatsService
+    UserStatsService.apply(_owner_deltas(IRRIGATION_OWNER_FIELDS, _irrigation_owners(instance.farm_id), {}))
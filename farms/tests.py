@@ -1,3 +1,742 @@
-from django.test import TestCase
-
-# Create your tests here.
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from uuid import UUID
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point, Polygon
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from users.models import Role
+from .models import CropType, Farm, FarmImage, FarmIrrigation, FarmSensor, IrrigationType, Plot
+
+User = get_user_model()
+
+
+class MyFarmersQueryBudgetTests(APITestCase):
+    """my-farmers must run a fixed number of queries however many farmers there are"""
+
+    QUERY_BUDGET = 8
+
+    def setUp(self):
+        self.farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        fieldofficer_role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        self.irrigation_type = IrrigationType.objects.create(name='drip')
+        self.field_officer = User.objects.create_user(
+            username='officer',
+            email='officer@example.com',
+            password='officer-pass-123',
+            role=fieldofficer_role,
+        )
+        self.client.force_authenticate(self.field_officer)
+
+    def _create_farmers(self, count, start=0):
+        for i in range(start, start + count):
+            farmer = User.objects.create_user(
+                username=f'farmer{i}',
+                email=f'farmer{i}@example.com',
+                password='farmer-pass-123',
+                role=self.farmer_role,
+                created_by=self.field_officer,
+            )
+            plot = Plot(
+                gat_number=f'GAT{i}',
+                plot_number='1',
+                village='Village',
+                district='District',
+                state='State',
+                farmer=farmer,
+                created_by=self.field_officer,
+            )
+            plot._skip_fastapi_sync = True
+            plot.save()
+            farm = Farm.objects.create(
+                farm_owner=farmer,
+                created_by=self.field_officer,
+                plot=plot,
+                address='Farm address',
+                area_size='2.50',
+            )
+            FarmIrrigation.objects.create(
+                farm=farm,
+                irrigation_type=self.irrigation_type,
+                location=Point(73.85, 18.52, srid=4326),
+            )
+
+    def _get_my_farmers(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/farms/my-farmers/', {'page_size': 100})
+        self.assertEqual(response.status_code, 200)
+        return len(queries.captured_queries), response
+
+    def test_query_count_does_not_grow_with_farmers(self):
+        self._create_farmers(2)
+        small_count, _ = self._get_my_farmers()
+
+        self._create_farmers(10, start=2)
+        large_count, response = self._get_my_farmers()
+
+        self.assertEqual(small_count, large_count)
+        self.assertLessEqual(large_count, self.QUERY_BUDGET)
+        self.assertEqual(response.data['summary']['total_farmers'], 12)
+        self.assertEqual(response.data['summary']['total_plots'], 12)
+        self.assertEqual(response.data['summary']['total_irrigations'], 12)
+        self.assertEqual(len(response.data['farmers']), 12)
+
+    def test_results_are_paginated(self):
+        self._create_farmers(5)
+
+        response = self.client.get('/api/farms/my-farmers/', {'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['farmers']), 2)
+        self.assertEqual(response.data['pagination']['count'], 5)
+        self.assertEqual(response.data['summary']['total_farms'], 5)
+
+
+class SparseFieldsetQueryBudgetTests(APITestCase):
+    """?fields= and ?expand= join what they render, so list query counts do not grow with rows"""
+
+    REQUESTS = (
+        ('/api/farms/', {}),
+        ('/api/farms/', {'expand': 'plot'}),
+        ('/api/farms/', {'expand': 'farm_owner,created_by,soil_type,crop_type'}),
+        ('/api/farms/', {'fields': 'id,plot,farm_owner'}),
+        ('/api/farms/', {'fields': 'id,plot', 'expand': ''}),
+        ('/api/plots/', {}),
+        ('/api/plots/', {'expand': 'farmer'}),
+        ('/api/plots/', {'fields': 'id,created_by'}),
+    )
+
+    def setUp(self):
+        self.farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        self.crop_type = CropType.objects.create(crop_type='sugarcane', plantation_type='suru')
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin-pass-123')
+        self.client.force_authenticate(self.admin)
+
+    def _create_farms(self, count, start=0):
+        for i in range(start, start + count):
+            farmer = User.objects.create_user(
+                username=f'farmer{i}', email=f'farmer{i}@example.com', password='farmer-pass-123',
+                role=self.farmer_role, created_by=self.admin,
+            )
+            plot = Plot(gat_number=f'GAT{i}', village='Village', farmer=farmer, created_by=self.admin)
+            plot._skip_fastapi_sync = True
+            plot.save()
+            Farm.objects.create(
+                farm_owner=farmer, created_by=self.admin, plot=plot, address='Farm address', area_size='1.00',
+                crop_type=self.crop_type,
+            )
+
+    def _count_queries(self, url, params):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {**params, 'page_size': 100})
+        self.assertEqual(response.status_code, 200)
+        return len(queries.captured_queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self._create_farms(1)
+        small_counts = [self._count_queries(url, params) for url, params in self.REQUESTS]
+
+        self._create_farms(5, start=1)
+        for (url, params), small_count in zip(self.REQUESTS, small_counts):
+            with self.subTest(url=url, params=params):
+                self.assertEqual(self._count_queries(url, params), small_count)
+
+
+class PlotLookupTests(APITestCase):
+    """lookup and location-linked records only see plots and farms in the user's scope"""
+
+    INSIDE_A = (73.85, 18.52)
+    INSIDE_B = (74.05, 18.72)
+    OUTSIDE = (75.0, 19.5)
+
+    def setUp(self):
+        from .plot_lookup_service import PlotLookupService
+        PlotLookupService.clear_cache()
+
+        farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        fieldofficer_role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        self.irrigation_type = IrrigationType.objects.create(name='drip')
+        self.officer_a = User.objects.create_user(
+            username='officer_a', email='officer_a@example.com', password='officer-pass-123', role=fieldofficer_role,
+        )
+        self.officer_b = User.objects.create_user(
+            username='officer_b', email='officer_b@example.com', password='officer-pass-123', role=fieldofficer_role,
+        )
+        farmer = User.objects.create_user(
+            username='farmer', email='farmer@example.com', password='farmer-pass-123', role=farmer_role,
+        )
+        self.plot_a, self.farm_a = self._create_plot('A', self.INSIDE_A, self.officer_a, farmer)
+        self.plot_b, self.farm_b = self._create_plot('B', self.INSIDE_B, self.officer_b, farmer)
+
+    def _create_plot(self, gat_number, center, officer, farmer, size=0.01):
+        lng, lat = center
+        plot = Plot(
+            gat_number=gat_number,
+            village='Village',
+            farmer=farmer,
+            created_by=officer,
+            boundary=Polygon((
+                (lng - size, lat - size), (lng + size, lat - size), (lng + size, lat + size),
+                (lng - size, lat + size), (lng - size, lat - size),
+            ), srid=4326),
+        )
+        plot._skip_fastapi_sync = True
+        plot.save()
+        farm = Farm.objects.create(
+            farm_owner=farmer, created_by=officer, plot=plot, address='Farm address', area_size='2.50',
+        )
+        return plot, farm
+
+    def test_get_lookup_finds_plot_in_scope(self):
+        self.client.force_authenticate(self.officer_a)
+        response = self.client.get('/api/plots/lookup/', {'lng': self.INSIDE_A[0], 'lat': self.INSIDE_A[1]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['plot_id'], self.plot_a.id)
+        self.assertEqual(response.data['plot']['gat_number'], 'A')
+
+    def test_get_lookup_hides_plot_outside_scope(self):
+        self.client.force_authenticate(self.officer_b)
+        response = self.client.get('/api/plots/lookup/', {'lng': self.INSIDE_A[0], 'lat': self.INSIDE_A[1]})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data['plot_id'])
+        self.assertIsNone(response.data['plot'])
+
+    def test_batch_lookup_is_scoped(self):
+        points = [list(self.INSIDE_A), list(self.INSIDE_B), list(self.OUTSIDE)]
+
+        self.client.force_authenticate(self.officer_a)
+        response = self.client.post('/api/plots/lookup/', {'points': points}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['plot_id'] for result in response.data['results']], [self.plot_a.id, None, None])
+        self.assertEqual(response.data['matched'], 1)
+
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin-pass-123')
+        self.client.force_authenticate(admin)
+        response = self.client.post('/api/plots/lookup/', {'points': points}, format='json')
+        self.assertEqual(
+            [result['plot_id'] for result in response.data['results']], [self.plot_a.id, self.plot_b.id, None]
+        )
+
+    def test_smaller_plot_outside_scope_does_not_hide_a_match(self):
+        # officer_b's small plot lies inside officer_a's plot, around the same point
+        small_plot, _ = self._create_plot('C', self.INSIDE_A, self.officer_b, self.farm_a.farm_owner, size=0.001)
+
+        self.client.force_authenticate(self.officer_a)
+        response = self.client.get('/api/plots/lookup/', {'lng': self.INSIDE_A[0], 'lat': self.INSIDE_A[1]})
+        self.assertEqual(response.data['plot_id'], self.plot_a.id)
+        response = self._post_irrigation(self.INSIDE_A)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['farm'], self.farm_a.id)
+
+        self.client.force_authenticate(self.officer_b)
+        response = self.client.post('/api/plots/lookup/', {'points': [list(self.INSIDE_A)]}, format='json')
+        self.assertEqual(response.data['results'][0]['plot_id'], small_plot.id)
+
+    def _post_irrigation(self, point):
+        return self.client.post('/api/farm-irrigations/', {
+            'irrigation_type': self.irrigation_type.id,
+            'location': {'type': 'Point', 'coordinates': list(point)},
+        }, format='json')
+
+    def test_irrigation_without_farm_is_linked_by_location(self):
+        self.client.force_authenticate(self.officer_a)
+        response = self._post_irrigation(self.INSIDE_A)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['farm'], self.farm_a.id)
+        self.assertTrue(FarmIrrigation.objects.filter(farm=self.farm_a).exists())
+
+    def test_irrigation_is_not_linked_to_farm_outside_scope(self):
+        self.client.force_authenticate(self.officer_b)
+        response = self._post_irrigation(self.INSIDE_A)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('farm', response.data)
+        self.assertFalse(FarmIrrigation.objects.exists())
+
+    def test_irrigation_outside_every_plot_needs_farm(self):
+        self.client.force_authenticate(self.officer_a)
+        response = self._post_irrigation(self.OUTSIDE)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('farm', response.data)
+
+
+class GeometryBatchServiceTests(SimpleTestCase):
+    """Parsing, swapped coordinates, orientation and repair of plot boundaries"""
+
+    SQUARE = [[73.8, 18.5], [73.9, 18.5], [73.9, 18.6], [73.8, 18.6], [73.8, 18.5]]
+
+    def _process(self, coordinates, **kwargs):
+        from .geometry_batch_service import GeometryBatchService
+        return GeometryBatchService.process_polygon(
+            {'type': 'Polygon', 'coordinates': coordinates}, as_geos=False, **kwargs
+        )
+
+    def test_parse_errors_are_reported_per_item(self):
+        from .geometry_batch_service import GeometryBatchService
+        results = GeometryBatchService.process_polygons([
+            '{not json',
+            {'coordinates': []},
+            {'type': 'Point', 'coordinates': [73.8, 18.5]},
+            {'type': 'Polygon', 'coordinates': [self.SQUARE]},
+        ], as_geos=False)
+        self.assertEqual(results[0]['error'], 'Geometry is not valid JSON')
+        self.assertEqual(results[1]['error'], "GeoJSON must have 'type' field")
+        self.assertEqual(results[2]['error'], 'Geometry must be a Polygon')
+        self.assertIsNone(results[3]['error'])
+        self.assertGreater(results[3]['area_acres'], 0)
+
+    def test_swapped_coordinates_are_flipped(self):
+        result = self._process([[[lat, lng] for lng, lat in self.SQUARE]])
+        self.assertIsNone(result['error'])
+        self.assertTrue(result['swapped'])
+        self.assertEqual(result['geometry'].bounds, (73.8, 18.5, 73.9, 18.6))
+
+    def test_clockwise_rings_are_reoriented(self):
+        hole = [[73.84, 18.54], [73.86, 18.54], [73.86, 18.56], [73.84, 18.56], [73.84, 18.54]]
+        for coordinates in ([self.SQUARE[::-1]], [self.SQUARE[::-1], hole]):
+            result = self._process(coordinates)
+            self.assertIsNone(result['error'])
+            self.assertTrue(result['reoriented'])
+            self.assertTrue(result['geometry'].exterior.is_ccw)
+
+    def test_spike_is_repaired_without_losing_area(self):
+        plain = self._process([self.SQUARE])
+        spiked = self._process([[
+            [73.8, 18.5], [73.9, 18.5], [73.9, 18.6], [73.85, 18.6], [73.85, 18.65],
+            [73.85, 18.6], [73.8, 18.6], [73.8, 18.5],
+        ]])
+        self.assertIsNone(spiked['error'])
+        self.assertTrue(spiked['repaired'])
+        self.assertEqual(spiked['area_acres'], plain['area_acres'])
+
+    def test_bowtie_is_rejected_not_halved(self):
+        result = self._process([[[73.8, 18.5], [73.9, 18.6], [73.9, 18.5], [73.8, 18.6], [73.8, 18.5]]])
+        self.assertIn('splits into 2 parts', result['error'])
+        self.assertIsNone(result['geometry'])
+
+    def test_clipping_that_splits_the_polygon_is_rejected(self):
+        # A U crossing the eastern edge of the bounding box: its two arms remain inside
+        result = self._process([[
+            [96, 20], [99, 20], [99, 23], [96, 23], [96, 22.5], [98, 22.5], [98, 20.5], [96, 20.5], [96, 20],
+        ]])
+        self.assertIn('split into 2 parts', result['error'])
+
+        result = self._process([[[96, 20], [99, 20], [99, 22], [96, 22], [96, 20]]])
+        self.assertIsNone(result['error'])
+        self.assertTrue(result['clipped'])
+
+
+class KeysetPaginationTests(APITestCase):
+    """?pagination=keyset walks every row once, in order, including rows that tie on created_at"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin-pass-123')
+        self.client.force_authenticate(self.admin)
+        for i in range(7):
+            plot = Plot(gat_number=f'GAT{i}', village='Village', created_by=self.admin)
+            plot._skip_fastapi_sync = True
+            plot.save()
+        # Half the plots share one timestamp, so the id tiebreaker decides their order
+        tied = Plot.objects.order_by('id').values_list('id', flat=True)[:4]
+        Plot.objects.filter(id__in=list(tied)).update(created_at=Plot.objects.order_by('id').first().created_at)
+
+    def test_pages_cover_every_plot_in_keyset_order(self):
+        expected = list(Plot.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        seen = []
+        url = '/api/plots/?pagination=keyset&page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(plot['id'] for plot in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/plots/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class PublicPlotsConditionalGetTests(APITestCase):
+    """The public plots ETag follows every model the response renders"""
+
+    def setUp(self):
+        cache.clear()
+        farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        self.farmer = User.objects.create_user(
+            username='farmer', email='farmer@example.com', password='farmer-pass-123',
+            role=farmer_role, first_name='Ram',
+        )
+        self.crop_type = CropType.objects.create(crop_type='sugarcane', plantation_type='adsali')
+        plot = Plot(gat_number='GAT1', village='Village', farmer=self.farmer)
+        plot._skip_fastapi_sync = True
+        plot.save()
+        Farm.objects.create(
+            farm_owner=self.farmer, plot=plot, address='Farm address', area_size='2.50', crop_type=self.crop_type,
+        )
+
+    def _get(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get('/api/plots/public/', **headers)
+
+    def test_unchanged_plots_answer_304_without_queries(self):
+        etag = self._get()['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self._get(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries.captured_queries), 0)
+
+    def test_farmer_change_moves_the_etag(self):
+        etag = self._get()['ETag']
+        self.farmer.first_name = 'Shyam'
+        self.farmer.save()
+
+        response = self._get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['results'][0]['farmer']['full_name'], 'Shyam')
+
+    def test_crop_type_change_moves_the_etag(self):
+        etag = self._get()['ETag']
+        self.crop_type.plantation_type = 'suru'
+        self.crop_type.save()
+
+        response = self._get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['farms'][0]['plantation_type_code'], 'suru')
+
+
+class ConditionalGetTests(APITestCase):
+    """Authenticated list/detail GETs revalidate against model change versions"""
+
+    def setUp(self):
+        cache.clear()
+        fieldofficer_role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        self.officer = User.objects.create_user(
+            username='officer', email='officer@example.com', password='officer-pass-123', role=fieldofficer_role,
+        )
+        self.other_officer = User.objects.create_user(
+            username='other_officer', email='other_officer@example.com', password='officer-pass-123',
+            role=fieldofficer_role,
+        )
+        plot = Plot(gat_number='GAT1', village='Village', created_by=self.officer)
+        plot._skip_fastapi_sync = True
+        plot.save()
+        self.farm = Farm.objects.create(
+            farm_owner=self.officer, created_by=self.officer, plot=plot, address='Farm address', area_size='2.50',
+        )
+        self.client.force_authenticate(self.officer)
+
+    def test_unchanged_list_answers_304(self):
+        response = self.client.get('/api/farm-irrigations/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertIn('Authorization', [header.strip() for header in response['Vary'].split(',')])
+
+        response = self.client.get('/api/farm-irrigations/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_or_other_user_gets_a_new_etag(self):
+        etag = self.client.get('/api/farms/').get('ETag')
+
+        self.client.force_authenticate(self.other_officer)
+        self.assertEqual(self.client.get('/api/farms/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.client.force_authenticate(self.officer)
+        self.farm.address = 'New address'
+        self.farm.save()
+        response = self.client.get('/api/farms/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_superusers_do_not_share_my_farms_responses(self):
+        superusers = [
+            User.objects.create_superuser(username=f'admin{i}', email=f'admin{i}@example.com', password='admin-pass-123')
+            for i in range(2)
+        ]
+        farm_ids = {}
+        for superuser in superusers:
+            plot = Plot(gat_number=f'GAT_{superuser.username}', village='Village', farmer=superuser, created_by=superuser)
+            plot._skip_fastapi_sync = True
+            plot.save()
+            farm_ids[superuser] = Farm.objects.create(
+                farm_owner=superuser, created_by=superuser, plot=plot, address='Farm address', area_size='1.00',
+            ).pk
+
+        for url in ('/api/farms/', '/api/plots/'):
+            etags = set()
+            for superuser in superusers:
+                with self.subTest(url=url, user=superuser.username):
+                    self.client.force_authenticate(superuser)
+                    response = self.client.get(url, {'my_farms': 'true'})
+                    self.assertEqual(response['X-Cache'], 'MISS')
+                    self.assertEqual(len(response.data['results']), 1)
+                    etags.add(response['ETag'])
+            self.assertEqual(len(etags), 2)
+        response = self.client.get('/api/farms/', {'my_farms': 'true'})
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual([farm['id'] for farm in response.data['results']], [farm_ids[superusers[1]]])
+
+    def test_stats_follow_a_write(self):
+        self.assertEqual(self.client.get('/api/farms/stats/?group_by=village').data['total'], 1)
+
+        Farm.objects.create(
+            farm_owner=self.officer, created_by=self.officer, plot=self.farm.plot, address='Second address',
+            area_size='1.00',
+        )
+        response = self.client.get('/api/farms/stats/?group_by=village')
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(response.data['groups'], [{'village': 'Village', 'count': 2}])
+
+
+class RoleScopingTests(APITestCase):
+    """Field officers see only what hangs off the farms they created; every other role sees all rows"""
+
+    def setUp(self):
+        cache.clear()
+        fieldofficer_role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        manager_role = Role.objects.create(name='manager', display_name='Manager')
+        farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        self.superuser = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin-pass-123',
+        )
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='manager-pass-123', role=manager_role,
+        )
+        self.officer = User.objects.create_user(
+            username='officer', email='officer@example.com', password='officer-pass-123', role=fieldofficer_role,
+        )
+        self.other_officer = User.objects.create_user(
+            username='other_officer', email='other_officer@example.com', password='officer-pass-123',
+            role=fieldofficer_role,
+        )
+        self.farmer = User.objects.create_user(
+            username='farmer', email='farmer@example.com', password='farmer-pass-123', role=farmer_role,
+        )
+        self.rows = {
+            self.officer: self._create_farm_rows('GAT1', self.officer),
+            self.other_officer: self._create_farm_rows('GAT2', self.other_officer),
+        }
+
+    def _create_farm_rows(self, gat_number, officer):
+        plot = Plot(gat_number=gat_number, village='Village', farmer=self.farmer, created_by=officer)
+        plot._skip_fastapi_sync = True
+        plot.save()
+        farm = Farm.objects.create(
+            farm_owner=self.farmer, created_by=officer, plot=plot, address='Farm address', area_size='1.00',
+        )
+        location = Point(73.85, 18.52, srid=4326)
+        return {
+            '/api/plots/': plot.pk,
+            '/api/farms/': farm.pk,
+            '/api/farm-images/': FarmImage.objects.create(
+                farm=farm, title='Image', image='farm_images/image.jpg', uploaded_by=officer,
+            ).pk,
+            '/api/farm-sensors/': FarmSensor.objects.create(farm=farm, name='Sensor', location=location).pk,
+            '/api/farm-irrigations/': FarmIrrigation.objects.create(farm=farm, location=location).pk,
+        }
+
+    def _visible_ids(self, user, url):
+        self.client.force_authenticate(user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data['results']}
+
+    def test_field_officer_sees_only_their_own_farms_rows(self):
+        for url, row_id in self.rows[self.officer].items():
+            with self.subTest(url=url):
+                self.assertEqual(self._visible_ids(self.officer, url), {row_id})
+
+    def test_other_roles_see_every_row(self):
+        for user in (self.superuser, self.manager, self.farmer):
+            for url in self.rows[self.officer]:
+                with self.subTest(user=user.username, url=url):
+                    expected = {rows[url] for rows in self.rows.values()}
+                    self.assertEqual(self._visible_ids(user, url), expected)
+
+
+class FastJSONTests(SimpleTestCase):
+    """FastJSONRenderer/FastJSONParser round-trip the values API responses contain"""
+
+    def setUp(self):
+        from farm_management.renderers import FastJSONParser, FastJSONRenderer
+        self.renderer = FastJSONRenderer()
+        self.parser = FastJSONParser()
+        self.data = {
+            'area_size': Decimal('2.50'),
+            'created_at': datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=dt_timezone.utc),
+            'plantation_date': date(2024, 5, 6),
+            'farm_uid': UUID('12345678-1234-5678-1234-567812345678'),
+            'location': Point(73.85, 18.52, srid=4326),
+            'farms': [{'id': 1, 'crops': None}],
+        }
+        self.expected = {
+            'area_size': 2.5,
+            'created_at': '2024-05-06T07:08:09.123456Z',
+            'plantation_date': '2024-05-06',
+            'farm_uid': '12345678-1234-5678-1234-567812345678',
+            'location': {'type': 'Point', 'coordinates': [73.85, 18.52]},
+            'farms': [{'id': 1, 'crops': None}],
+        }
+
+    def _parse(self, content):
+        from io import BytesIO
+        return self.parser.parse(BytesIO(content))
+
+    def test_orjson_is_installed(self):
+        from farm_management.renderers import is_fast_json_available
+        self.assertTrue(is_fast_json_available())
+
+    def test_round_trip(self):
+        self.assertEqual(self._parse(self.renderer.render(self.data)), self.expected)
+
+    def test_matches_the_stdlib_path(self):
+        # An indent parameter takes DRF's stdlib renderer
+        indented = self.renderer.render(self.data, 'application/json; indent=2', {})
+        self.assertEqual(self._parse(indented), self._parse(self.renderer.render(self.data)))
+
+    def test_invalid_json_is_a_parse_error(self):
+        from io import BytesIO
+        from rest_framework.exceptions import ParseError
+        with self.assertRaises(ParseError):
+            self.parser.parse(BytesIO(b'{"unterminated": '))
+
+
+class BulkRegistrationServiceTests(TestCase):
+    """Bad values are reported for their row, and a failing chunk does not lose the committed ones"""
+
+    CSV_HEADER = 'username,email,password,first_name,last_name,plot_gat_number,plot_village,plot_district,plot_state,farm_address,farm_area_size,farm_soil_type_id\n'
+
+    def setUp(self):
+        Role.objects.create(name='farmer', display_name='Farmer')
+        fieldofficer_role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        self.field_officer = User.objects.create_user(
+            username='officer', email='officer@example.com', password='officer-pass-123', role=fieldofficer_role,
+        )
+
+    def _row(self, i, area_size='2.50', soil_type_id=''):
+        return (
+            f'farmer{i},farmer{i}@example.com,farmer-pass-123,First,Last,'
+            f'GAT{i},Village,District,State,Farm address,{area_size},{soil_type_id}\n'
+        )
+
+    def _register(self, content, **kwargs):
+        from .bulk_registration_service import BulkFarmerRegistrationService
+        rows = BulkFarmerRegistrationService.parse_csv(content)
+        return BulkFarmerRegistrationService.register_farmers(rows, self.field_officer, **kwargs)
+
+    def test_bad_values_are_reported_per_row(self):
+        content = self.CSV_HEADER + self._row(1) + self._row(2, area_size='two') + self._row(3, soil_type_id='loam')
+        report = self._register(content, dry_run=True)
+
+        self.assertEqual(report['valid_rows'], 1)
+        errors = {error['row']: error['errors'] for error in report['errors']}
+        self.assertEqual(sorted(errors), [2, 3])
+        self.assertIn('Plot 1 farm area_size', errors[2][0])
+        self.assertIn("soil type id must be a whole number, got 'loam'", errors[3][0])
+        self.assertFalse(User.objects.filter(username__startswith='farmer').exists())
+
+    def test_valid_rows_are_registered_with_skip_invalid(self):
+        content = self.CSV_HEADER + self._row(1) + self._row(2, area_size='123456789012')
+        report = self._register(content, skip_invalid=True)
+
+        self.assertEqual((report['created_count'], report['failed_count']), (1, 1))
+        farm = Farm.objects.select_related('farm_owner', 'plot').get()
+        self.assertEqual((farm.farm_owner.username, farm.plot.gat_number), ('farmer1', 'GAT1'))
+        self.assertEqual(farm.area_size, Decimal('2.50'))
+
+    def test_failing_chunk_keeps_the_committed_ones(self):
+        from unittest import mock
+        from django.core.exceptions import ValidationError as DjangoValidationError
+        from .bulk_registration_service import BulkFarmerRegistrationService
+
+        insert_chunk = BulkFarmerRegistrationService._insert_chunk
+        calls = []
+
+        def failing_second_chunk(chunk, field_officer, references):
+            calls.append(chunk)
+            if len(calls) == 2:
+                raise DjangoValidationError('bad value')
+            return insert_chunk(chunk, field_officer, references)
+
+        content = self.CSV_HEADER + self._row(1) + self._row(2)
+        with mock.patch.object(BulkFarmerRegistrationService, '_insert_chunk', side_effect=failing_second_chunk), \
+                mock.patch.object(BulkFarmerRegistrationService, '_after_insert') as after_insert:
+            report = self._register(content, chunk_size=1)
+
+        self.assertEqual((report['created_count'], report['failed_count']), (1, 1))
+        self.assertEqual(report['errors'], [{'row': 2, 'username': 'farmer2', 'errors': ['Insert failed: bad value']}])
+        farmer = User.objects.get(username='farmer1')
+        self.assertEqual(after_insert.call_args[0][0], [farmer.pk])
+        self.assertFalse(User.objects.filter(username='farmer2').exists())
+
+
+class AutoAssignmentTests(TestCase):
+    """Each officer's last registered farmer is cached per officer and follows deletes and moves"""
+
+    def setUp(self):
+        cache.clear()
+        self.farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        fieldofficer_role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        self.officer_a = User.objects.create_user(
+            username='officer_a', email='officer_a@example.com', password='officer-pass-123', role=fieldofficer_role,
+        )
+        self.officer_b = User.objects.create_user(
+            username='officer_b', email='officer_b@example.com', password='officer-pass-123', role=fieldofficer_role,
+        )
+
+    def _create_farmer(self, username, officer, **extra):
+        return User.objects.create_user(
+            username=username, email=f'{username}@example.com', password='farmer-pass-123',
+            role=self.farmer_role, created_by=officer, **extra
+        )
+
+    def _recent(self, officer):
+        from .auto_assignment_service import AutoAssignmentService
+        return AutoAssignmentService.get_most_recent_farmer_by_field_officer(officer)
+
+    def test_each_officer_gets_their_own_latest_farmer(self):
+        self._create_farmer('farmer_a1', self.officer_a)
+        farmer_a2 = self._create_farmer('farmer_a2', self.officer_a)
+        farmer_b1 = self._create_farmer('farmer_b1', self.officer_b)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self._recent(self.officer_a), farmer_a2)
+        self.assertEqual(self._recent(self.officer_b), farmer_b1)
+
+    def test_cache_miss_uses_the_index(self):
+        farmer = self._create_farmer('farmer_a1', self.officer_a)
+        cache.clear()
+
+        self.assertEqual(self._recent(self.officer_a), farmer)
+        with self.assertNumQueries(1):
+            self.assertEqual(self._recent(self.officer_a), farmer)
+
+    def test_deleted_farmer_falls_back_to_the_previous_one(self):
+        farmer_a1 = self._create_farmer('farmer_a1', self.officer_a)
+        self._create_farmer('farmer_a2', self.officer_a).delete()
+
+        self.assertEqual(self._recent(self.officer_a), farmer_a1)
+
+    def test_moved_farmer_follows_its_new_officer(self):
+        farmer_a1 = self._create_farmer('farmer_a1', self.officer_a)
+        farmer_a2 = self._create_farmer('farmer_a2', self.officer_a)
+        self.assertIsNone(self._recent(self.officer_b))
+
+        farmer_a2.created_by = self.officer_b
+        farmer_a2.save()
+
+        self.assertEqual(self._recent(self.officer_a), farmer_a1)
+        self.assertEqual(self._recent(self.officer_b), farmer_a2)
+
+    def test_farmers_older_than_the_window_are_not_assigned(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        self._create_farmer('farmer_a1', self.officer_a, date_joined=timezone.now() - timedelta(hours=2))
+
+        self.assertIsNone(self._recent(self.officer_a))
@@ -8,6 +8,12 @@ from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
+from django.db.models.functions import TruncMonth
+from farm_management.mixins import (
+    ConditionalGetMixin, GroupedStatsMixin, IdempotentPostMixin, ResponseCacheMixin, RoleScopedQuerysetMixin,
+)
+from farm_management.pagination import SelectablePagination
+from farm_management.serializers import setup_eager_loading
 from .models import (
     SoilType,
     CropType,
@@ -32,6 +38,50 @@ from .serializers import (
 )
 
 
+def _farm_tree_prefetch():
+    """Prefetch for a plot's farms together with their irrigations"""
+    from django.db.models import Prefetch
+    return Prefetch(
+        'farms',
+        queryset=Farm.objects.select_related(
+            'crop_type', 'soil_type', 'farm_owner', 'created_by'
+        ).prefetch_related(
+            Prefetch('irrigations', queryset=FarmIrrigation.objects.select_related('irrigation_type'))
+        )
+    )
+
+
+# Models whose changes can alter farm/plot responses (nested owners, types,
+# irrigations, and the user's own role scope)
+FARM_VERSION_MODELS = (
+    'farms.Farm', 'farms.Plot', 'farms.FarmIrrigation', 'farms.FarmImage', 'farms.FarmSensor',
+    'farms.SoilType', 'farms.CropType', 'farms.IrrigationType', 'farms.SensorType',
+    'users.User', 'users.Role',
+)
+
+
+# Farms a user may see, and attach located images, sensors and irrigations to
+FARM_ROLE_SCOPES = {'fieldofficer': lambda qs, user: qs.filter(created_by=user)}
+
+# Plots a user may see
+PLOT_ROLE_SCOPES = {'fieldofficer': lambda qs, user: qs.filter(farms__created_by=user)}
+
+
+class LocatedFarmMixin:
+    """
+    Viewsets whose records may omit ``farm`` and be linked by location
+    (FarmFromLocationMixin): only farms in the user's scope are matched.
+    """
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        farms = Farm.objects.all()
+        scoped = self.scope_queryset(farms, FARM_ROLE_SCOPES)
+        # None for users seeing every farm: their lookups can use the shared cache
+        context['location_farms'] = None if scoped is farms else scoped
+        return context
+
+
 class IsOwnerOrAdminOrManager(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         user = request.user
@@ -55,8 +105,10 @@ class IsOwnerOrAdminOrManager(permissions.BasePermission):
         return False
 
 
-class SoilTypeViewSet(viewsets.ModelViewSet):
+class SoilTypeViewSet(ResponseCacheMixin, viewsets.ModelViewSet):
     queryset = SoilType.objects.all()
+    version_models = ('farms.SoilType',)
+    response_cache_shared = True
     serializer_class = SoilTypeSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -66,8 +118,10 @@ class SoilTypeViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
 
 
-class CropTypeViewSet(viewsets.ModelViewSet):
+class CropTypeViewSet(ResponseCacheMixin, viewsets.ModelViewSet):
     queryset = CropType.objects.all()
+    version_models = ('farms.CropType',)
+    response_cache_shared = True
     serializer_class = CropTypeSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -77,12 +131,30 @@ class CropTypeViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
 
 
-class FarmViewSet(viewsets.ModelViewSet):
+class FarmViewSet(IdempotentPostMixin, ResponseCacheMixin, RoleScopedQuerysetMixin, GroupedStatsMixin, viewsets.ModelViewSet):
     queryset = Farm.objects.all()
+    version_models = FARM_VERSION_MODELS
+    response_cache_actions = ('list', 'retrieve', 'recent_farmers', 'my_farmers', 'my_profile')
+    # Create-and-sync endpoints mobile clients retry on flaky networks
+    idempotent_actions = ('register_farmer', 'quick_farmer_registration', 'bulk_register_farmers', 'sync_plots_to_apis')
+    role_scopes = FARM_ROLE_SCOPES
+    # ?my_farms=true filters on the requester, so role peers must not share those entries
+    user_scoped_params = ('my_farms',)
     serializer_class = FarmSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ['soil_type', 'crop_type', 'farm_owner']
     search_fields = ['address', 'farm_owner__username']
+    pagination_class = SelectablePagination
+    keyset_ordering = ('-created_at', '-id')
+    stats_dimensions = {
+        'crop_type': 'crop_type__crop_type',
+        'plantation_type': 'crop_type__plantation_type',
+        'soil_type': 'soil_type__name',
+        'village': 'plot__village',
+        'district': 'plot__district',
+        'month': TruncMonth('created_at'),
+        'plantation_month': TruncMonth('plantation_date'),
+    }
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -134,10 +206,10 @@ class FarmViewSet(viewsets.ModelViewSet):
             )
 
         # field officer sees farms they created
-        if user.has_role('fieldofficer'):
-            qs = qs.filter(created_by=user)
+        qs = self.scope_queryset(qs)
 
-        return qs
+        # join only the relations ?fields= / ?expand= will render
+        return setup_eager_loading(self.get_serializer_class(), qs, self.request)
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -169,43 +241,34 @@ class FarmViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Only field officers can access this endpoint'}, status=403)
 
         try:
+            from django.db.models import Prefetch
             from django.contrib.auth import get_user_model
-            from django.contrib.auth.models import User as AuthUser
+            from farm_management.pagination import StandardPagination
             User = get_user_model()
 
-            # Get all farmers created by this field officer
+            # Get all farmers created by this field officer, with the whole
+            # plot -> farm -> irrigation tree loaded in a fixed number of queries
             farmers = User.objects.filter(
                 created_by=user,
                 role__name='farmer'
-            ).select_related('role').order_by('-date_joined')
+            ).select_related('role').prefetch_related(
+                Prefetch('plots', queryset=Plot.objects.prefetch_related(_farm_tree_prefetch()))
+            ).order_by('-date_joined', '-id')
+
+            paginator = StandardPagination()
+            page = paginator.paginate_queryset(farmers, request, view=self)
 
             def serialize_farmer_with_plots(farmer):
                 """Serialize farmer with their plot details"""
                 if not farmer:
                     return None
 
-                # Get all plots for this farmer
-                plots = Plot.objects.filter(farmer=farmer).select_related('farmer', 'created_by')
                 plot_data = []
 
-                for plot in plots:
-                    # Generate the same plot ID format used by FastAPI services
-                    def generate_fastapi_plot_id(plot_instance):
-                        """Generate plot ID in the same format as FastAPI services"""
-                        if plot_instance.gat_number and plot_instance.plot_number:
-                            return f"{plot_instance.gat_number}_{plot_instance.plot_number}"
-                        elif plot_instance.gat_number:
-                            return plot_instance.gat_number
-                        else:
-                            return f"plot_{plot_instance.id}"
-
-                    fastapi_plot_id = generate_fastapi_plot_id(plot)
-
-                    # Get farm details for this plot
-                    farms = plot.farms.all().select_related('crop_type', 'soil_type').prefetch_related('irrigations__irrigation_type')
+                for plot in farmer.plots.all():
                     farm_details = []
 
-                    for farm in farms:
+                    for farm in plot.farms.all():
                         # Get irrigation details
                         irrigation_details = []
                         for irrigation in farm.irrigations.all():
@@ -241,7 +304,7 @@ class FarmViewSet(viewsets.ModelViewSet):
 
                     plot_info = {
                         'id': plot.id,
-                        'fastapi_plot_id': fastapi_plot_id,
+                        'fastapi_plot_id': plot.fastapi_plot_id,
                         'gat_number': plot.gat_number,
                         'plot_number': plot.plot_number,
                         'village': plot.village,
@@ -291,11 +354,12 @@ class FarmViewSet(viewsets.ModelViewSet):
                 return farmer_data
 
             # Serialize farmers with plot details
-            farmers_data = [serialize_farmer_with_plots(farmer) for farmer in farmers]
+            farmers_data = [serialize_farmer_with_plots(farmer) for farmer in page]
 
             return Response({
                 'farmers': farmers_data,
-                'count': farmers.count()
+                'count': paginator.page.paginator.count,
+                'pagination': paginator.get_page_metadata()
             })
 
         except Exception as e:
@@ -398,6 +462,74 @@ class FarmViewSet(viewsets.ModelViewSet):
                 'error': str(e)
             }, status=400)
 
+    @action(detail=False, methods=['post'], url_path='bulk-register-farmers')
+    def bulk_register_farmers(self, request):
+        """
+        Register many farmers at once from JSON or an uploaded CSV file.
+
+        JSON:
+        {
+            "farmers": [<register-farmer request>, ...],
+            "skip_invalid": false,
+            "dry_run": false
+        }
+        CSV (multipart "file"): one farmer per line; farmer columns unprefixed,
+        plot/farm/irrigation columns prefixed plot_, farm_, irrigation_
+        (plot_latitude and plot_longitude for the location).
+
+        The whole batch is validated first and every row's errors are
+        reported; nothing is written unless all rows are valid or
+        skip_invalid is set.
+        """
+        user = request.user
+
+        # Check if user is field officer
+        if not user.has_role('fieldofficer'):
+            return Response(
+                {'error': 'Only field officers can register farmers'},
+                status=403
+            )
+
+        try:
+            from .bulk_registration_service import BulkFarmerRegistrationService
+
+            def flag(name):
+                value = request.data.get(name, False)
+                if isinstance(value, str):
+                    return value.strip().lower() in ('true', '1', 'yes')
+                return bool(value)
+
+            upload = request.FILES.get('file')
+            if upload is not None:
+                rows = BulkFarmerRegistrationService.parse_csv(upload.read())
+            else:
+                rows = request.data.get('farmers')
+                if not isinstance(rows, list):
+                    return Response({
+                        'success': False,
+                        'error': 'Provide a "farmers" list or a CSV "file"'
+                    }, status=400)
+
+            report = BulkFarmerRegistrationService.register_farmers(
+                rows,
+                user,
+                skip_invalid=flag('skip_invalid'),
+                dry_run=flag('dry_run')
+            )
+            if report['dry_run']:
+                status_code = 200
+            elif report['created_count']:
+                status_code = 201
+            else:
+                status_code = 400
+            return Response(report, status=status_code)
+
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=400)
+
     @action(detail=False, methods=['post'], url_path='quick-farmer-registration')
     def quick_farmer_registration(self, request):
         """
@@ -560,59 +692,54 @@ class FarmViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            from .models import Plot, Farm
-            from users.serializers import UserSerializer
+            from django.db.models import Count, Prefetch
             from django.contrib.auth import get_user_model
+            from users.serializers import UserSerializer
+            from users.stats_service import UserStatsService
+            from farm_management.pagination import StandardPagination
             User = get_user_model()
 
-            # Find all farmers who have plots or farms created by this field officer
-            farmers_via_plots = User.objects.filter(
-                plots__created_by=user
-            ).distinct()
-
-            farmers_via_farms = User.objects.filter(
-                farms__created_by=user
-            ).distinct()
-
-            # Combine and get unique farmers
-            farmer_ids = set()
-            for farmer in farmers_via_plots:
-                farmer_ids.add(farmer.id)
-            for farmer in farmers_via_farms:
-                farmer_ids.add(farmer.id)
+            officer_plots = Plot.objects.filter(created_by=user)
+            officer_farms = Farm.objects.filter(created_by=user)
 
+            # Farmers who have plots or farms created by this field officer
             farmers = User.objects.filter(
-                id__in=farmer_ids,
+                Q(id__in=officer_plots.values('farmer_id')) | Q(id__in=officer_farms.values('farm_owner_id')),
                 role__name='farmer'
-            ).order_by('-date_joined')
+            ).order_by('-date_joined', '-id')
+
+            # Summary totals are the officer's maintained counters (a primary-key read)
+            officer_stats = UserStatsService.get(user.pk)
+
+            paginator = StandardPagination()
+            page = paginator.paginate_queryset(
+                farmers.select_related('role', 'created_by__role').prefetch_related(
+                    Prefetch(
+                        'plots',
+                        queryset=officer_plots.order_by('-created_at'),
+                        to_attr='officer_plots'
+                    ),
+                    Prefetch(
+                        'farms',
+                        queryset=officer_farms.select_related('soil_type', 'crop_type').annotate(
+                            irrigations_count=Count('irrigations')
+                        ).order_by('-created_at'),
+                        to_attr='officer_farms'
+                    ),
+                ),
+                request,
+                view=self
+            )
 
-            # Prepare detailed response with related data
             farmers_data = []
-
-            for farmer in farmers:
-                # Get plots created by this field officer for this farmer
-                plots = Plot.objects.filter(
-                    farmer=farmer,
-                    created_by=user
-                ).order_by('-created_at')
-
-                # Get farms created by this field officer for this farmer
-                farms = Farm.objects.filter(
-                    farm_owner=farmer,
-                    created_by=user
-                ).order_by('-created_at')
-
-                # Count total irrigations across all farms
-                total_irrigations = 0
-                for farm in farms:
-                    total_irrigations += farm.irrigations.count()
-
+            for farmer in page:
+                # Per-farmer counts come from the rows already prefetched for the page
                 farmer_data = {
                     'farmer': UserSerializer(farmer).data,
                     'registration_summary': {
-                        'plots_count': plots.count(),
-                        'farms_count': farms.count(),
-                        'irrigations_count': total_irrigations,
+                        'plots_count': len(farmer.officer_plots),
+                        'farms_count': len(farmer.officer_farms),
+                        'irrigations_count': sum(farm.irrigations_count for farm in farmer.officer_farms),
                         'registration_date': farmer.date_joined.strftime('%Y-%m-%d %H:%M:%S') if farmer.date_joined else None,
                     },
                     'plots': [
@@ -627,7 +754,7 @@ class FarmViewSet(viewsets.ModelViewSet):
                             'has_location': bool(plot.location),
                             'has_boundary': bool(plot.boundary),
                         }
-                        for plot in plots
+                        for plot in farmer.officer_plots
                     ],
                     'farms': [
                         {
@@ -640,18 +767,13 @@ class FarmViewSet(viewsets.ModelViewSet):
                             'plantation_type': farm.crop_type.plantation_type if farm.crop_type else None,
                             'planting_method': farm.crop_type.planting_method if farm.crop_type else None,
                             'created_at': farm.created_at.strftime('%Y-%m-%d %H:%M:%S') if farm.created_at else None,
-                            'irrigations_count': farm.irrigations.count(),
+                            'irrigations_count': farm.irrigations_count,
                         }
-                        for farm in farms
+                        for farm in farmer.officer_farms
                     ]
                 }
                 farmers_data.append(farmer_data)
 
-            # Summary statistics
-            total_plots = sum(farmer['registration_summary']['plots_count'] for farmer in farmers_data)
-            total_farms = sum(farmer['registration_summary']['farms_count'] for farmer in farmers_data)
-            total_irrigations = sum(farmer['registration_summary']['irrigations_count'] for farmer in farmers_data)
-
             return Response({
                 'success': True,
                 'field_officer': {
@@ -660,11 +782,12 @@ class FarmViewSet(viewsets.ModelViewSet):
                     'full_name': f"{user.first_name} {user.last_name}".strip() or user.username,
                 },
                 'summary': {
-                    'total_farmers': len(farmers_data),
-                    'total_plots': total_plots,
-                    'total_farms': total_farms,
-                    'total_irrigations': total_irrigations,
+                    'total_farmers': paginator.page.paginator.count,
+                    'total_plots': officer_stats.created_plots_count,
+                    'total_farms': officer_stats.created_farms_count,
+                    'total_irrigations': officer_stats.created_irrigations_count,
                 },
+                'pagination': paginator.get_page_metadata(),
                 'farmers': farmers_data
             }, status=200)
 
@@ -694,54 +817,27 @@ class FarmViewSet(viewsets.ModelViewSet):
             }, status=403)
 
         try:
-            from .models import Plot, Farm
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-
-            # Generate the same plot ID format used by FastAPI services
-            def generate_fastapi_plot_id(plot_instance):
-                """Generate plot ID in the same format as FastAPI services"""
-                if plot_instance.gat_number and plot_instance.plot_number:
-                    return f"{plot_instance.gat_number}_{plot_instance.plot_number}"
-                elif plot_instance.gat_number:
-                    return plot_instance.gat_number
-                else:
-                    return f"plot_{plot_instance.id}"
-
-            # Get all plots owned by this farmer
-            plots = Plot.objects.filter(farmer=user).select_related('farmer', 'created_by')
+            from django.db.models import Count, Sum
+            from farm_management.pagination import StandardPagination
+            from .models import IrrigationType
+
+            # Get all plots owned by this farmer, with farms and irrigations
+            # prefetched so the page is built in a fixed number of queries
+            plots = Plot.objects.filter(farmer=user).select_related(
+                'farmer', 'created_by__role'
+            ).prefetch_related(_farm_tree_prefetch()).order_by('-created_at', '-id')
+
+            paginator = StandardPagination()
+            page = paginator.paginate_queryset(plots, request, view=self)
             plot_data = []
 
-            total_farms = 0
-            total_irrigations = 0
-            crop_types = set()
-            plantation_types = set()
-            irrigation_types = set()
-
-            for plot in plots:
-                fastapi_plot_id = generate_fastapi_plot_id(plot)
-
-                # Get farm details for this plot
-                farms = plot.farms.all().select_related('crop_type', 'soil_type').prefetch_related('irrigations__irrigation_type')
+            for plot in page:
                 farm_details = []
 
-                for farm in farms:
-                    total_farms += 1
-
-                    # Collect statistics
-                    if farm.crop_type and farm.crop_type.crop_type:
-                        crop_types.add(farm.crop_type.crop_type)
-                    if farm.crop_type and farm.crop_type.plantation_type:
-                        plantation_types.add(farm.crop_type.get_plantation_type_display())
-
+                for farm in plot.farms.all():
                     # Get irrigation details
                     irrigation_details = []
                     for irrigation in farm.irrigations.all():
-                        total_irrigations += 1
-
-                        if irrigation.irrigation_type:
-                            irrigation_types.add(irrigation.irrigation_type.get_name_display())
-
                         irrigation_info = {
                             'id': irrigation.id,
                             'irrigation_type': irrigation.irrigation_type.get_name_display() if irrigation.irrigation_type else None,
@@ -811,7 +907,7 @@ class FarmViewSet(viewsets.ModelViewSet):
 
                 plot_info = {
                     'id': plot.id,
-                    'fastapi_plot_id': fastapi_plot_id,
+                    'fastapi_plot_id': plot.fastapi_plot_id,
                     'gat_number': plot.gat_number,
                     'plot_number': plot.plot_number,
                     'address': {
@@ -899,21 +995,39 @@ class FarmViewSet(viewsets.ModelViewSet):
                 } if user.role else None
             }
 
-            # Agricultural summary
+            # Agricultural summary across all plots, not just the current page
+            farms = Farm.objects.filter(plot__farmer=user)
+            irrigations = FarmIrrigation.objects.filter(farm__plot__farmer=user)
+            farm_totals = farms.aggregate(total_farms=Count('id'), total_farm_area=Sum('area_size'))
+            plantation_labels = dict(CropType.PLANTATION_TYPE_CHOICES)
+            irrigation_labels = dict(IrrigationType.IRRIGATION_CHOICES)
+
             agricultural_summary = {
-                'total_plots': len(plot_data),
-                'total_farms': total_farms,
-                'total_irrigations': total_irrigations,
-                'crop_types': list(crop_types),
-                'plantation_types': list(plantation_types),
-                'irrigation_types': list(irrigation_types),
-                'total_farm_area': sum(float(farm['area_size']) for plot in plot_data for farm in plot['farms'] if farm['area_size'])
+                'total_plots': paginator.page.paginator.count,
+                'total_farms': farm_totals['total_farms'],
+                'total_irrigations': irrigations.count(),
+                'crop_types': list(
+                    farms.exclude(crop_type__crop_type__isnull=True).exclude(crop_type__crop_type='')
+                    .order_by().values_list('crop_type__crop_type', flat=True).distinct()
+                ),
+                'plantation_types': [
+                    plantation_labels.get(value, value) for value in
+                    farms.exclude(crop_type__plantation_type__isnull=True).exclude(crop_type__plantation_type='')
+                    .order_by().values_list('crop_type__plantation_type', flat=True).distinct()
+                ],
+                'irrigation_types': [
+                    irrigation_labels.get(value, value) for value in
+                    irrigations.filter(irrigation_type__isnull=False)
+                    .order_by().values_list('irrigation_type__name', flat=True).distinct()
+                ],
+                'total_farm_area': float(farm_totals['total_farm_area'] or 0)
             }
 
             return Response({
                 'success': True,
                 'farmer_profile': farmer_profile,
                 'agricultural_summary': agricultural_summary,
+                'pagination': paginator.get_page_metadata(),
                 'plots': plot_data,
                 'fastapi_integration': {
                     'plot_ids_format': 'GAT_NUMBER_PLOT_NUMBER',
@@ -929,12 +1043,26 @@ class FarmViewSet(viewsets.ModelViewSet):
             }, status=400)
 
 
-class PlotViewSet(viewsets.ModelViewSet):
+class PlotViewSet(IdempotentPostMixin, ResponseCacheMixin, RoleScopedQuerysetMixin, GroupedStatsMixin, viewsets.ModelViewSet):
     queryset = Plot.objects.all()
+    version_models = FARM_VERSION_MODELS
+    # Creating a plot syncs it to every FastAPI service
+    idempotent_actions = ('create',)
+    role_scopes = PLOT_ROLE_SCOPES
+    user_scoped_params = ('my_farms',)
     serializer_class = PlotSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdminOrManager]
     filterset_fields = ['gat_number', 'plot_number', 'village', 'taluka', 'state']
     search_fields = ['gat_number', 'plot_number', 'village', 'district']
+    pagination_class = SelectablePagination
+    keyset_ordering = ('-created_at', '-id')
+    stats_dimensions = {
+        'village': 'village',
+        'taluka': 'taluka',
+        'district': 'district',
+        'state': 'state',
+        'month': TruncMonth('created_at'),
+    }
 
     def get_serializer_class(self):
         if self.action == 'geojson':
@@ -955,10 +1083,10 @@ class PlotViewSet(viewsets.ModelViewSet):
         if self.request.query_params.get('has_boundary') == 'true':
             qs = qs.filter(boundary__isnull=False)
 
-        if user.has_role('fieldofficer'):
-            qs = qs.filter(farms__created_by=user)
+        qs = self.scope_queryset(qs)
 
-        return qs
+        # join only the relations ?fields= / ?expand= will render
+        return setup_eager_loading(self.get_serializer_class(), qs, self.request)
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -977,103 +1105,196 @@ class PlotViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer_class()(queryset, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get', 'post'], url_path='lookup')
+    def lookup(self, request):
+        """
+        Find which plot contains the given GPS coordinates.
+        Single point:
+            GET ?lat=18.5204&lng=73.8567
+        Batch (up to 10000 points):
+            POST {"points": [[lng, lat], [lng, lat], ...]}
+        Plots outside the user's scope are reported as no match.
+        """
+        from .plot_lookup_service import PlotLookupService
+
+        if request.method == 'GET':
+            try:
+                lat = float(request.query_params.get('lat'))
+                lng = float(request.query_params.get('lng'))
+            except (TypeError, ValueError):
+                return Response({'error': 'Valid lat and lng query parameters are required'}, status=400)
+
+            plots = self._lookup_plots()
+            plot_id = PlotLookupService.find_plot_id(lng, lat, plots)
+            plot_info = None
+            if plot_id is not None:
+                plot_info = Plot.objects.filter(id=plot_id).values(
+                    'id', 'gat_number', 'plot_number', 'village', 'farmer_id'
+                ).first()
+
+            return Response({
+                'lat': lat,
+                'lng': lng,
+                'plot_id': plot_id,
+                'plot': plot_info,
+            })
+
+        points = request.data.get('points')
+        if not isinstance(points, list) or not points:
+            return Response({'error': 'points must be a non-empty list of [lng, lat] pairs'}, status=400)
+        if len(points) > 10000:
+            return Response({'error': 'A maximum of 10000 points can be resolved per request'}, status=400)
+
+        plot_ids = PlotLookupService.find_plot_ids(points, self._lookup_plots())
+        return Response({
+            'count': len(plot_ids),
+            'matched': sum(1 for plot_id in plot_ids if plot_id is not None),
+            'results': [
+                {'index': index, 'plot_id': plot_id}
+                for index, plot_id in enumerate(plot_ids)
+            ],
+        })
+
+    def _lookup_plots(self):
+        """The plots lookup may match for this user, or None for all plots (cached lookups)"""
+        plots = Plot.objects.all()
+        scoped = self.scope_queryset(plots)
+        return None if scoped is plots else scoped
+
+    PUBLIC_CACHE_TIMEOUT = 60 * 10
+    # Every model the public response renders (plots, their farms and crop types, farmer names)
+    PUBLIC_VERSION_MODELS = ('farms.Plot', 'farms.Farm', 'farms.CropType', 'users.User')
+
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
     def public(self, request):
-        """Public endpoint for plots with farm information - no authentication required"""
-        
-        # Get all plots with related data
-        queryset = Plot.objects.all().select_related(
-            'farmer', 
-            'created_by'
-        ).prefetch_related(
-            'farms__crop_type',
-            'farms__soil_type',
-            'farms__irrigations__irrigation_type',
-            'farms__farm_owner'
-        )
-        
+        """
+        Public endpoint for plots with farm information - no authentication required
+
+        Paginated (?page=&page_size=), filtered with indexed exact lookups
+        (gat_number, and case-insensitive village/district/state), and served
+        from a response cache. Responses carry ETag and Last-Modified derived
+        from the change versions of every model rendered (no query), so
+        repeat callers get a 304.
+        """
+        import hashlib
+        from django.core.cache import cache
+        from django.db.models import Prefetch
+        from django.utils.http import http_date, parse_http_date_safe, quote_etag
+        from farm_management.pagination import StandardPagination
+        from farm_management.versions import ModelVersionService
+
+        queryset = Plot.objects.all()
+
         # Apply optional filters
         if gat_number := request.query_params.get('gat_number'):
             queryset = queryset.filter(gat_number=gat_number)
         
         if village := request.query_params.get('village'):
-            queryset = queryset.filter(village__icontains=village)
+            queryset = queryset.filter(village__iexact=village)
         
         if district := request.query_params.get('district'):
-            queryset = queryset.filter(district__icontains=district)
+            queryset = queryset.filter(district__iexact=district)
         
         if state := request.query_params.get('state'):
-            queryset = queryset.filter(state__icontains=state)
-        
-        # Build response with farm information
-        plots_data = []
+            queryset = queryset.filter(state__iexact=state)
+
+        # Validators: any save or delete of a rendered model moves its version
+        versions, last_modified = ModelVersionService.get_versions(self.PUBLIC_VERSION_MODELS)
+        params = sorted(request.query_params.lists())
+        etag = quote_etag(hashlib.md5(repr((params, sorted(versions.items()))).encode()).hexdigest())
+
+        if_none_match = request.headers.get('If-None-Match')
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+        not_modified = (
+            etag in [tag.strip() for tag in if_none_match.split(',')] if if_none_match
+            else bool(if_modified_since and int(last_modified) <= if_modified_since)
+        )
+
+        def with_validators(response):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            response['Cache-Control'] = f'public, max-age={self.PUBLIC_CACHE_TIMEOUT // 10}'
+            return response
+
+        if not_modified:
+            return with_validators(Response(status=304))
+
+        # Pagination links are absolute, so the host is part of the key
+        cache_key = f"plots:public:{etag}:{hashlib.md5(request.get_host().encode()).hexdigest()}"
+        data = cache.get(cache_key)
+        if data is None:
+            queryset = queryset.select_related('farmer').prefetch_related(
+                Prefetch('farms', queryset=Farm.objects.select_related('crop_type').only(
+                    'id', 'plot_id', 'plantation_date', 'crop_type', 'crop_type__plantation_type'
+                ))
+            ).order_by('-created_at', '-id')
+
+            paginator = StandardPagination()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+
+            # Build response with farm information
+            plots_data = []
         
-        for plot in queryset:
-            # Generate FastAPI plot ID
-            if plot.gat_number and plot.plot_number:
-                fastapi_plot_id = f"{plot.gat_number}_{plot.plot_number}"
-            elif plot.gat_number:
-                fastapi_plot_id = plot.gat_number
-            else:
-                fastapi_plot_id = f"plot_{plot.id}"
+            for plot in page:
+                # Get farms for this plot
+                farms = plot.farms.all()
+                farm_details = []
             
-            # Get farms for this plot
-            farms = plot.farms.all()
-            farm_details = []
+                for farm in farms:
+                    farm_info = {
+                        'id': farm.id,
+                        'plantation_date': farm.plantation_date.isoformat() if farm.plantation_date else None,
+                        'plantation_type': farm.crop_type.get_plantation_type_display() if farm.crop_type and farm.crop_type.plantation_type else None,
+                        'plantation_type_code': farm.crop_type.plantation_type if farm.crop_type else None
+                    }
+                    farm_details.append(farm_info)
             
-            for farm in farms:
-                farm_info = {
-                    'id': farm.id,
-                    'plantation_date': farm.plantation_date.isoformat() if farm.plantation_date else None,
-                    'plantation_type': farm.crop_type.get_plantation_type_display() if farm.crop_type and farm.crop_type.plantation_type else None,
-                    'plantation_type_code': farm.crop_type.plantation_type if farm.crop_type else None
+                plot_data = {
+                    'id': plot.id,
+                    'fastapi_plot_id': plot.fastapi_plot_id,
+                    'gat_number': plot.gat_number,
+                    'plot_number': plot.plot_number,
+                    'address': {
+                        'village': plot.village,
+                        'taluka': plot.taluka,
+                        'district': plot.district,
+                        'state': plot.state,
+                        'country': plot.country,
+                        'pin_code': plot.pin_code
+                    },
+                    'location': {
+                        'type': 'Point',
+                        'coordinates': [plot.location.x, plot.location.y] if plot.location else None,
+                        'latitude': plot.location.y if plot.location else None,
+                        'longitude': plot.location.x if plot.location else None
+                    } if plot.location else None,
+                    'boundary': {
+                        'type': 'Polygon',
+                        'coordinates': list(plot.boundary.coords) if plot.boundary else None,
+                        'has_boundary': bool(plot.boundary)
+                    },
+                    'farmer': {
+                        'id': plot.farmer.id,
+                        'username': plot.farmer.username,
+                        'full_name': f"{plot.farmer.first_name} {plot.farmer.last_name}".strip() or plot.farmer.username
+                    } if plot.farmer else None,
+                    'created_at': plot.created_at.isoformat() if plot.created_at else None,
+                    'updated_at': plot.updated_at.isoformat() if plot.updated_at else None,
+                    'farms': farm_details,
+                    'farms_count': len(farm_details)
                 }
-                farm_details.append(farm_info)
-            
-            plot_data = {
-                'id': plot.id,
-                'fastapi_plot_id': fastapi_plot_id,
-                'gat_number': plot.gat_number,
-                'plot_number': plot.plot_number,
-                'address': {
-                    'village': plot.village,
-                    'taluka': plot.taluka,
-                    'district': plot.district,
-                    'state': plot.state,
-                    'country': plot.country,
-                    'pin_code': plot.pin_code
-                },
-                'location': {
-                    'type': 'Point',
-                    'coordinates': [plot.location.x, plot.location.y] if plot.location else None,
-                    'latitude': plot.location.y if plot.location else None,
-                    'longitude': plot.location.x if plot.location else None
-                } if plot.location else None,
-                'boundary': {
-                    'type': 'Polygon',
-                    'coordinates': list(plot.boundary.coords) if plot.boundary else None,
-                    'has_boundary': bool(plot.boundary)
-                },
-                'farmer': {
-                    'id': plot.farmer.id,
-                    'username': plot.farmer.username,
-                    'full_name': f"{plot.farmer.first_name} {plot.farmer.last_name}".strip() or plot.farmer.username
-                } if plot.farmer else None,
-                'created_at': plot.created_at.isoformat() if plot.created_at else None,
-                'updated_at': plot.updated_at.isoformat() if plot.updated_at else None,
-                'farms': farm_details,
-                'farms_count': len(farm_details)
-            }
-            plots_data.append(plot_data)
-        
-        return Response({
-            'count': len(plots_data),
-            'results': plots_data
-        })
+                plots_data.append(plot_data)
 
+            data = paginator.get_paginated_response(plots_data).data
+            cache.set(cache_key, data, self.PUBLIC_CACHE_TIMEOUT)
 
-class FarmImageViewSet(viewsets.ModelViewSet):
+        return with_validators(Response(data))
+
+
+class FarmImageViewSet(LocatedFarmMixin, ConditionalGetMixin, RoleScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = FarmImage.objects.all()
+    version_models = FARM_VERSION_MODELS
+    role_scopes = {'fieldofficer': lambda qs, user: qs.filter(farm__created_by=user)}
     serializer_class = FarmImageSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdminOrManager]
     filterset_fields = ['farm']
@@ -1095,14 +1316,15 @@ class FarmImageViewSet(viewsets.ModelViewSet):
         if ed := self.request.query_params.get('end_date'):
             qs = qs.filter(uploaded_at__date__lte=ed)
 
-        if user.has_role('fieldofficer'):
-            qs = qs.filter(farm__created_by=user)
+        qs = self.scope_queryset(qs)
 
         return qs
 
 
-class FarmSensorViewSet(viewsets.ModelViewSet):
+class FarmSensorViewSet(LocatedFarmMixin, ConditionalGetMixin, RoleScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = FarmSensor.objects.all()
+    version_models = FARM_VERSION_MODELS
+    role_scopes = {'fieldofficer': lambda qs, user: qs.filter(farm__created_by=user)}
     serializer_class = FarmSensorSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdminOrManager]
     filterset_fields = ['farm', 'sensor_type', 'status']
@@ -1125,20 +1347,30 @@ class FarmSensorViewSet(viewsets.ModelViewSet):
         if st := self.request.query_params.get('status'):
             qs = qs.filter(status=(st.lower() == 'true'))
 
-        if user.has_role('fieldofficer'):
-            qs = qs.filter(farm__created_by=user)
+        qs = self.scope_queryset(qs)
 
         return qs
 
 
-class FarmIrrigationViewSet(viewsets.ModelViewSet):
+class FarmIrrigationViewSet(LocatedFarmMixin, ResponseCacheMixin, RoleScopedQuerysetMixin, GroupedStatsMixin, viewsets.ModelViewSet):
     queryset = FarmIrrigation.objects.select_related('farm', 'irrigation_type').all()
+    version_models = FARM_VERSION_MODELS
+    role_scopes = {'fieldofficer': lambda qs, user: qs.filter(farm__created_by=user)}
+    user_scoped_params = ('my_farms',)
     serializer_class = FarmIrrigationSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdminOrManager]
     filterset_fields = ['farm', 'irrigation_type', 'status']
     search_fields = ['irrigation_type__name']
     ordering_fields = ['status']
     ordering = ['-id']
+    stats_dimensions = {
+        'irrigation_type': 'irrigation_type__name',
+        'status': 'status',
+        'crop_type': 'farm__crop_type__crop_type',
+        'soil_type': 'farm__soil_type__name',
+        'village': 'farm__plot__village',
+        'month': TruncMonth('farm__created_at'),
+    }
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -1157,8 +1389,7 @@ class FarmIrrigationViewSet(viewsets.ModelViewSet):
         if st := self.request.query_params.get('status'):
             qs = qs.filter(status=(st.lower() == 'true'))
 
-        if user.has_role('fieldofficer'):
-            qs = qs.filter(farm__created_by=user)
+        qs = self.scope_queryset(qs)
 
         return qs
 
@@ -1175,10 +1406,14 @@ class FarmIrrigationViewSet(viewsets.ModelViewSet):
         """Get irrigation systems grouped by type"""
         from .models import IrrigationType
         irrigation_types = IrrigationType.objects.all()
+        counts = {
+            group['irrigation_type']: group['count']
+            for group in self.get_grouped_stats(['irrigation_type'])
+        }
         result = {}
 
         for irrigation_type in irrigation_types:
-            count = self.get_queryset().filter(irrigation_type=irrigation_type).count()
+            count = counts.get(irrigation_type.name, 0)
             result[irrigation_type.name] = {
                 'display_name': irrigation_type.get_name_display(),
                 'count': count,
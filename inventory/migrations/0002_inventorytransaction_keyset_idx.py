@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorytransaction',
+            index=models.Index(fields=['-transaction_date', '-id'], name='inv_txn_date_keyset_idx'),
+        ),
+    ]
@@ -74,6 +74,9 @@ class InventoryTransaction(models.Model):
     
     class Meta:
         ordering = ['-transaction_date']
+        indexes = [
+            models.Index(fields=['-transaction_date', '-id'], name='inv_txn_date_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_transaction_type_display()} of {self.quantity} {self.inventory_item.unit} to {self.inventory_item.item_name}"
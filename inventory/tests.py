@@ -1,3 +1,43 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from users.models import Role
+from .models import InventoryItem
+
+User = get_user_model()
+
+
+class InventoryPermissionTests(APITestCase):
+    """Only superusers, admins and managers may change inventory or see its transactions"""
+
+    def setUp(self):
+        self.users = {
+            name: User.objects.create_user(
+                username=name, email=f'{name}@example.com', password='test-pass-123',
+                role=Role.objects.create(name=name, display_name=name.title()),
+            )
+            for name in ('admin', 'manager', 'fieldofficer', 'farmer')
+        }
+        self.users['superuser'] = User.objects.create_superuser(
+            username='superuser', email='superuser@example.com', password='test-pass-123',
+        )
+        self.item = InventoryItem.objects.create(
+            item_name='Urea', quantity=10, unit='kg', created_by=self.users['superuser'],
+        )
+
+    def test_admins_and_managers_may_change_inventory(self):
+        for name in ('superuser', 'admin', 'manager'):
+            with self.subTest(user=name):
+                self.client.force_authenticate(self.users[name])
+                response = self.client.post('/api/inventory/', {'item_name': f'Seeds {name}', 'quantity': 5, 'unit': 'kg'})
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual(self.client.get('/api/transactions/').status_code, 200)
+
+    def test_other_roles_may_only_read_items(self):
+        for name in ('fieldofficer', 'farmer'):
+            with self.subTest(user=name):
+                self.client.force_authenticate(self.users[name])
+                self.assertEqual(self.client.get('/api/inventory/').status_code, 200)
+                response = self.client.patch(f'/api/inventory/{self.item.pk}/', {'quantity': 0})
+                self.assertEqual(response.status_code, 403)
+                self.assertEqual(self.client.get('/api/transactions/').status_code, 403)
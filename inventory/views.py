@@ -10,6 +10,7 @@ from .serializers import (
 )
 from django.db.models import Q
 from django.utils import timezone
+from farm_management.pagination import SelectablePagination
 
 class IsAdminOrManager(permissions.BasePermission):
     """
@@ -18,7 +19,7 @@ class IsAdminOrManager(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and (
             request.user.is_superuser or 
-            request.user.role in ['admin', 'manager']
+            request.user.has_any_role(['admin', 'manager'])
         )
 
 class InventoryItemViewSet(viewsets.ModelViewSet):
@@ -150,6 +151,8 @@ class InventoryTransactionViewSet(viewsets.ModelViewSet):
     filterset_fields = ['inventory_item', 'transaction_type']
     ordering_fields = ['transaction_date']
     ordering = ['-transaction_date']
+    pagination_class = SelectablePagination
+    keyset_ordering = ('-transaction_date', '-id')
     
     def get_queryset(self):
         queryset = InventoryTransaction.objects.all()
@@ -23,6 +23,9 @@ echo "✅ Database is up and running!"
 echo "📊 Applying database migrations..."
 python manage.py migrate --noinput
 
+# Cache table (used when REDIS_URL is not set)
+python manage.py createcachetable
+
 # Collect static files
 echo "📁 Collecting static files..."
 python manage.py collectstatic --noinput
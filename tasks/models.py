@@ -34,6 +34,7 @@ class Task(models.Model):
             models.Index(fields=['priority']),
             models.Index(fields=['assigned_to']),
             models.Index(fields=['due_date']),
+            models.Index(fields=['-created_at', '-id'], name='task_created_keyset_idx'),
         ]
 
     def __str__(self):
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from users.models import Role
+from .models import Task
+
+User = get_user_model()
+
+
+class TaskScopingTests(APITestCase):
+    """Admins and managers see every task, field officers their own and assigned ones, others their assigned ones"""
+
+    def setUp(self):
+        self.users = {
+            name: User.objects.create_user(
+                username=name, email=f'{name}@example.com', password='test-pass-123',
+                role=Role.objects.create(name=name, display_name=name.title()),
+            )
+            for name in ('admin', 'manager', 'fieldofficer', 'farmer')
+        }
+        self.superuser = User.objects.create_superuser(
+            username='superuser', email='superuser@example.com', password='test-pass-123',
+        )
+        due_date = timezone.now() + timedelta(days=7)
+        self.tasks = {
+            title: Task.objects.create(
+                title=title, description=title, due_date=due_date,
+                created_by=self.users[creator], assigned_to=self.users[assignee],
+            ).pk
+            for title, creator, assignee in (
+                ('manager_to_officer', 'manager', 'fieldofficer'),
+                ('officer_to_farmer', 'fieldofficer', 'farmer'),
+                ('manager_to_admin', 'manager', 'admin'),
+            )
+        }
+
+    def _visible_ids(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/tasks/')
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data['results']}
+
+    def test_each_role_sees_the_same_tasks(self):
+        everything = set(self.tasks.values())
+        expected = {
+            'admin': everything,
+            'manager': everything,
+            'fieldofficer': {self.tasks['manager_to_officer'], self.tasks['officer_to_farmer']},
+            'farmer': {self.tasks['officer_to_farmer']},
+        }
+        self.assertEqual(self._visible_ids(self.superuser), everything)
+        for name, task_ids in expected.items():
+            with self.subTest(role=name):
+                self.assertEqual(self._visible_ids(self.users[name]), task_ids)
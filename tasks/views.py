@@ -14,10 +14,19 @@ from .serializers import (
     TaskAttachmentCreateSerializer
 )
 from .permissions import CanManageTasks, CanViewTasks
+from farm_management.mixins import RoleScopedQuerysetMixin
+from farm_management.pagination import SelectablePagination
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(RoleScopedQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SelectablePagination
+    keyset_ordering = ('-created_at', '-id')
+    unscoped_roles = ('admin', 'manager')
+    role_scopes = {
+        'fieldofficer': lambda qs, user: qs.filter(Q(assigned_to=user) | Q(created_by=user)),
+        '*': lambda qs, user: qs.filter(assigned_to=user),
+    }
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -32,13 +41,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         return [CanViewTasks()]
 
     def get_queryset(self):
-        user = self.request.user
-        # Use has_any_role and has_role methods, plus is_superuser
-        if user.is_superuser or user.has_any_role(['admin', 'manager']):
-            return Task.objects.all()
-        elif user.has_role('fieldofficer'):
-            return Task.objects.filter(Q(assigned_to=user) | Q(created_by=user))
-        return Task.objects.filter(assigned_to=user)
+        return self.scope_queryset(Task.objects.all())
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
-    verbose_name = 'User Management' 
\ No newline at end of file
+    verbose_name = 'User Management' 
+
+    def ready(self):
+        """Register signals when the app is ready"""
+        import users.signals
@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class AuthUserCacheService:
+    """
+    Short-lived cache of authenticated users, role included.
+
+    Only field values are stored, never credentials: the password hash,
+    OTP and reset token are left out and come back as deferred fields,
+    loaded from the database if a request uses them. Entries are dropped
+    whenever the user is saved or deleted (user updates, deactivation,
+    role or password changes) and when their role changes;
+    AUTH_USER_CACHE_TIMEOUT bounds staleness from bulk updates that send
+    no signals. A timeout of 0 disables the cache.
+    """
+
+    KEY = 'auth_user:{user_id}'
+    # Not cached; deferred on the users rebuilt from the cache
+    SENSITIVE_FIELDS = (
+        'password', 'otp', 'otp_created_at', 'otp_failed_attempts',
+        'password_reset_token', 'password_reset_token_created_at',
+    )
+
+    @staticmethod
+    def timeout() -> int:
+        return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+    @staticmethod
+    def get(user_id):
+        """The cached user with their role, or None"""
+        if not AuthUserCacheService.timeout():
+            return None
+        entry = cache.get(AuthUserCacheService.KEY.format(user_id=user_id))
+        if entry is None:
+            return None
+        user = AuthUserCacheService._restore(get_user_model(), entry['user'])
+        user.role = AuthUserCacheService._restore(user._meta.get_field('role').related_model, entry['role'])
+        return user
+
+    @staticmethod
+    def set(user_id, user) -> None:
+        """Cache a user loaded with select_related('role')"""
+        timeout = AuthUserCacheService.timeout()
+        if timeout:
+            entry = {
+                'user': AuthUserCacheService._values(user, exclude=AuthUserCacheService.SENSITIVE_FIELDS),
+                'role': AuthUserCacheService._values(user.role),
+            }
+            cache.set(AuthUserCacheService.KEY.format(user_id=user_id), entry, timeout)
+
+    @staticmethod
+    def invalidate(user_ids) -> None:
+        """Drop the cached users (by USER_ID_FIELD value)"""
+        keys = [AuthUserCacheService.KEY.format(user_id=user_id) for user_id in user_ids if user_id is not None]
+        if keys:
+            cache.delete_many(keys)
+
+    @staticmethod
+    def _values(instance, exclude=()):
+        """(database alias, attnames, values) of an instance's concrete fields, or None"""
+        if instance is None:
+            return None
+        fields = [field for field in instance._meta.concrete_fields if field.name not in exclude]
+        return (
+            instance._state.db,
+            tuple(field.attname for field in fields),
+            tuple(getattr(instance, field.attname) for field in fields),
+        )
+
+    @staticmethod
+    def _restore(model, values):
+        """An instance as loaded from the database, the fields missing from values deferred"""
+        if values is None:
+            return None
+        db, field_names, field_values = values
+        return model.from_db(db, field_names, field_values)
+
+
+class RoleAwareJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that loads the user together with their role.
+
+    Permission classes and get_queryset() check has_role()/has_any_role()
+    several times per request; with the role joined in here, none of those
+    checks touches the database again. The user is cached briefly
+    (AuthUserCacheService), so most requests make no query to authenticate.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = AuthUserCacheService.get(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.select_related('role').get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            AuthUserCacheService.set(user_id, user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
@@ -0,0 +1,185 @@
+import logging
+import uuid
+from typing import Any, Callable, Iterable, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+from .hierarchy_service import UserHierarchyService
+from .models import UserHierarchy
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+class HierarchyCacheService:
+    """
+    Cached owner/manager hierarchy snapshots and incrementally kept counts.
+
+    Snapshots are the serialized hierarchy responses, cached per scope
+    (owner view, or one manager's subtree). Every key embeds a generation
+    read before the entry is built: the organisation-wide one for owner
+    snapshots and org counts, the manager's own for their subtree. A
+    change moves on the generations of every user above it (and the
+    organisation's), so an entry built while the change was in flight is
+    written under a retired key and never served. Generations move on
+    again when the change commits, so a build that read the database
+    before the commit is retired too.
+
+    Counts of users by role (per ancestor and organisation-wide) live in
+    the cache as plain integers. A committed user creation increments them
+    in place; anything that can move users between subtrees moves the
+    count generations on so they are recounted with one indexed query on
+    the next read.
+    """
+
+    KEY_PREFIX = 'user_hierarchy'
+    TIMEOUT = 60 * 60
+    ORG_SCOPE = 'org'
+    SNAPSHOTS = 'snapshot'
+    COUNTS = 'count'
+
+    @staticmethod
+    def get_snapshot(scope: str, user_id: Optional[int], build: Callable[[], Any]) -> Any:
+        """
+        Get a cached hierarchy snapshot, building and storing it on a miss.
+
+        Args:
+            scope: Snapshot kind, e.g. 'owner' or 'manager'
+            user_id: ID of the user the snapshot belongs to (None for org-wide)
+            build: Callable returning the serializable snapshot
+
+        Returns:
+            The cached or freshly built snapshot
+        """
+        key = HierarchyCacheService._snapshot_key(scope, user_id)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = build()
+            cache.set(key, snapshot, HierarchyCacheService.TIMEOUT)
+        return snapshot
+
+    @staticmethod
+    def get_count(role_name: str, ancestor_id: Optional[int] = None) -> int:
+        """
+        Number of users with a role, below an ancestor or organisation-wide.
+
+        Args:
+            role_name: Role to count
+            ancestor_id: Count only users below this user (None for everyone)
+
+        Returns:
+            int: The count
+        """
+        key = HierarchyCacheService._count_key(role_name, ancestor_id)
+        count = cache.get(key)
+        if count is None:
+            if ancestor_id is None:
+                count = User.objects.filter(role__name=role_name).count()
+            else:
+                count = UserHierarchyService.get_descendants(ancestor_id, role_name).count()
+            # add: an increment that reached a count stored meanwhile is kept
+            cache.add(key, count, HierarchyCacheService.TIMEOUT)
+        return count
+
+    @staticmethod
+    def user_created(user) -> None:
+        """Retire snapshots above a newly created user and, once committed, count them"""
+        ancestor_ids = HierarchyCacheService._ancestor_ids([user.pk])
+        HierarchyCacheService._retire(ancestor_ids)
+        if not user.role_id:
+            transaction.on_commit(lambda: HierarchyCacheService._retire(ancestor_ids))
+            return
+        role_name = user.role.name
+        counted_ids = [None] + [pk for pk in ancestor_ids if pk != user.pk]
+
+        def committed():
+            for ancestor_id in counted_ids:
+                HierarchyCacheService._increment(role_name, ancestor_id)
+            HierarchyCacheService._retire(ancestor_ids)
+
+        transaction.on_commit(committed)
+
+    @staticmethod
+    def user_moved(user_ids: Iterable[int]) -> None:
+        """
+        Retire counts and snapshots above users whose role, creator or existence changed.
+
+        Must be called while the users are still linked where they were
+        before the change (and again afterwards for where they are now).
+        """
+        ancestor_ids = HierarchyCacheService._ancestor_ids(user_ids)
+        HierarchyCacheService._retire(ancestor_ids, counts=True)
+        transaction.on_commit(lambda: HierarchyCacheService._retire(ancestor_ids, counts=True))
+
+    @staticmethod
+    def user_updated(user_ids: Iterable[int]) -> None:
+        """Retire snapshots above users whose displayed data (or plots/farms) changed"""
+        ancestor_ids = HierarchyCacheService._ancestor_ids(user_ids)
+        HierarchyCacheService._retire(ancestor_ids)
+        transaction.on_commit(lambda: HierarchyCacheService._retire(ancestor_ids))
+
+    @staticmethod
+    def _ancestor_ids(user_ids: Iterable[int]) -> list:
+        user_ids = [pk for pk in user_ids if pk]
+        if not user_ids:
+            return []
+        return list(
+            UserHierarchy.objects.filter(descendant_id__in=user_ids).values_list('ancestor_id', flat=True).distinct()
+        )
+
+    @staticmethod
+    def _retire(ancestor_ids: list, counts: bool = False) -> None:
+        """Move on the generations of the ancestors' snapshots (and counts), and the organisation's"""
+        kinds = [HierarchyCacheService.SNAPSHOTS]
+        if counts:
+            kinds.append(HierarchyCacheService.COUNTS)
+        for kind in kinds:
+            # Owners see the whole organisation, so every change retires their snapshots
+            for user_id in [None] + list(ancestor_ids):
+                HierarchyCacheService._bump(HierarchyCacheService._generation_key(kind, user_id))
+
+    @staticmethod
+    def _increment(role_name: str, ancestor_id: Optional[int]) -> None:
+        try:
+            cache.incr(HierarchyCacheService._count_key(role_name, ancestor_id))
+        except ValueError:
+            # Not cached, but a count may be in flight that missed this user: retire it
+            HierarchyCacheService._bump(HierarchyCacheService._generation_key(HierarchyCacheService.COUNTS, ancestor_id))
+
+    @staticmethod
+    def _bump(key: str) -> None:
+        # A fresh token, not incr(): the database cache's incr is a get and a set,
+        # so two concurrent retirements could otherwise land on one generation
+        cache.set(key, uuid.uuid4().hex, None)
+
+    @staticmethod
+    def _generation(kind: str, user_id: Optional[int]) -> str:
+        key = HierarchyCacheService._generation_key(kind, user_id)
+        generation = cache.get(key)
+        if generation is None:
+            seed = uuid.uuid4().hex
+            cache.add(key, seed, None)
+            generation = cache.get(key, seed)
+        return generation
+
+    @staticmethod
+    def _generation_key(kind: str, user_id: Optional[int]) -> str:
+        return f"{HierarchyCacheService.KEY_PREFIX}:generation:{kind}:{user_id or HierarchyCacheService.ORG_SCOPE}"
+
+    @staticmethod
+    def _snapshot_key(scope: str, user_id: Optional[int]) -> str:
+        # A manager's snapshot covers their subtree; every other scope is organisation-wide
+        generation = HierarchyCacheService._generation(
+            HierarchyCacheService.SNAPSHOTS, user_id if scope == 'manager' else None
+        )
+        return f"{HierarchyCacheService.KEY_PREFIX}:snapshot:{scope}:{user_id}:{generation}"
+
+    @staticmethod
+    def _count_key(role_name: str, ancestor_id: Optional[int]) -> str:
+        generation = HierarchyCacheService._generation(HierarchyCacheService.COUNTS, ancestor_id)
+        return (
+            f"{HierarchyCacheService.KEY_PREFIX}:count:{ancestor_id or HierarchyCacheService.ORG_SCOPE}"
+            f":{role_name}:{generation}"
+        )
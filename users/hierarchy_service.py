@@ -0,0 +1,208 @@
+import logging
+from typing import Optional
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import OuterRef
+
+from farm_management.aggregates import SubqueryCount
+from farm_management.versions import ModelVersionService
+from .models import UserHierarchy
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+class UserHierarchyService:
+    """
+    Maintains and queries the UserHierarchy closure table.
+
+    Every user has a depth-0 link to itself plus one link per ancestor in
+    the created_by chain, so subtree queries are a single join on
+    (ancestor, depth) instead of a walk down created_by one level at a time.
+    """
+
+    BATCH_SIZE = 5000
+
+    @staticmethod
+    def add_user(user) -> None:
+        """
+        Insert closure links for a newly created user.
+
+        Args:
+            user: User instance that has just been saved
+        """
+        links = [UserHierarchy(ancestor_id=user.pk, descendant_id=user.pk, depth=0)]
+        if user.created_by_id:
+            links.extend(
+                UserHierarchy(ancestor_id=ancestor_id, descendant_id=user.pk, depth=depth + 1)
+                for ancestor_id, depth in UserHierarchy.objects.filter(
+                    descendant_id=user.created_by_id
+                ).values_list('ancestor_id', 'depth')
+            )
+        UserHierarchy.objects.bulk_create(links, ignore_conflicts=True)
+
+    @staticmethod
+    def add_users(users) -> None:
+        """
+        Insert closure links for users created together (e.g. with bulk_create).
+
+        Args:
+            users: Saved User instances
+        """
+        creator_ids = {user.created_by_id for user in users if user.created_by_id}
+        creator_ancestors = {}
+        for descendant_id, ancestor_id, depth in UserHierarchy.objects.filter(
+            descendant_id__in=creator_ids
+        ).values_list('descendant_id', 'ancestor_id', 'depth'):
+            creator_ancestors.setdefault(descendant_id, []).append((ancestor_id, depth))
+
+        links = []
+        for user in users:
+            links.append(UserHierarchy(ancestor_id=user.pk, descendant_id=user.pk, depth=0))
+            links.extend(
+                UserHierarchy(ancestor_id=ancestor_id, descendant_id=user.pk, depth=depth + 1)
+                for ancestor_id, depth in creator_ancestors.get(user.created_by_id, [])
+            )
+        UserHierarchy.objects.bulk_create(links, batch_size=UserHierarchyService.BATCH_SIZE, ignore_conflicts=True)
+
+    @staticmethod
+    def move_user(user, new_parent_id: Optional[int]) -> None:
+        """
+        Re-link a user's whole subtree under a new creator.
+
+        Args:
+            user: User whose created_by changed
+            new_parent_id: ID of the new creator, or None to make the user a root
+        """
+        with transaction.atomic():
+            subtree = dict(
+                UserHierarchy.objects.filter(ancestor_id=user.pk).values_list('descendant_id', 'depth')
+            )
+            if not subtree:
+                # User predates the closure table; links for it are created here
+                subtree = {user.pk: 0}
+                UserHierarchy.objects.create(ancestor_id=user.pk, descendant_id=user.pk, depth=0)
+
+            # Drop every link from outside the subtree into it
+            UserHierarchy.objects.filter(
+                descendant_id__in=subtree
+            ).exclude(ancestor_id__in=subtree).delete()
+
+            if new_parent_id is None:
+                return
+            if new_parent_id in subtree:
+                logger.warning(
+                    f"User {user.pk} cannot be placed under its own descendant {new_parent_id}; "
+                    f"leaving it as a hierarchy root"
+                )
+                return
+
+            parent_ancestors = list(
+                UserHierarchy.objects.filter(descendant_id=new_parent_id).values_list('ancestor_id', 'depth')
+            )
+            UserHierarchy.objects.bulk_create(
+                [
+                    UserHierarchy(
+                        ancestor_id=ancestor_id,
+                        descendant_id=descendant_id,
+                        depth=ancestor_depth + 1 + descendant_depth,
+                    )
+                    for ancestor_id, ancestor_depth in parent_ancestors
+                    for descendant_id, descendant_depth in subtree.items()
+                ],
+                batch_size=UserHierarchyService.BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+
+    @staticmethod
+    def detach_children(user) -> None:
+        """
+        Make a user's direct children roots before the user is deleted.
+
+        created_by uses SET_NULL, which updates rows without signals, so the
+        children's subtrees are unlinked from the deleted user's ancestors here.
+        """
+        for child_id in User.objects.filter(created_by=user).values_list('pk', flat=True):
+            UserHierarchyService.move_user(User(pk=child_id), None)
+
+    @staticmethod
+    def rebuild() -> int:
+        """
+        Rebuild the whole closure table from created_by.
+
+        Returns:
+            int: Number of links written
+        """
+        parents = dict(User.objects.values_list('id', 'created_by_id'))
+        links = []
+        for user_id in parents:
+            ancestor_id, depth, seen = user_id, 0, set()
+            while ancestor_id is not None and ancestor_id not in seen:
+                seen.add(ancestor_id)
+                links.append(UserHierarchy(ancestor_id=ancestor_id, descendant_id=user_id, depth=depth))
+                ancestor_id, depth = parents.get(ancestor_id), depth + 1
+
+        with transaction.atomic():
+            UserHierarchy.objects.all().delete()
+            UserHierarchy.objects.bulk_create(links, batch_size=UserHierarchyService.BATCH_SIZE)
+        logger.info(f"Rebuilt user hierarchy: {len(links)} links for {len(parents)} users")
+        # Role scopes read the closure table, so scoped responses may have changed
+        ModelVersionService.bump('users.User')
+        return len(links)
+
+    @staticmethod
+    def get_descendants(user, role_name: Optional[str] = None, max_depth: Optional[int] = None):
+        """
+        All users below a user in the created_by tree.
+
+        Args:
+            user: User (or user ID) at the top of the subtree
+            role_name: Only return descendants with this role
+            max_depth: Only return descendants at most this many levels down
+
+        Returns:
+            QuerySet: Users in the subtree, excluding the user itself
+        """
+        filters = {'ancestor_links__ancestor': user, 'ancestor_links__depth__gt': 0}
+        if max_depth is not None:
+            filters['ancestor_links__depth__lte'] = max_depth
+        if role_name:
+            filters['role__name'] = role_name
+        return User.objects.filter(**filters)
+
+    @staticmethod
+    def get_ancestors(user, role_name: Optional[str] = None):
+        """
+        All users above a user in the created_by tree, nearest first.
+
+        Args:
+            user: User (or user ID) at the bottom of the chain
+            role_name: Only return ancestors with this role
+
+        Returns:
+            QuerySet: Ancestors, excluding the user itself
+        """
+        filters = {'descendant_links__descendant': user, 'descendant_links__depth__gt': 0}
+        if role_name:
+            filters['role__name'] = role_name
+        return User.objects.filter(**filters).order_by('descendant_links__depth')
+
+    @staticmethod
+    def descendants_count(role_name: Optional[str] = None, max_depth: Optional[int] = None) -> SubqueryCount:
+        """
+        Annotation counting each user's descendants.
+
+        Args:
+            role_name: Only count descendants with this role
+            max_depth: Only count descendants at most this many levels down
+
+        Returns:
+            SubqueryCount: Expression for queryset.annotate()
+        """
+        links = UserHierarchy.objects.filter(ancestor=OuterRef('pk'), depth__gt=0)
+        if max_depth is not None:
+            links = links.filter(depth__lte=max_depth)
+        if role_name:
+            links = links.filter(descendant__role__name=role_name)
+        return SubqueryCount(links)
@@ -29,7 +29,7 @@ class LoginView(APIView):
 
         try:
             # Find user by email
-            user = User.objects.filter(email=email).first()
+            user = User.find_by_email(email)
             if not user:
                 return Response({
                     'detail': 'Invalid email or password'
@@ -89,7 +89,7 @@ class PasswordResetRequestView(APIView):
 
         try:
             # Find user by email
-            user = User.objects.filter(email=email).first()
+            user = User.find_by_email(email)
             if not user:
                 # For security, don't reveal if email exists or not
                 return Response({
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from users.hierarchy_service import UserHierarchyService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the user hierarchy closure table from created_by'
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding user hierarchy...")
+        links = UserHierarchyService.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully rebuilt user hierarchy with {links} links")
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from users.stats_service import UserStatsService
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized UserStats counters from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, nargs='*', dest='user_ids', help='Only these user IDs')
+
+    def handle(self, *args, **options):
+        self.stdout.write("Recomputing user stats...")
+        rows = UserStatsService.recompute(options['user_ids'] or None)
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully recomputed stats for {rows} users")
+        )
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_user_hierarchy(apps, schema_editor):
+    """Populate the closure table from the existing created_by tree"""
+    User = apps.get_model('users', 'User')
+    UserHierarchy = apps.get_model('users', 'UserHierarchy')
+
+    parents = dict(User.objects.values_list('id', 'created_by_id'))
+    links = []
+    for user_id in parents:
+        ancestor_id, depth, seen = user_id, 0, set()
+        while ancestor_id is not None and ancestor_id not in seen:
+            seen.add(ancestor_id)
+            links.append(UserHierarchy(ancestor_id=ancestor_id, descendant_id=user_id, depth=depth))
+            ancestor_id, depth = parents.get(ancestor_id), depth + 1
+    UserHierarchy.objects.bulk_create(links, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserHierarchy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField(help_text='Number of created_by steps from ancestor to descendant')),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to=settings.AUTH_USER_MODEL)),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Hierarchy Link',
+                'verbose_name_plural': 'User Hierarchy Links',
+                'indexes': [
+                    models.Index(fields=['ancestor', 'depth'], name='user_hierarchy_anc_depth_idx'),
+                    models.Index(fields=['descendant', 'depth'], name='user_hierarchy_desc_depth_idx'),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='userhierarchy',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_user_hierarchy_link'),
+        ),
+        migrations.RunPython(build_user_hierarchy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.contrib.postgres.indexes import OpClass
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_userhierarchy'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(OpClass(Upper('username'), name='text_pattern_ops'), name='user_username_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(OpClass(Upper('first_name'), name='text_pattern_ops'), name='user_first_name_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(OpClass(Upper('last_name'), name='text_pattern_ops'), name='user_last_name_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['phone_number'], name='user_phone_number_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', '-date_joined'], name='user_role_date_joined_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def populate_user_stats(apps, schema_editor):
+    """Compute every user's counts from the existing rows"""
+    User = apps.get_model('users', 'User')
+    UserHierarchy = apps.get_model('users', 'UserHierarchy')
+    UserStats = apps.get_model('users', 'UserStats')
+    Plot = apps.get_model('farms', 'Plot')
+    Farm = apps.get_model('farms', 'Farm')
+    FarmIrrigation = apps.get_model('farms', 'FarmIrrigation')
+
+    def grouped(queryset, key):
+        return dict(queryset.values_list(key).annotate(count=Count('pk')).order_by())
+
+    counts = {
+        'plots_count': grouped(Plot.objects.all(), 'farmer_id'),
+        'farms_count': grouped(Farm.objects.all(), 'farm_owner_id'),
+        'irrigations_count': grouped(FarmIrrigation.objects.all(), 'farm__farm_owner_id'),
+        'created_plots_count': grouped(Plot.objects.all(), 'created_by_id'),
+        'created_farms_count': grouped(Farm.objects.all(), 'created_by_id'),
+        'created_irrigations_count': grouped(FarmIrrigation.objects.all(), 'farm__created_by_id'),
+        'farmers_count': grouped(User.objects.filter(role__name='farmer'), 'created_by_id'),
+        'field_officers_count': grouped(User.objects.filter(role__name='fieldofficer'), 'created_by_id'),
+        'descendant_farmers_count': grouped(
+            UserHierarchy.objects.filter(depth__gt=0, descendant__role__name='farmer'), 'ancestor_id'
+        ),
+    }
+    UserStats.objects.bulk_create(
+        [
+            UserStats(user_id=user_id, **{field: values.get(user_id, 0) for field, values in counts.items()})
+            for user_id in User.objects.values_list('id', flat=True)
+        ],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_joined_keyset_idx'),
+        ('farms', '0003_plot_public_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('plots_count', models.IntegerField(default=0)),
+                ('farms_count', models.IntegerField(default=0)),
+                ('irrigations_count', models.IntegerField(default=0)),
+                ('created_plots_count', models.IntegerField(default=0)),
+                ('created_farms_count', models.IntegerField(default=0)),
+                ('created_irrigations_count', models.IntegerField(default=0)),
+                ('farmers_count', models.IntegerField(default=0)),
+                ('field_officers_count', models.IntegerField(default=0)),
+                ('descendant_farmers_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'User Stats',
+                'verbose_name_plural': 'User Stats',
+            },
+        ),
+        migrations.RunPython(populate_user_stats, migrations.RunPython.noop),
+    ]
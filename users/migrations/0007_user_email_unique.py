@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """Fail with a readable message instead of a constraint error if emails are already shared"""
+    User = apps.get_model('users', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').values_list('email').annotate(count=models.Count('pk'))
+        .filter(count__gt=1).order_by('email').values_list('email', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot add the unique email constraint: these emails belong to more than one user: "
+            + ', '.join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_creator_role_joined_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(condition=models.Q(('email', ''), _negated=True), fields=('email',), name='user_email_unique'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_email_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(Upper('email'), name='user_email_upper_idx'),
+        ),
+    ]
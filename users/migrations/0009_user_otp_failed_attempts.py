@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_user_email_upper_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='otp_failed_attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Wrong codes entered for the current OTP (it is discarded after OTP_MAX_FAILED_ATTEMPTS)'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """Fail with a readable message instead of a constraint error if emails differing only in case are shared"""
+    User = apps.get_model('users', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').annotate(upper_email=Upper('email')).values_list('upper_email')
+        .annotate(count=models.Count('pk')).filter(count__gt=1).order_by('upper_email')
+        .values_list('upper_email', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot make the unique email constraint case-insensitive: these emails (ignoring case) "
+            "belong to more than one user: " + ', '.join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_user_otp_failed_attempts'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        # The unique index on UPPER(email) also serves email__iexact login
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_email_upper_idx',
+        ),
+        migrations.RemoveConstraint(
+            model_name='user',
+            name='user_email_unique',
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(Upper('email'), condition=models.Q(('email', ''), _negated=True), name='user_email_unique'),
+        ),
+    ]
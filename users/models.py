@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 class Role(models.Model):
     """
@@ -53,6 +55,10 @@ class User(AbstractUser):
         blank=True,
         help_text="Method used to deliver the last OTP"
     )
+    otp_failed_attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Wrong codes entered for the current OTP (it is discarded after OTP_MAX_FAILED_ATTEMPTS)"
+    )
     
     # Password reset fields
     password_reset_token = models.CharField(max_length=100, null=True, blank=True)
@@ -69,14 +75,127 @@ class User(AbstractUser):
 
     class Meta:
         ordering = ['-date_joined']
+        indexes = [
+            # Prefix search (istartswith) in contact-details
+            models.Index(OpClass(Upper('username'), name='text_pattern_ops'), name='user_username_upper_idx'),
+            models.Index(OpClass(Upper('first_name'), name='text_pattern_ops'), name='user_first_name_upper_idx'),
+            models.Index(OpClass(Upper('last_name'), name='text_pattern_ops'), name='user_last_name_upper_idx'),
+            models.Index(fields=['phone_number'], name='user_phone_number_idx', opclasses=['varchar_pattern_ops']),
+            # Role filter with the default (cursor) ordering
+            models.Index(fields=['role', '-date_joined'], name='user_role_date_joined_idx'),
+            # Keyset pagination
+            models.Index(fields=['-date_joined', '-id'], name='user_joined_keyset_idx'),
+            # A field officer's most recent farmers (auto-assignment)
+            models.Index(fields=['created_by', 'role', '-date_joined'], name='user_creator_role_joined_idx'),
+        ]
+        constraints = [
+            # Registration checks emails up front; this closes the race between two requests.
+            # Ignoring case, like login, whose email__iexact lookup it also serves
+            models.UniqueConstraint(Upper('email'), condition=~models.Q(email=''), name='user_email_unique'),
+        ]
 
     def __str__(self):
         role = self.role.name if self.role else "NoRole"
         return f"{self.username} ({role})"
 
+    @property
+    def role_name(self):
+        """Name of the user's role, or None; no query once the role is loaded"""
+        return self.role.name if self.role_id else None
+
+    @classmethod
+    def find_by_email(cls, email):
+        """
+        The user logging in with this email, ignoring case, with their role loaded.
+
+        Uses the partial unique index of user_email_unique (hence the
+        email <> '' condition), which also makes the match unique.
+
+        Args:
+            email: Email as typed by the user
+
+        Returns:
+            User: The user, or None
+        """
+        email = (email or '').strip()
+        if not email:
+            return None
+        return cls.objects.select_related('role').filter(email__iexact=email).exclude(email='').first()
+
     def has_role(self, role_name: str) -> bool:
-        return bool(self.role and self.role.name == role_name)
+        return self.role_name == role_name
 
     def has_any_role(self, role_names: list[str]) -> bool:
-        return bool(self.role and self.role.name in role_names)
+        return self.role_name in role_names
+
+
+
+class UserHierarchy(models.Model):
+    """
+    Closure table over the ``created_by`` tree.
+
+    One row per (ancestor, descendant) pair, including a depth-0 row for
+    every user, so "all farmers under manager X" is a single indexed join.
+    Maintained by users.signals via UserHierarchyService.
+    """
+    ancestor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='descendant_links',
+    )
+    descendant = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='ancestor_links',
+    )
+    depth = models.PositiveSmallIntegerField(help_text="Number of created_by steps from ancestor to descendant")
 
+    class Meta:
+        verbose_name = "User Hierarchy Link"
+        verbose_name_plural = "User Hierarchy Links"
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='unique_user_hierarchy_link'),
+        ]
+        indexes = [
+            models.Index(fields=['ancestor', 'depth'], name='user_hierarchy_anc_depth_idx'),
+            models.Index(fields=['descendant', 'depth'], name='user_hierarchy_desc_depth_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
+
+class UserStats(models.Model):
+    """
+    Denormalized per-user counts, so dashboards read them by primary key.
+
+    Kept current by the signal receivers in users.signals and farms.signals
+    via UserStatsService: creations and deletions adjust the counters with
+    F() expressions, anything that moves rows between users recomputes the
+    affected rows. ``manage.py repair_user_stats`` recomputes them in bulk.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    # As the farmer / farm owner
+    plots_count = models.IntegerField(default=0)
+    farms_count = models.IntegerField(default=0)
+    irrigations_count = models.IntegerField(default=0)
+    # As the field officer who registered them
+    created_plots_count = models.IntegerField(default=0)
+    created_farms_count = models.IntegerField(default=0)
+    created_irrigations_count = models.IntegerField(default=0)
+    # Users this user created directly, and farmers anywhere below them
+    farmers_count = models.IntegerField(default=0)
+    field_officers_count = models.IntegerField(default=0)
+    descendant_farmers_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "User Stats"
+        verbose_name_plural = "User Stats"
+
+    def __str__(self):
+        return f"Stats for user {self.user_id}"
@@ -0,0 +1,327 @@
+"""
+Background OTP delivery for Farm Management Backend
+"""
+
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+OTP_EMAIL_SUBJECT = 'Your OTP for Farm Management System'
+
+
+class OTPTransport:
+    """
+    Sends OTP messages over one channel.
+
+    Messages are dicts with 'recipient', 'otp', 'name' and 'user_id'.
+    send_batch returns one bool per message (True when sent).
+    """
+
+    def send_batch(self, messages):
+        raise NotImplementedError
+
+
+class TwilioWhatsAppTransport(OTPTransport):
+    """WhatsApp through Twilio: one client for the whole batch (Twilio has no bulk send)"""
+
+    def send_batch(self, messages):
+        from .whatsapp_service import WhatsAppOTPService
+
+        service = WhatsAppOTPService()
+        return [service.send_otp(message['recipient'], message['otp'], message['name']) for message in messages]
+
+
+class EmailTransport(OTPTransport):
+    """Email through Django's backend: the whole batch over one SMTP connection"""
+
+    def send_batch(self, messages):
+        validity = getattr(settings, 'OTP_VALIDITY_MINUTES', 10)
+        emails = [
+            EmailMessage(
+                OTP_EMAIL_SUBJECT,
+                f"Your OTP is: {message['otp']}. Expires in {validity} minutes.",
+                settings.DEFAULT_FROM_EMAIL,
+                [message['recipient']],
+            )
+            for message in messages
+        ]
+        try:
+            with get_connection() as connection:
+                sent = connection.send_messages(emails) or 0
+        except Exception as e:
+            logger.error(f"Email OTP batch of {len(emails)} failed: {str(e)}")
+            return [False] * len(emails)
+        # Backends report a count only: a partial failure retries the whole batch
+        return [sent == len(emails)] * len(emails)
+
+
+class LocalTransport(OTPTransport):
+    """
+    Stand-in for Twilio/SMTP in tests and local development.
+
+    Sent messages are kept in LocalTransport.outbox; queue failures with
+    LocalTransport.fail_next to exercise retries and fallbacks.
+    """
+
+    outbox = []
+    fail_next = 0
+    _lock = threading.Lock()
+
+    def __init__(self, channel=None):
+        self.channel = channel
+
+    def send_batch(self, messages):
+        results = []
+        with LocalTransport._lock:
+            for message in messages:
+                if LocalTransport.fail_next > 0:
+                    LocalTransport.fail_next -= 1
+                    results.append(False)
+                    continue
+                LocalTransport.outbox.append(dict(message))
+                results.append(True)
+        logger.info(f"Local OTP transport delivered {sum(results)} of {len(messages)} messages")
+        return results
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls.outbox = []
+            cls.fail_next = 0
+
+
+class OTPDeliveryService:
+    """
+    Queues OTP messages and delivers them from a background worker thread,
+    so requests return without waiting for Twilio or SMTP.
+
+    The worker sends up to OTP_DELIVERY_BATCH_SIZE queued messages per
+    channel at a time. A failed message is retried with exponential
+    backoff up to OTP_DELIVERY_MAX_ATTEMPTS times, then falls back to the
+    next channel (WhatsApp, then email). Transports come from
+    OTP_TRANSPORTS, so tests can swap in LocalTransport. Each recipient
+    may get OTP_RATE_LIMIT_COUNT OTPs per OTP_RATE_LIMIT_WINDOW seconds,
+    counted in the default cache. That is Redis, or the database cache
+    table without REDIS_URL, so every worker process shares the count;
+    the database cache increments with a get and a set, so concurrent
+    requests may overshoot the limit by a message or two.
+
+    The queue lives in the process: OTPs still queued when it exits are
+    lost, and the user simply requests a new one.
+    """
+
+    RATE_KEY = 'otp_rate:{recipient}'
+
+    _queue = queue.Queue()
+    _delayed = []
+    _sequence = itertools.count()
+    _pending = 0
+    _idle = threading.Condition()
+    _worker = None
+    _worker_lock = threading.Lock()
+    _transports = {}
+
+    @staticmethod
+    def channels_for(user):
+        """Channels to try for a user, in order, as (channel, recipient)"""
+        channels = []
+        if getattr(settings, 'WHATSAPP_OTP_ENABLED', False) and user.phone_number:
+            channels.append(('whatsapp', user.phone_number))
+        if getattr(settings, 'EMAIL_OTP_FALLBACK', True) and user.email:
+            channels.append(('email', user.email))
+        return channels
+
+    @staticmethod
+    def enqueue(user, otp_code):
+        """
+        Queue an OTP for delivery.
+
+        Args:
+            user: User receiving the OTP
+            otp_code: The OTP
+
+        Returns:
+            str: First channel it will be tried on ('whatsapp' or 'email'),
+                or None if the user has no channel or hit the rate limit
+        """
+        channels = OTPDeliveryService.channels_for(user)
+        if not channels:
+            logger.warning(f"No OTP channel for user {user.pk}")
+            return None
+        if not OTPDeliveryService._allow(channels[0][1]):
+            logger.warning(f"OTP rate limit reached for user {user.pk}")
+            return None
+
+        message = {
+            'user_id': user.pk,
+            'otp': otp_code,
+            'name': user.first_name or user.username,
+            'channels': channels,
+            'channel_index': 0,
+            'attempt': 0,
+        }
+        with OTPDeliveryService._idle:
+            OTPDeliveryService._pending += 1
+        OTPDeliveryService._queue.put(message)
+        OTPDeliveryService._ensure_worker()
+        return channels[0][0]
+
+    @staticmethod
+    def wait_until_idle(timeout=None):
+        """
+        Block until every queued message was delivered or given up on.
+
+        Returns:
+            bool: False if the timeout passed first
+        """
+        with OTPDeliveryService._idle:
+            return OTPDeliveryService._idle.wait_for(lambda: OTPDeliveryService._pending == 0, timeout)
+
+    @staticmethod
+    def get_transport(channel):
+        transports = OTPDeliveryService._transports
+        if channel not in transports:
+            transports[channel] = import_string(settings.OTP_TRANSPORTS[channel])()
+        return transports[channel]
+
+    @staticmethod
+    def reset_transports():
+        """Forget the transport instances (e.g. after OTP_TRANSPORTS changed)"""
+        OTPDeliveryService._transports = {}
+
+    @staticmethod
+    def _allow(recipient):
+        """Count an OTP against the recipient's window; False once the limit is reached"""
+        key = OTPDeliveryService.RATE_KEY.format(recipient=recipient)
+        window = getattr(settings, 'OTP_RATE_LIMIT_WINDOW', 600)
+        if cache.add(key, 1, window):
+            return True
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            # Expired between add and incr
+            cache.add(key, 1, window)
+            return True
+        return count <= getattr(settings, 'OTP_RATE_LIMIT_COUNT', 3)
+
+    @staticmethod
+    def _ensure_worker():
+        with OTPDeliveryService._worker_lock:
+            worker = OTPDeliveryService._worker
+            if worker is None or not worker.is_alive():
+                OTPDeliveryService._worker = threading.Thread(
+                    target=OTPDeliveryService._run, name='otp-delivery', daemon=True
+                )
+                OTPDeliveryService._worker.start()
+
+    @staticmethod
+    def _run():
+        while True:
+            try:
+                batch = OTPDeliveryService._next_batch()
+                if batch:
+                    OTPDeliveryService._deliver(batch)
+            except Exception as e:
+                logger.error(f"OTP delivery worker error: {str(e)}")
+
+    @staticmethod
+    def _next_batch():
+        """Wait for messages (or the next retry), then take up to OTP_DELIVERY_BATCH_SIZE"""
+        delayed = OTPDeliveryService._delayed
+        timeout = max(0, delayed[0][0] - time.monotonic()) if delayed else None
+        batch = []
+        try:
+            batch.append(OTPDeliveryService._queue.get(timeout=timeout))
+        except queue.Empty:
+            pass
+
+        batch_size = getattr(settings, 'OTP_DELIVERY_BATCH_SIZE', 50)
+        now = time.monotonic()
+        while delayed and delayed[0][0] <= now and len(batch) < batch_size:
+            batch.append(heapq.heappop(delayed)[2])
+        while len(batch) < batch_size:
+            try:
+                batch.append(OTPDeliveryService._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _deliver(batch):
+        close_old_connections()
+        try:
+            OTPDeliveryService._send(batch)
+        finally:
+            # Like a request: don't hold a connection while the queue is idle
+            close_old_connections()
+
+    @staticmethod
+    def _send(batch):
+        by_channel = {}
+        for message in batch:
+            channel, recipient = message['channels'][message['channel_index']]
+            by_channel.setdefault(channel, []).append(dict(message, recipient=recipient))
+
+        for channel, messages in by_channel.items():
+            unavailable = False
+            try:
+                results = OTPDeliveryService.get_transport(channel).send_batch(messages)
+            except ImportError as e:
+                # Provider library not installed: retrying cannot help, fall back right away
+                logger.error(f"OTP transport {channel} unavailable: {str(e)}")
+                results, unavailable = [False] * len(messages), True
+            except Exception as e:
+                logger.error(f"OTP transport {channel} failed: {str(e)}")
+                results = [False] * len(messages)
+            for message, sent in zip(messages, results):
+                if sent:
+                    OTPDeliveryService._delivered(message, channel)
+                else:
+                    OTPDeliveryService._failed(message, channel, give_up=unavailable)
+
+    @staticmethod
+    def _delivered(message, channel):
+        logger.info(f"OTP delivered to user {message['user_id']} via {channel}")
+        if message['channel_index'] > 0:
+            # Fell back: record the method the user actually got it by
+            from django.contrib.auth import get_user_model
+            get_user_model().objects.filter(pk=message['user_id']).update(otp_delivery_method=channel)
+        OTPDeliveryService._done()
+
+    @staticmethod
+    def _failed(message, channel, give_up=False):
+        message = dict(message)
+        message.pop('recipient', None)
+        message['attempt'] += 1
+        if give_up or message['attempt'] >= getattr(settings, 'OTP_DELIVERY_MAX_ATTEMPTS', 3):
+            if message['channel_index'] + 1 >= len(message['channels']):
+                logger.error(f"OTP for user {message['user_id']} could not be delivered on any channel")
+                OTPDeliveryService._done()
+                return
+            logger.warning(f"OTP for user {message['user_id']} falling back from {channel}")
+            message['channel_index'] += 1
+            message['attempt'] = 0
+            delay = 0
+        else:
+            delay = getattr(settings, 'OTP_DELIVERY_RETRY_DELAY', 2) * 2 ** (message['attempt'] - 1)
+        heapq.heappush(
+            OTPDeliveryService._delayed,
+            (time.monotonic() + delay, next(OTPDeliveryService._sequence), message),
+        )
+
+    @staticmethod
+    def _done():
+        with OTPDeliveryService._idle:
+            OTPDeliveryService._pending -= 1
+            OTPDeliveryService._idle.notify_all()
@@ -0,0 +1,99 @@
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Sequence
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker(settings_module):
+    """Configure Django in a pool process (needed when processes are spawned, not forked)"""
+    import django
+    from django.apps import apps
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    if not apps.ready:
+        django.setup()
+
+
+def _hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+class PasswordHashingService:
+    """
+    Hashes many passwords at once across CPU cores.
+
+    Password hashers are deliberately slow (PBKDF2 runs hundreds of
+    thousands of iterations) and hold the GIL, so creating users one after
+    another is CPU-bound on a single core. Batches are split over a shared
+    process pool; small batches, or PASSWORD_HASHING_WORKERS = 1, hash
+    in-process. A pool that cannot start or breaks falls back to hashing
+    in-process.
+    """
+
+    _pool = None
+    _pool_lock = threading.Lock()
+
+    @staticmethod
+    def workers() -> int:
+        """Number of pool processes (PASSWORD_HASHING_WORKERS, 0 for one per core)"""
+        workers = getattr(settings, 'PASSWORD_HASHING_WORKERS', 0) or os.cpu_count() or 1
+        return max(1, workers)
+
+    @staticmethod
+    def hash_many(passwords: Sequence[Optional[str]]) -> List[str]:
+        """
+        Hash passwords in parallel.
+
+        Args:
+            passwords: Raw passwords; None gives an unusable password
+
+        Returns:
+            list: Encoded passwords, in the same order
+        """
+        passwords = list(passwords)
+        workers = PasswordHashingService.workers()
+        to_hash = [password for password in passwords if password is not None]
+        if workers == 1 or len(to_hash) < getattr(settings, 'PASSWORD_HASHING_PARALLEL_MIN', 4):
+            return _hash_passwords(passwords)
+
+        # A few chunks per worker: fewer round trips, still evenly spread
+        size = max(1, -(-len(to_hash) // (workers * 4)))
+        chunks = [to_hash[start:start + size] for start in range(0, len(to_hash), size)]
+        try:
+            hashed = iter([
+                encoded
+                for chunk in PasswordHashingService._get_pool().map(_hash_passwords, chunks)
+                for encoded in chunk
+            ])
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Password hashing pool failed, hashing in-process: {str(e)}")
+            PasswordHashingService.shutdown()
+            return _hash_passwords(passwords)
+
+        return [make_password(None) if password is None else next(hashed) for password in passwords]
+
+    @staticmethod
+    def shutdown() -> None:
+        """Stop the pool's processes (a new pool starts on the next batch)"""
+        with PasswordHashingService._pool_lock:
+            pool, PasswordHashingService._pool = PasswordHashingService._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _get_pool() -> ProcessPoolExecutor:
+        with PasswordHashingService._pool_lock:
+            if PasswordHashingService._pool is None:
+                PasswordHashingService._pool = ProcessPoolExecutor(
+                    max_workers=PasswordHashingService.workers(),
+                    initializer=_init_worker,
+                    initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'farm_management.settings'),),
+                )
+            return PasswordHashingService._pool
@@ -1,6 +1,11 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from farm_management.serializers import SparseFieldsetMixin
 from .models import Role
+from .stats_service import UserStatsService
+from .uniqueness_service import UserUniquenessService
 from farms.models import Plot, Farm
 
 User = get_user_model()
@@ -25,7 +30,7 @@ class PlotDetailSerializer(serializers.ModelSerializer):
     """Serializer for detailed plot information within nested responses."""
     location = serializers.SerializerMethodField()
     boundary = serializers.SerializerMethodField()
-    fastapi_plot_id = serializers.SerializerMethodField()
+    fastapi_plot_id = serializers.ReadOnlyField()
     farms = FarmSummarySerializer(many=True, read_only=True)
 
     class Meta:
@@ -44,15 +49,6 @@ class PlotDetailSerializer(serializers.ModelSerializer):
             return {'type': 'Polygon', 'coordinates': obj.boundary.coords}
         return None
 
-    def get_fastapi_plot_id(self, obj):
-        """Generate plot ID in the same format as FastAPI services"""
-        if obj.gat_number and obj.plot_number:
-            return f"{obj.gat_number}_{obj.plot_number}"
-        elif obj.gat_number:
-            return obj.gat_number
-        else:
-            return f"plot_{obj.id}"
-
 class FarmerWithPlotsSerializer(serializers.ModelSerializer):
     """Serializer for a Farmer, including a list of their plots."""
     plots = PlotDetailSerializer(many=True, read_only=True)
@@ -77,7 +73,7 @@ class RoleSerializer(serializers.ModelSerializer):
         model = Role
         fields = ['id', 'name', 'display_name']
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     role = RoleSerializer(read_only=True)
     created_by = serializers.StringRelatedField(read_only=True)
     
@@ -89,6 +85,10 @@ class UserSerializer(serializers.ModelSerializer):
             'role', 'created_by', 'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
+        expandable_fields = {
+            'role': {'label': 'display_name'},
+            'created_by': {'label': 'username', 'select_related': ['created_by__role']},
+        }
 
 class FarmerDetailSerializer(UserSerializer):
     """Enhanced serializer for farmers with irrigation and plantation details"""
@@ -232,11 +232,65 @@ class FarmerDetailSerializer(UserSerializer):
                 plantation_data.append(plantation_info)
         return plantation_data
     
+    @staticmethod
+    def get_summary_annotations():
+        """Annotations backing agricultural_summary, one correlated subquery each"""
+        from django.db.models import DecimalField, OuterRef, Subquery, Sum
+        from farm_management.aggregates import SubqueryCount
+        from farms.models import FarmIrrigation
+
+        farmer_plots = Plot.objects.filter(farmer=OuterRef('pk'))
+        farmer_farms = Farm.objects.filter(farm_owner=OuterRef('pk'))
+        return {
+            'summary_plots_count': SubqueryCount(farmer_plots),
+            'summary_farms_count': SubqueryCount(farmer_farms),
+            'summary_irrigations_count': SubqueryCount(
+                FarmIrrigation.objects.filter(farm__farm_owner=OuterRef('pk'))
+            ),
+            'summary_total_area': Subquery(
+                farmer_farms.order_by().values('farm_owner').annotate(
+                    total=Sum('area_size')
+                ).values('total'),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+            'summary_plots_with_boundaries': SubqueryCount(farmer_plots.filter(boundary__isnull=False)),
+            'summary_plots_with_locations': SubqueryCount(farmer_plots.filter(location__isnull=False)),
+        }
+
+    @classmethod
+    def setup_queryset(cls, queryset):
+        """
+        Prepare a farmer queryset for this serializer.
+
+        Adds the summary annotations and prefetches plots, farms and
+        irrigations, so serializing any number of farmers costs a fixed
+        number of queries.
+        """
+        from django.db.models import Prefetch
+        from farms.models import FarmIrrigation
+
+        return queryset.select_related('role', 'created_by').annotate(
+            **cls.get_summary_annotations()
+        ).prefetch_related(
+            'plots',
+            Prefetch(
+                'farms',
+                queryset=Farm.objects.select_related('soil_type', 'crop_type', 'created_by').prefetch_related(
+                    Prefetch('irrigations', queryset=FarmIrrigation.objects.select_related('irrigation_type'))
+                )
+            )
+        )
+
+    def _get_summary_stats(self, obj):
+        """Read the summary annotations, fetching them in one query if obj was not annotated"""
+        keys = list(self.get_summary_annotations())
+        if all(hasattr(obj, key) for key in keys):
+            return {key: getattr(obj, key) for key in keys}
+        return User.objects.filter(pk=obj.pk).annotate(**self.get_summary_annotations()).values(*keys).get()
+
     def get_agricultural_summary(self, obj):
         """Get agricultural summary statistics"""
-        total_plots = obj.plots.count()
-        total_farms = obj.farms.count()
-        total_irrigations = sum(farm.irrigations.count() for farm in obj.farms.all())
+        stats = self._get_summary_stats(obj)
         
         # Get unique irrigation types
         irrigation_types = set()
@@ -251,18 +305,15 @@ class FarmerDetailSerializer(UserSerializer):
             if farm.crop_type and farm.crop_type.crop_type:
                 crop_types.add(farm.crop_type.crop_type)
         
-        # Calculate total area
-        total_area = sum(float(farm.area_size) for farm in obj.farms.all() if farm.area_size)
-        
         return {
-            'total_plots': total_plots,
-            'total_farms': total_farms,
-            'total_irrigations': total_irrigations,
-            'total_area_acres': round(total_area, 2),
+            'total_plots': stats['summary_plots_count'],
+            'total_farms': stats['summary_farms_count'],
+            'total_irrigations': stats['summary_irrigations_count'],
+            'total_area_acres': round(float(stats['summary_total_area'] or 0), 2),
             'irrigation_types': list(irrigation_types),
             'crop_types': list(crop_types),
-            'plots_with_boundaries': obj.plots.filter(boundary__isnull=False).count(),
-            'plots_with_locations': obj.plots.filter(location__isnull=False).count()
+            'plots_with_boundaries': stats['summary_plots_with_boundaries'],
+            'plots_with_locations': stats['summary_plots_with_locations']
         }
 
 class FieldOfficerWithFarmersSerializer(serializers.ModelSerializer):
@@ -270,28 +321,47 @@ class FieldOfficerWithFarmersSerializer(serializers.ModelSerializer):
     Serializer for a Field Officer, including a nested list of their farmers and plots.
     """
     farmers = serializers.SerializerMethodField()
+    farmers_count = serializers.SerializerMethodField()
     role = serializers.StringRelatedField()
 
     class Meta:
         model = User
         fields = [
             'id', 'username', 'first_name', 'last_name', 'email', 'phone_number',
-            'role', 'farmers'
+            'role', 'farmers', 'farmers_count'
         ]
 
+    @staticmethod
+    def setup_queryset(queryset):
+        """
+        Load the officers' farmers with their plots, farms and crop types in
+        one query per level for the whole list (read by get_farmers), instead
+        of a farmer query per officer.
+        """
+        from django.db.models import Prefetch
+        farmers = (
+            User.objects.filter(role__name='farmer').select_related('role')
+            .prefetch_related('plots__farms__crop_type').order_by('first_name')
+        )
+        return queryset.select_related('role', 'stats').prefetch_related(
+            Prefetch('created_users', queryset=farmers, to_attr='prefetched_farmers')
+        )
+
     def get_farmers(self, obj):
         """
         Get all farmers created by this field officer, serialized with their plots.
         """
-        # We query for farmers who have this field officer as their creator.
-        farmers = User.objects.filter(
-            created_by=obj,
-            role__name='farmer'
-        ).prefetch_related('plots__farms__crop_type').order_by('first_name')
-        
+        farmers = getattr(obj, 'prefetched_farmers', None)
+        if farmers is None:
+            # Not loaded with setup_queryset: query this officer's farmers
+            farmers = FieldOfficerWithFarmersSerializer.setup_queryset(User.objects.filter(pk=obj.pk)).get().prefetched_farmers
         serializer = FarmerWithPlotsSerializer(farmers, many=True, context=self.context)
         return serializer.data
 
+    def get_farmers_count(self, obj):
+        """Farmers this field officer registered, from the maintained UserStats row"""
+        return UserStatsService.for_user(obj).farmers_count
+
 class FieldOfficerSerializer(FieldOfficerWithFarmersSerializer):
     pass
 
@@ -332,19 +402,33 @@ class ManagerHierarchySerializer(UserSerializer):
     
     def get_field_officers(self, obj):
         """Get all field officers created by this manager"""
-        field_officers = obj.created_users.filter(role__name='fieldofficer')
+        field_officers = getattr(obj, 'prefetched_field_officers', None)
+        if field_officers is None:
+            field_officers = FieldOfficerWithFarmersSerializer.setup_queryset(
+                obj.created_users.filter(role__name='fieldofficer')
+            )
         return FieldOfficerSerializer(field_officers, many=True).data
     
     def get_field_officers_count(self, obj):
         """Count of field officers under this manager"""
-        return obj.created_users.filter(role__name='fieldofficer').count()
+        return UserStatsService.for_user(obj).field_officers_count
     
+    @staticmethod
+    def setup_queryset(queryset):
+        """
+        Join the maintained hierarchy counts this serializer reads, and load
+        every manager's field officers, their farmers and plots level by level
+        for the whole list: a fixed number of queries however large the hierarchy.
+        """
+        from django.db.models import Prefetch
+        field_officers = FieldOfficerWithFarmersSerializer.setup_queryset(User.objects.filter(role__name='fieldofficer'))
+        return queryset.select_related('role', 'created_by__role', 'stats').prefetch_related(
+            Prefetch('created_users', queryset=field_officers, to_attr='prefetched_field_officers')
+        )
+
     def get_total_farmers_count(self, obj):
-        """Count of total farmers under this manager (through field officers)"""
-        total = 0
-        for field_officer in obj.created_users.filter(role__name='fieldofficer'):
-            total += field_officer.created_users.filter(role__name='farmer').count()
-        return total
+        """Count of total farmers anywhere under this manager in the hierarchy"""
+        return UserStatsService.for_user(obj).descendant_farmers_count
 
 class OwnerHierarchySerializer(serializers.ModelSerializer):
     """Serializer for Owner showing complete hierarchy"""
@@ -371,20 +455,52 @@ class OwnerHierarchySerializer(serializers.ModelSerializer):
     def get_managers(self, obj):
         """Get all managers in the system"""
         # Special logic: Owner can monitor all managers, including the one who created them
-        managers = User.objects.filter(role__name='manager')
+        managers = ManagerHierarchySerializer.setup_queryset(User.objects.filter(role__name='manager'))
         return ManagerHierarchySerializer(managers, many=True).data
     
     def get_managers_count(self, obj):
         """Count of total managers"""
-        return User.objects.filter(role__name='manager').count()
+        from .hierarchy_cache_service import HierarchyCacheService
+        return HierarchyCacheService.get_count('manager')
     
     def get_total_field_officers(self, obj):
         """Count of total field officers across all managers"""
-        return User.objects.filter(role__name='fieldofficer').count()
+        from .hierarchy_cache_service import HierarchyCacheService
+        return HierarchyCacheService.get_count('fieldofficer')
     
     def get_total_farmers(self, obj):
         """Count of total farmers across all field officers"""
-        return User.objects.filter(role__name='farmer').count()
+        from .hierarchy_cache_service import HierarchyCacheService
+        return HierarchyCacheService.get_count('farmer')
+
+class UserCreateListSerializer(serializers.ListSerializer):
+    """Creates a batch of users (e.g. an import), hashing their passwords in parallel"""
+
+    def to_internal_value(self, data):
+        """Check every username and email of the batch at once, reporting each entry's conflicts"""
+        validated_data = super().to_internal_value(data)
+        conflicts = UserUniquenessService.find_conflicts(validated_data)
+        if conflicts:
+            raise serializers.ValidationError([
+                {
+                    field: [UserCreateSerializer.conflict_message(field, earlier_index)]
+                    for field, earlier_index in conflicts.get(index, {}).items()
+                }
+                for index in range(len(validated_data))
+            ])
+        return validated_data
+
+    def create(self, validated_data):
+        from .password_service import PasswordHashingService
+
+        # Hashing dominates creating users: spread it over the cores first
+        encoded_passwords = PasswordHashingService.hash_many([item['password'] for item in validated_data])
+        with transaction.atomic():
+            return [
+                self.child.create_with_encoded_password(dict(item), encoded)
+                for item, encoded in zip(validated_data, encoded_passwords)
+            ]
+
 
 class UserCreateSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -397,6 +513,9 @@ class UserCreateSerializer(serializers.ModelSerializer):
             'phone_number', 'address', 'village', 'taluka', 'district', 'state',
             'role_id'
         ]
+        list_serializer_class = UserCreateListSerializer
+        # Uniqueness is checked in validate() for all fields at once (the database constraint closes the race)
+        extra_kwargs = {'username': {'validators': [User.username_validator]}}
     
     def validate_role_id(self, value):
         """Validate that the role exists and is appropriate"""
@@ -413,21 +532,40 @@ class UserCreateSerializer(serializers.ModelSerializer):
         
         return value
     
-    def validate_email(self, value):
-        """Ensure email is unique"""
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
-        return value
-    
-    def validate_username(self, value):
-        """Ensure username is unique"""
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError("A user with this username already exists.")
-        return value
+    def validate(self, attrs):
+        """Ensure username and email are unique (a list serializer checks its whole batch instead)"""
+        if not isinstance(self.parent, serializers.ListSerializer):
+            conflicts = UserUniquenessService.find_conflicts([attrs]).get(0)
+            if conflicts:
+                raise serializers.ValidationError({
+                    field: [self.conflict_message(field, earlier_index)]
+                    for field, earlier_index in conflicts.items()
+                })
+        return attrs
+
+    @staticmethod
+    def conflict_message(field, earlier_index):
+        if earlier_index is None:
+            return f"A user with this {field} already exists."
+        return f"Same {field} as entry {earlier_index + 1}."
     
     def create(self, validated_data):
-        role_id = validated_data.pop('role_id')
         password = validated_data.pop('password')
+        return self.create_with_encoded_password(validated_data, make_password(password))
+
+    def create_with_encoded_password(self, validated_data, encoded_password):
+        """
+        Create the user with an already hashed password.
+
+        Args:
+            validated_data: Validated fields (a 'password' entry is ignored)
+            encoded_password: Output of make_password / PasswordHashingService
+
+        Returns:
+            User: The saved user
+        """
+        role_id = validated_data.pop('role_id')
+        validated_data.pop('password', None)
         
         # Get the role
         try:
@@ -435,14 +573,26 @@ class UserCreateSerializer(serializers.ModelSerializer):
         except Role.DoesNotExist:
             raise serializers.ValidationError(f"Role with ID {role_id} does not exist")
         
-        # Set created_by to the current user (manager)
-        user = User.objects.create_user(
+        # Set created_by to the current user (manager); one INSERT, no second save for the password
+        validated_data['username'] = User.normalize_username(validated_data['username'])
+        validated_data['email'] = User.objects.normalize_email(validated_data.get('email', ''))
+        user = User(
             **validated_data,
             role=role,
             created_by=self.context['request'].user
         )
-        user.set_password(password)
-        user.save()
+        user.password = encoded_password
+        try:
+            # Savepoint: the transaction stays usable to report the conflict
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            # Taken by a concurrent request after validation
+            raise serializers.ValidationError({
+                'username': [self.conflict_message('username', None)]
+            } if User.objects.filter(username=user.username).exists() else {
+                'email': [self.conflict_message('email', None)]
+            })
         
         return user
 
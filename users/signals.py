@@ -0,0 +1,103 @@
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+import logging
+
+from farm_management.versions import ModelVersionService
+from .authentication import AuthUserCacheService
+from .hierarchy_service import UserHierarchyService
+from .hierarchy_cache_service import HierarchyCacheService
+from .stats_service import UserStatsService
+from .models import Role
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+# Fields that never appear in hierarchy snapshots; saves touching only these
+# (logins, OTPs, password resets) leave the cached hierarchy alone
+HIERARCHY_IRRELEVANT_FIELDS = {
+    'last_login', 'password', 'otp', 'otp_created_at', 'otp_delivery_method', 'otp_failed_attempts',
+    'password_reset_token', 'password_reset_token_created_at', 'updated_at',
+}
+
+
+@receiver(post_init, sender=User)
+def remember_created_by(sender, instance, **kwargs):
+    """Remember the loaded created_by and role so a change can be detected on save"""
+    instance._loaded_created_by_id = instance.__dict__.get('created_by_id', DEFERRED)
+    instance._loaded_role_id = instance.__dict__.get('role_id', DEFERRED)
+
+
+@receiver(post_save, sender=User)
+def update_user_hierarchy(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Keep the UserHierarchy closure table and hierarchy caches in step with created_by"""
+    if raw:
+        return
+    if update_fields and set(update_fields) <= HIERARCHY_IRRELEVANT_FIELDS:
+        return
+    if created:
+        UserHierarchyService.add_user(instance)
+        HierarchyCacheService.user_created(instance)
+        UserStatsService.user_created(instance)
+    elif 'created_by_id' in instance.__dict__ and instance.created_by_id != instance._loaded_created_by_id:
+        logger.info(f"User {instance.pk} moved from creator {instance._loaded_created_by_id} to {instance.created_by_id}")
+        # Invalidate under the old creator, re-link, then under the new one
+        HierarchyCacheService.user_moved([instance.pk])
+        previous_ancestor_ids = UserStatsService.ancestor_ids([instance.pk])
+        UserHierarchyService.move_user(instance, instance.created_by_id)
+        HierarchyCacheService.user_moved([instance.pk])
+        UserStatsService.hierarchy_changed([instance.pk], previous_ancestor_ids)
+    elif 'role_id' in instance.__dict__ and instance.role_id != instance._loaded_role_id:
+        HierarchyCacheService.user_moved([instance.pk])
+        UserStatsService.hierarchy_changed([instance.pk])
+    else:
+        HierarchyCacheService.user_updated([instance.pk])
+    instance._loaded_created_by_id = instance.__dict__.get('created_by_id', DEFERRED)
+    instance._loaded_role_id = instance.__dict__.get('role_id', DEFERRED)
+
+
+@receiver(pre_delete, sender=User)
+def detach_user_hierarchy(sender, instance, **kwargs):
+    """Unlink the subtrees of a user's children before the user goes away"""
+    HierarchyCacheService.user_moved([instance.pk])
+    instance._stats_ancestor_ids = UserStatsService.ancestor_ids([instance.pk])
+    UserHierarchyService.detach_children(instance)
+
+
+@receiver(post_delete, sender=User)
+def recount_after_user_deletion(sender, instance, **kwargs):
+    """The deleted user (and the subtrees detached from it) no longer count above it"""
+    UserStatsService.recompute(getattr(instance, '_stats_ancestor_ids', []))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def bump_user_model_version(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Move the model's change version on, except for login/OTP bookkeeping saves"""
+    if raw or (update_fields and set(update_fields) <= HIERARCHY_IRRELEVANT_FIELDS):
+        return
+    ModelVersionService.bump(sender._meta.label)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_auth_user(sender, instance, raw=False, **kwargs):
+    """The next request re-reads the user (deactivation, role or password change, ...)"""
+    if raw:
+        return
+    from rest_framework_simplejwt.settings import api_settings
+    AuthUserCacheService.invalidate([getattr(instance, api_settings.USER_ID_FIELD)])
+
+
+@receiver(post_save, sender=Role)
+@receiver(pre_delete, sender=Role)
+def forget_cached_auth_users_of_role(sender, instance, raw=False, **kwargs):
+    """Cached users carry their role: drop everyone holding a changed role"""
+    if raw:
+        return
+    from rest_framework_simplejwt.settings import api_settings
+    AuthUserCacheService.invalidate(instance.users.values_list(api_settings.USER_ID_FIELD, flat=True).iterator())
+
@@ -0,0 +1,167 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F
+
+from .models import UserHierarchy, UserStats
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+class UserStatsService:
+    """
+    Maintains the denormalized UserStats counters.
+
+    Signal receivers report row-level changes as counter deltas
+    ({(user_id, field): delta}); each affected user's row is then updated
+    with one UPDATE using F() expressions, so concurrent changes never lose
+    increments. Changes that move many rows at once (a user changing
+    creator or role, a deletion detaching subtrees) recompute the affected
+    users instead. A missing row is recomputed on first use.
+    """
+
+    BATCH_SIZE = 5000
+    FIELDS = [
+        'plots_count', 'farms_count', 'irrigations_count',
+        'created_plots_count', 'created_farms_count', 'created_irrigations_count',
+        'farmers_count', 'field_officers_count', 'descendant_farmers_count',
+    ]
+    # Direct-children counters by the child's role
+    CHILD_ROLE_FIELDS = {'farmer': 'farmers_count', 'fieldofficer': 'field_officers_count'}
+
+    @staticmethod
+    def apply(deltas: Dict[Tuple[Optional[int], str], int]) -> None:
+        """
+        Apply counter deltas atomically.
+
+        Args:
+            deltas: {(user_id, field): delta}; entries without a user or with a zero delta are ignored
+        """
+        per_user = defaultdict(dict)
+        for (user_id, field), delta in deltas.items():
+            if user_id and delta:
+                per_user[user_id][field] = delta
+        for user_id, changes in per_user.items():
+            updated = UserStats.objects.filter(user_id=user_id).update(
+                **{field: F(field) + delta for field, delta in changes.items()}
+            )
+            if not updated:
+                # No row yet (user predates the table): count from scratch instead
+                UserStatsService.recompute([user_id])
+
+    @staticmethod
+    def user_created(user) -> None:
+        """Create a new user's row and count them under their creator and ancestors"""
+        UserStats.objects.bulk_create([UserStats(user_id=user.pk)], ignore_conflicts=True)
+        deltas = {}
+        role_name = user.role_name
+        if role_name in UserStatsService.CHILD_ROLE_FIELDS:
+            deltas[(user.created_by_id, UserStatsService.CHILD_ROLE_FIELDS[role_name])] = 1
+        if role_name == 'farmer':
+            for ancestor_id in UserStatsService.ancestor_ids([user.pk]):
+                deltas[(ancestor_id, 'descendant_farmers_count')] = 1
+        UserStatsService.apply(deltas)
+
+    @staticmethod
+    def get(user_id: int) -> UserStats:
+        """
+        A user's stats row, recomputing it if it is missing.
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            UserStats: The user's counters
+        """
+        stats = UserStats.objects.filter(user_id=user_id).first()
+        if stats is None:
+            UserStatsService.recompute([user_id])
+            stats = UserStats.objects.get(user_id=user_id)
+        return stats
+
+    @staticmethod
+    def for_user(user) -> UserStats:
+        """A user's stats: the row joined with select_related('stats') if there is one"""
+        stats = getattr(user, 'stats', None)
+        return stats if stats is not None else UserStatsService.get(user.pk)
+
+    @staticmethod
+    def recompute(user_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recount users' stats from the source tables.
+
+        Args:
+            user_ids: Users to recompute (None for everyone)
+
+        Returns:
+            int: Number of rows written
+        """
+        if user_ids is None:
+            all_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+        else:
+            # Users deleted in the meantime have no row to write
+            all_ids = list(
+                User.objects.filter(pk__in={pk for pk in user_ids if pk}).order_by('pk').values_list('pk', flat=True)
+            )
+
+        written = 0
+        for start in range(0, len(all_ids), UserStatsService.BATCH_SIZE):
+            batch = all_ids[start:start + UserStatsService.BATCH_SIZE]
+            counts = UserStatsService._count(batch)
+            UserStats.objects.bulk_create(
+                [
+                    UserStats(user_id=user_id, **{field: counts[field].get(user_id, 0) for field in UserStatsService.FIELDS})
+                    for user_id in batch
+                ],
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=UserStatsService.FIELDS,
+            )
+            written += len(batch)
+        return written
+
+    @staticmethod
+    def hierarchy_changed(user_ids: Iterable[int], previous_ancestor_ids: Iterable[int] = ()) -> None:
+        """
+        Recompute the users above users whose creator, role or existence changed.
+
+        Args:
+            user_ids: Users that moved, changed role or were deleted
+            previous_ancestor_ids: Their ancestors before the change (from ancestor_ids)
+        """
+        UserStatsService.recompute(set(previous_ancestor_ids) | set(UserStatsService.ancestor_ids(user_ids)))
+
+    @staticmethod
+    def ancestor_ids(user_ids: Iterable[int]) -> list:
+        """IDs of every user above the given users in the created_by tree"""
+        user_ids = [pk for pk in user_ids if pk]
+        if not user_ids:
+            return []
+        return list(
+            UserHierarchy.objects.filter(descendant_id__in=user_ids, depth__gt=0)
+            .values_list('ancestor_id', flat=True).distinct()
+        )
+
+    @staticmethod
+    def _count(user_ids: list) -> Dict[str, Dict[int, int]]:
+        from farms.models import Farm, FarmIrrigation, Plot
+
+        def grouped(queryset, key):
+            return dict(queryset.filter(**{f'{key}__in': user_ids}).values_list(key).annotate(count=Count('pk')).order_by())
+
+        return {
+            'plots_count': grouped(Plot.objects.all(), 'farmer_id'),
+            'farms_count': grouped(Farm.objects.all(), 'farm_owner_id'),
+            'irrigations_count': grouped(FarmIrrigation.objects.all(), 'farm__farm_owner_id'),
+            'created_plots_count': grouped(Plot.objects.all(), 'created_by_id'),
+            'created_farms_count': grouped(Farm.objects.all(), 'created_by_id'),
+            'created_irrigations_count': grouped(FarmIrrigation.objects.all(), 'farm__created_by_id'),
+            'farmers_count': grouped(User.objects.filter(role__name='farmer'), 'created_by_id'),
+            'field_officers_count': grouped(User.objects.filter(role__name='fieldofficer'), 'created_by_id'),
+            'descendant_farmers_count': grouped(
+                UserHierarchy.objects.filter(depth__gt=0, descendant__role__name='farmer'), 'ancestor_id'
+            ),
+        }
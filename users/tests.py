@@ -0,0 +1,720 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from farm_management.idempotency import IdempotencyKeyInProgress, IdempotencyKeyReused, IdempotencyService
+from farms.models import CropType, Farm, FarmIrrigation, IrrigationType, Plot
+from .authentication import AuthUserCacheService, RoleAwareJWTAuthentication
+from .hierarchy_cache_service import HierarchyCacheService
+from .hierarchy_service import UserHierarchyService
+from .models import Role, UserHierarchy, UserStats
+from .otp_delivery import LocalTransport, OTPDeliveryService
+from .stats_service import UserStatsService
+from .uniqueness_service import UserUniquenessService
+
+User = get_user_model()
+
+
+class UserHierarchyTests(TestCase):
+    """The closure table follows created_by through creation, moves and deletion"""
+
+    def setUp(self):
+        self.manager_role = Role.objects.create(name='manager', display_name='Manager')
+        self.fieldofficer_role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        self.farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        self.manager = self._create_user('manager', self.manager_role)
+        self.officer = self._create_user('officer', self.fieldofficer_role, self.manager)
+        self.farmer = self._create_user('farmer', self.farmer_role, self.officer)
+
+    def _create_user(self, username, role, created_by=None):
+        return User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='test-pass-123',
+            role=role,
+            created_by=created_by,
+        )
+
+    def _links(self):
+        return set(UserHierarchy.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+
+    def _ancestors(self, user):
+        return list(UserHierarchyService.get_ancestors(user))
+
+    def test_creation_links_every_ancestor(self):
+        self.assertEqual(self._ancestors(self.farmer), [self.officer, self.manager])
+        self.assertEqual(set(UserHierarchyService.get_descendants(self.manager)), {self.officer, self.farmer})
+        self.assertEqual(list(UserHierarchyService.get_descendants(self.manager, max_depth=1)), [self.officer])
+        self.assertEqual(
+            list(UserHierarchyService.get_descendants(self.manager, role_name='farmer')), [self.farmer]
+        )
+        self.assertIn((self.farmer.pk, self.farmer.pk, 0), self._links())
+
+    def test_moving_a_user_moves_its_subtree(self):
+        other_manager = self._create_user('other_manager', self.manager_role)
+        self.officer.created_by = other_manager
+        self.officer.save()
+
+        self.assertEqual(self._ancestors(self.farmer), [self.officer, other_manager])
+        self.assertFalse(UserHierarchyService.get_descendants(self.manager).exists())
+        self.assertEqual(
+            UserHierarchy.objects.get(ancestor=other_manager, descendant=self.farmer).depth, 2
+        )
+
+    def test_moving_under_own_descendant_makes_a_root(self):
+        self.manager.created_by = self.farmer
+        self.manager.save()
+
+        self.assertEqual(self._ancestors(self.manager), [])
+        self.assertEqual(self._ancestors(self.farmer), [self.officer, self.manager])
+
+    def test_deleting_a_user_detaches_its_children(self):
+        self.officer.delete()
+
+        self.assertEqual(self._ancestors(self.farmer), [])
+        self.assertFalse(UserHierarchyService.get_descendants(self.manager).exists())
+        self.assertEqual(self._links(), {
+            (self.manager.pk, self.manager.pk, 0),
+            (self.farmer.pk, self.farmer.pk, 0),
+        })
+
+    def test_bulk_added_users_match_a_rebuild(self):
+        farmers = User.objects.bulk_create([
+            User(username=f'bulk{i}', email=f'bulk{i}@example.com', role=self.farmer_role, created_by=self.officer)
+            for i in range(3)
+        ])
+        UserHierarchyService.add_users(farmers)
+        maintained = self._links()
+
+        UserHierarchyService.rebuild()
+        self.assertEqual(self._links(), maintained)
+        self.assertEqual(UserHierarchyService.get_descendants(self.manager, role_name='farmer').count(), 4)
+
+
+class HierarchyCacheTests(TestCase):
+    """Snapshots and counts are retired by changes below them, including changes made while building"""
+
+    def setUp(self):
+        cache.clear()
+        manager_role = Role.objects.create(name='manager', display_name='Manager')
+        fieldofficer_role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        self.farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='test-pass-123', role=manager_role,
+        )
+        self.other_manager = User.objects.create_user(
+            username='other_manager', email='other_manager@example.com', password='test-pass-123',
+            role=manager_role,
+        )
+        self.officer = User.objects.create_user(
+            username='officer', email='officer@example.com', password='test-pass-123',
+            role=fieldofficer_role, created_by=self.manager,
+        )
+        self.farmer = User.objects.create_user(
+            username='farmer', email='farmer@example.com', password='test-pass-123',
+            role=self.farmer_role, created_by=self.officer,
+        )
+
+    def test_change_below_a_manager_retires_only_their_snapshot(self):
+        HierarchyCacheService.get_snapshot('manager', self.manager.pk, lambda: 'before')
+        HierarchyCacheService.get_snapshot('manager', self.other_manager.pk, lambda: 'other')
+
+        self.farmer.first_name = 'Renamed'
+        self.farmer.save()
+
+        self.assertEqual(HierarchyCacheService.get_snapshot('manager', self.manager.pk, lambda: 'after'), 'after')
+        self.assertEqual(HierarchyCacheService.get_snapshot('manager', self.other_manager.pk, lambda: 'new'), 'other')
+        self.assertEqual(HierarchyCacheService.get_snapshot('owner', None, lambda: 'owner'), 'owner')
+
+    def test_snapshot_built_during_a_change_is_not_served(self):
+        def build_while_changing():
+            self.farmer.first_name = 'Changed meanwhile'
+            self.farmer.save()
+            return 'stale'
+
+        for scope, user_id in (('manager', self.manager.pk), ('owner', None)):
+            self.assertEqual(HierarchyCacheService.get_snapshot(scope, user_id, build_while_changing), 'stale')
+            self.assertEqual(HierarchyCacheService.get_snapshot(scope, user_id, lambda: 'fresh'), 'fresh')
+            self.assertEqual(HierarchyCacheService.get_snapshot(scope, user_id, lambda: 'rebuilt'), 'fresh')
+
+    def test_counts_follow_creation_and_moves(self):
+        self.assertEqual(HierarchyCacheService.get_count('farmer', self.manager.pk), 1)
+        self.assertEqual(HierarchyCacheService.get_count('farmer'), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(
+                username='farmer2', email='farmer2@example.com', password='test-pass-123',
+                role=self.farmer_role, created_by=self.officer,
+            )
+        self.assertEqual(HierarchyCacheService.get_count('farmer', self.manager.pk), 2)
+        self.assertEqual(HierarchyCacheService.get_count('farmer'), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.officer.created_by = self.other_manager
+            self.officer.save()
+        self.assertEqual(HierarchyCacheService.get_count('farmer', self.manager.pk), 0)
+        self.assertEqual(HierarchyCacheService.get_count('farmer', self.other_manager.pk), 2)
+
+    def test_moving_a_plot_retires_the_previous_farmers_snapshots(self):
+        other_officer = User.objects.create_user(
+            username='other_officer', email='other_officer@example.com', password='test-pass-123',
+            role=self.officer.role, created_by=self.other_manager,
+        )
+        other_farmer = User.objects.create_user(
+            username='other_farmer', email='other_farmer@example.com', password='test-pass-123',
+            role=self.farmer_role, created_by=other_officer,
+        )
+        plot = Plot(gat_number='GAT1', village='Village', farmer=self.farmer, created_by=self.officer)
+        plot._skip_fastapi_sync = True
+        plot.save()
+        plot = Plot.objects.get(pk=plot.pk)
+        plot._skip_fastapi_sync = True
+        HierarchyCacheService.get_snapshot('manager', self.manager.pk, lambda: 'before')
+        HierarchyCacheService.get_snapshot('manager', self.other_manager.pk, lambda: 'other')
+
+        plot.farmer = other_farmer
+        plot.save()
+
+        self.assertEqual(HierarchyCacheService.get_snapshot('manager', self.manager.pk, lambda: 'after'), 'after')
+        self.assertEqual(HierarchyCacheService.get_snapshot('manager', self.other_manager.pk, lambda: 'new'), 'new')
+
+
+class UserRoleScopingTests(APITestCase):
+    """Each role lists the users it could list before scoping became declarative"""
+
+    def setUp(self):
+        self.users = {
+            name: User.objects.create_user(
+                username=name, email=f'{name}@example.com', password='test-pass-123',
+                role=Role.objects.create(name=name, display_name=name.title()),
+            )
+            for name in ('admin', 'owner', 'manager', 'agronomist', 'qualitycontrol', 'fieldofficer', 'farmer')
+        }
+        self.superuser = User.objects.create_superuser(
+            username='superuser', email='superuser@example.com', password='test-pass-123',
+        )
+
+    def _visible_usernames(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/users/')
+        self.assertEqual(response.status_code, 200)
+        return {row['username'] for row in response.data['results']}
+
+    def test_each_role_sees_the_same_users(self):
+        everyone = set(self.users) | {'superuser'}
+        expected = {
+            'admin': everyone,
+            'owner': {'manager', 'fieldofficer', 'farmer'},
+            'manager': {'agronomist', 'qualitycontrol', 'fieldofficer', 'farmer'},
+            'agronomist': {'agronomist'},
+            'fieldofficer': {'fieldofficer'},
+            'farmer': {'farmer'},
+        }
+        self.assertEqual(self._visible_usernames(self.superuser), everyone)
+        for name, usernames in expected.items():
+            with self.subTest(role=name):
+                self.assertEqual(self._visible_usernames(self.users[name]), usernames)
+
+    def test_expanded_fields_do_not_add_queries_per_user(self):
+        requests = ({}, {'expand': 'created_by'}, {'expand': 'role'}, {'fields': 'id,created_by'})
+
+        def count_queries(params):
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/users/', {**params, 'page_size': 100})
+            self.assertEqual(response.status_code, 200)
+            return len(queries.captured_queries)
+
+        self.client.force_authenticate(self.superuser)
+        small_counts = [count_queries(params) for params in requests]
+        for i in range(5):
+            User.objects.create_user(
+                username=f'farmer{i}', email=f'farmer{i}@example.com', password='test-pass-123',
+                role=self.users['farmer'].role, created_by=self.users['fieldofficer'],
+            )
+        for params, small_count in zip(requests, small_counts):
+            with self.subTest(params=params):
+                self.assertEqual(count_queries(params), small_count)
+
+
+class UserStatsTests(TestCase):
+    """Incrementally kept counters always match a full recount"""
+
+    def setUp(self):
+        manager_role = Role.objects.create(name='manager', display_name='Manager')
+        fieldofficer_role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='test-pass-123', role=manager_role,
+        )
+        self.other_manager = User.objects.create_user(
+            username='other_manager', email='other_manager@example.com', password='test-pass-123',
+            role=manager_role,
+        )
+        self.officer = User.objects.create_user(
+            username='officer', email='officer@example.com', password='test-pass-123',
+            role=fieldofficer_role, created_by=self.manager,
+        )
+        self.farmer_a = User.objects.create_user(
+            username='farmer_a', email='farmer_a@example.com', password='test-pass-123',
+            role=farmer_role, created_by=self.officer,
+        )
+        self.farmer_b = User.objects.create_user(
+            username='farmer_b', email='farmer_b@example.com', password='test-pass-123',
+            role=farmer_role, created_by=self.officer,
+        )
+        self.plot = Plot(gat_number='GAT1', village='Village', farmer=self.farmer_a, created_by=self.officer)
+        self.plot._skip_fastapi_sync = True
+        self.plot.save()
+        self.farm = Farm.objects.create(
+            farm_owner=self.farmer_a, created_by=self.officer, plot=self.plot, address='Farm address', area_size='2.50',
+        )
+        self.other_farm = Farm.objects.create(
+            farm_owner=self.farmer_b, created_by=self.officer, plot=self.plot, address='Other address',
+            area_size='1.00',
+        )
+        self.irrigation = FarmIrrigation.objects.create(
+            farm=self.farm,
+            irrigation_type=IrrigationType.objects.create(name='drip'),
+            location=Point(73.85, 18.52, srid=4326),
+        )
+
+    def _stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def assertMatchesRecount(self):
+        fields = ['user_id'] + UserStatsService.FIELDS
+        maintained = sorted(UserStats.objects.values_list(*fields))
+        UserStatsService.recompute()
+        self.assertEqual(maintained, sorted(UserStats.objects.values_list(*fields)))
+
+    def test_creation_counts(self):
+        self.assertEqual(self._stats(self.farmer_a).plots_count, 1)
+        self.assertEqual(self._stats(self.farmer_a).irrigations_count, 1)
+        officer = self._stats(self.officer)
+        self.assertEqual(
+            (officer.created_farms_count, officer.created_irrigations_count, officer.farmers_count), (2, 1, 2)
+        )
+        manager = self._stats(self.manager)
+        self.assertEqual((manager.field_officers_count, manager.descendant_farmers_count), (1, 2))
+        self.assertMatchesRecount()
+
+    def test_reassigning_a_farm_moves_its_irrigations(self):
+        self.farm.farm_owner = self.farmer_b
+        self.farm.save()
+
+        self.assertEqual((self._stats(self.farmer_a).farms_count, self._stats(self.farmer_a).irrigations_count), (0, 0))
+        self.assertEqual((self._stats(self.farmer_b).farms_count, self._stats(self.farmer_b).irrigations_count), (2, 1))
+        self.assertMatchesRecount()
+
+    def test_moving_plot_and_irrigation(self):
+        self.plot.farmer = self.farmer_b
+        self.plot.save()
+        self.irrigation.farm = self.other_farm
+        self.irrigation.save()
+
+        self.assertEqual(self._stats(self.farmer_b).plots_count, 1)
+        self.assertEqual(self._stats(self.farmer_a).irrigations_count, 0)
+        self.assertEqual(self._stats(self.farmer_b).irrigations_count, 1)
+        self.assertMatchesRecount()
+
+    def test_deleting_a_farm_and_a_farmer(self):
+        self.farm.delete()
+        self.assertEqual(self._stats(self.officer).created_irrigations_count, 0)
+        self.assertEqual(self._stats(self.officer).created_farms_count, 1)
+        self.assertMatchesRecount()
+
+        # farmer_b's farm goes with them; the plot is farmer_a's and stays
+        self.farmer_b.delete()
+        self.assertEqual(self._stats(self.officer).farmers_count, 1)
+        self.assertEqual(self._stats(self.manager).descendant_farmers_count, 1)
+        self.assertMatchesRecount()
+
+    def test_moving_an_officer_moves_descendant_counts(self):
+        self.officer.created_by = self.other_manager
+        self.officer.save()
+
+        self.assertEqual(self._stats(self.manager).field_officers_count, 0)
+        self.assertEqual(self._stats(self.manager).descendant_farmers_count, 0)
+        self.assertEqual(self._stats(self.other_manager).descendant_farmers_count, 2)
+        self.assertMatchesRecount()
+
+
+class OTPLoginTests(APITestCase):
+    """OTP login is limited to passwordless farmers, a few guesses per OTP and a throttled rate"""
+
+    def setUp(self):
+        cache.clear()
+        farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        self.farmer = User.objects.create_user(
+            username='farmer', email='farmer@example.com', password=None, role=farmer_role,
+        )
+        self.password_farmer = User.objects.create_user(
+            username='password_farmer', email='password_farmer@example.com', password='farmer-pass-123',
+            role=farmer_role,
+        )
+
+    def _issue_otp(self, user, code='123456'):
+        user.otp = code
+        user.otp_created_at = timezone.now()
+        user.otp_failed_attempts = 0
+        user.save(update_fields=['otp', 'otp_created_at', 'otp_failed_attempts'])
+
+    def _verify(self, email, otp):
+        return self.client.post('/api/users/verify-otp/', {'email': email, 'otp': otp}, format='json')
+
+    def test_passwordless_farmer_logs_in_once(self):
+        self._issue_otp(self.farmer)
+
+        response = self._verify('FARMER@example.com', '123456')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+        self.assertTrue(response.data['password_setup_required'])
+        self.assertEqual(self._verify('farmer@example.com', '123456').status_code, 401)
+
+    def test_farmer_with_a_password_cannot_use_an_otp(self):
+        self._issue_otp(self.password_farmer)
+
+        self.assertEqual(self._verify('password_farmer@example.com', '123456').status_code, 401)
+        self.client.post('/api/users/send-otp/', {'email': 'password_farmer@example.com'}, format='json')
+        self.password_farmer.refresh_from_db()
+        self.assertEqual(self.password_farmer.otp_failed_attempts, 0)
+
+    def test_otp_is_discarded_after_too_many_wrong_codes(self):
+        self._issue_otp(self.farmer)
+
+        for _ in range(settings.OTP_MAX_FAILED_ATTEMPTS):
+            self.assertEqual(self._verify('farmer@example.com', '000000').status_code, 401)
+        self.farmer.refresh_from_db()
+        self.assertIsNone(self.farmer.otp)
+        self.assertEqual(self._verify('farmer@example.com', '123456').status_code, 401)
+
+    def test_wrong_codes_below_the_limit_still_allow_login(self):
+        self._issue_otp(self.farmer)
+
+        for _ in range(settings.OTP_MAX_FAILED_ATTEMPTS - 1):
+            self._verify('farmer@example.com', '000000')
+        self.assertEqual(self._verify('farmer@example.com', '123456').status_code, 200)
+        self.farmer.refresh_from_db()
+        self.assertEqual(self.farmer.otp_failed_attempts, 0)
+
+    def test_otp_actions_are_throttled(self):
+        statuses = [
+            self.client.post('/api/users/send-otp/', {'email': 'nobody@example.com'}, format='json').status_code
+            for _ in range(20)
+        ]
+        self.assertEqual(statuses[0], 200)
+        self.assertEqual(statuses[-1], 429)
+
+
+@override_settings(
+    OTP_TRANSPORTS={
+        'whatsapp': 'users.otp_delivery.LocalTransport',
+        'email': 'users.otp_delivery.LocalTransport',
+    },
+    WHATSAPP_OTP_ENABLED=True,
+    EMAIL_OTP_FALLBACK=True,
+    OTP_DELIVERY_MAX_ATTEMPTS=3,
+    OTP_DELIVERY_RETRY_DELAY=0,
+    OTP_RATE_LIMIT_COUNT=3,
+)
+class OTPDeliveryTests(TransactionTestCase):
+    """
+    Queued OTPs are delivered in the background, retried, fall back to email and are rate limited.
+    The delivery worker has its own thread and connection, so rows must be committed.
+    """
+
+    def setUp(self):
+        cache.clear()
+        LocalTransport.reset()
+        OTPDeliveryService.reset_transports()
+        self.farmer = User.objects.create_user(
+            username='farmer', email='farmer@example.com', password=None, phone_number='+919800000001',
+        )
+
+    def tearDown(self):
+        OTPDeliveryService.wait_until_idle(timeout=5)
+        LocalTransport.reset()
+        OTPDeliveryService.reset_transports()
+
+    def _deliver(self, user, code='123456'):
+        channel = OTPDeliveryService.enqueue(user, code)
+        self.assertTrue(OTPDeliveryService.wait_until_idle(timeout=5))
+        return channel
+
+    def test_otp_is_delivered_on_the_first_channel(self):
+        self.assertEqual(self._deliver(self.farmer), 'whatsapp')
+
+        self.assertEqual(len(LocalTransport.outbox), 1)
+        self.assertEqual(LocalTransport.outbox[0]['recipient'], '+919800000001')
+        self.assertEqual(LocalTransport.outbox[0]['otp'], '123456')
+
+    def test_failed_sends_are_retried_on_the_same_channel(self):
+        LocalTransport.fail_next = 2
+
+        self._deliver(self.farmer)
+
+        self.assertEqual([message['recipient'] for message in LocalTransport.outbox], ['+919800000001'])
+        self.farmer.refresh_from_db()
+        self.assertIsNone(self.farmer.otp_delivery_method)
+
+    def test_exhausted_retries_fall_back_to_email(self):
+        LocalTransport.fail_next = 3
+
+        self._deliver(self.farmer)
+
+        self.assertEqual([message['recipient'] for message in LocalTransport.outbox], ['farmer@example.com'])
+        self.farmer.refresh_from_db()
+        self.assertEqual(self.farmer.otp_delivery_method, 'email')
+
+    def test_each_recipient_is_rate_limited(self):
+        other_farmer = User.objects.create_user(
+            username='other_farmer', email='other_farmer@example.com', password=None,
+            phone_number='+919800000002',
+        )
+
+        channels = [self._deliver(self.farmer) for _ in range(4)]
+
+        self.assertEqual(channels, ['whatsapp', 'whatsapp', 'whatsapp', None])
+        self.assertEqual(len(LocalTransport.outbox), 3)
+        self.assertEqual(self._deliver(other_farmer), 'whatsapp')
+
+
+class EmailUniquenessTests(TestCase):
+    """Emails are unique ignoring case, like login"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ram', email='Ram@Example.com', password='test-pass-123')
+
+    def test_conflicts_ignore_email_case(self):
+        conflicts = UserUniquenessService.find_conflicts([
+            {'username': 'shyam', 'email': 'ram@example.com'},
+            {'username': 'mohan', 'email': 'mohan@example.com'},
+            {'username': 'Ram', 'email': 'MOHAN@example.com'},
+        ])
+        self.assertEqual(conflicts, {0: {'email': None}, 2: {'email': 1}})
+
+    def test_constraint_rejects_a_case_variant(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user(username='shyam', email='RAM@example.com', password='test-pass-123')
+        # Users without an email do not conflict
+        User.objects.create_user(username='mohan', email='', password='test-pass-123')
+        User.objects.create_user(username='sita', email='', password='test-pass-123')
+
+    def test_login_lookup_ignores_case(self):
+        self.assertEqual(User.find_by_email(' ram@EXAMPLE.com '), self.user)
+        self.assertIsNone(User.find_by_email(''))
+
+
+class IdempotencyTests(APITestCase):
+    """Idempotency-Key replays the first successful response and lets failed requests run again"""
+
+    def setUp(self):
+        cache.clear()
+        manager_role = Role.objects.create(name='manager', display_name='Manager')
+        self.fieldofficer_role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='test-pass-123', role=manager_role,
+        )
+        self.client.force_authenticate(self.manager)
+
+    def _body(self, username='officer'):
+        return json.dumps({
+            'username': username, 'email': f'{username}@example.com', 'password': 'officer-pass-123',
+            'first_name': 'Field', 'last_name': 'Officer', 'role_id': self.fieldofficer_role.pk,
+        }).encode()
+
+    def _create(self, body, idempotency_key='key-1'):
+        return self.client.post(
+            '/api/users/', data=body, content_type='application/json', HTTP_IDEMPOTENCY_KEY=idempotency_key,
+        )
+
+    def _key(self, idempotency_key='key-1'):
+        return IdempotencyService.make_key(('UserViewSet', 'create', [], self.manager.pk), idempotency_key)
+
+    def test_retry_replays_the_first_response(self):
+        first = self._create(self._body())
+        retry = self._create(self._body())
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.data), (201, first.data))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertNotIn('Idempotent-Replayed', first)
+        self.assertEqual(User.objects.filter(username='officer').count(), 1)
+
+    def test_key_reused_with_another_body_is_rejected(self):
+        self._create(self._body())
+
+        self.assertEqual(self._create(self._body('other_officer')).status_code, 422)
+        self.assertEqual(self._create(self._body('other_officer'), 'key-2').status_code, 201)
+
+    def test_failed_request_runs_again(self):
+        User.objects.create_user(username='officer', email='taken@example.com', password='test-pass-123')
+        self.assertEqual(self._create(self._body()).status_code, 400)
+
+        User.objects.filter(username='officer').delete()
+        retry = self._create(self._body())
+        self.assertEqual(retry.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', retry)
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0)
+    def test_request_still_running_is_a_conflict(self):
+        body = self._body()
+        IdempotencyService.acquire(self._key(), hashlib.sha256(body).hexdigest())
+
+        self.assertEqual(self._create(body).status_code, 409)
+        self.assertFalse(User.objects.filter(username='officer').exists())
+
+    def test_waiting_retry_gets_the_completed_response(self):
+        self.assertIsNone(IdempotencyService.acquire('idempotency:test', 'fingerprint'))
+        with self.assertRaises(IdempotencyKeyInProgress):
+            IdempotencyService.acquire('idempotency:test', 'fingerprint', wait_timeout=0)
+        with self.assertRaises(IdempotencyKeyReused):
+            IdempotencyService.acquire('idempotency:test', 'other fingerprint', wait_timeout=0)
+
+        timer = threading.Timer(
+            0.3, IdempotencyService.complete, args=('idempotency:test', 'fingerprint', 201, {'id': 1})
+        )
+        timer.start()
+        try:
+            record = IdempotencyService.acquire('idempotency:test', 'fingerprint', wait_timeout=5)
+        finally:
+            timer.join()
+        self.assertEqual((record['status'], record['data']), (201, {'id': 1}))
+
+        IdempotencyService.release('idempotency:test')
+        self.assertIsNone(IdempotencyService.acquire('idempotency:test', 'fingerprint'))
+
+
+class AuthUserCacheTests(TestCase):
+    """Authenticated users are cached without credentials and dropped when they or their role change"""
+
+    def setUp(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        cache.clear()
+        self.farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        self.user = User.objects.create_user(
+            username='farmer', email='farmer@example.com', password='test-pass-123', role=self.farmer_role,
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.authentication = RoleAwareJWTAuthentication()
+
+    def _authenticate(self):
+        return self.authentication.get_user(self.token)
+
+    def test_cached_user_has_no_credentials(self):
+        self.user.otp = '123456'
+        self.user.save(update_fields=['otp'])
+        self._authenticate()
+
+        entry = repr(cache.get(AuthUserCacheService.KEY.format(user_id=self.user.pk)))
+        self.assertNotIn(self.user.password, entry)
+        self.assertNotIn('123456', entry)
+
+        with self.assertNumQueries(0):
+            user = self._authenticate()
+            self.assertEqual((user.pk, user.role_name), (self.user.pk, 'farmer'))
+        # Left out of the cache, loaded when used
+        self.assertTrue(user.check_password('test-pass-123'))
+        user.first_name = 'Renamed'
+        user.save()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('test-pass-123'))
+
+    def test_deactivation_takes_effect_immediately(self):
+        from rest_framework_simplejwt.exceptions import AuthenticationFailed
+        self._authenticate()
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate()
+
+    def test_role_changes_take_effect_immediately(self):
+        self._authenticate()
+
+        self.user.role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        self.user.save()
+        self.assertEqual(self._authenticate().role_name, 'fieldofficer')
+
+        self.user.role.display_name = 'Officer'
+        self.user.role.save()
+        self.assertEqual(self._authenticate().role.display_name, 'Officer')
+
+
+class HierarchyQueryBudgetTests(APITestCase):
+    """The manager and owner hierarchy views run a fixed number of queries however large the hierarchy"""
+
+    def setUp(self):
+        owner_role = Role.objects.create(name='owner', display_name='Owner')
+        manager_role = Role.objects.create(name='manager', display_name='Manager')
+        self.fieldofficer_role = Role.objects.create(name='fieldofficer', display_name='Field Officer')
+        self.farmer_role = Role.objects.create(name='farmer', display_name='Farmer')
+        self.crop_type = CropType.objects.create(crop_type='Sugarcane')
+        self.owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='test-pass-123', role=owner_role,
+        )
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', password='test-pass-123', role=manager_role,
+            created_by=self.owner,
+        )
+
+    def _create_officers(self, count, start=0):
+        for i in range(start, start + count):
+            officer = User.objects.create_user(
+                username=f'officer{i}', email=f'officer{i}@example.com', password='test-pass-123',
+                role=self.fieldofficer_role, created_by=self.manager,
+            )
+            for j in range(2):
+                farmer = User.objects.create_user(
+                    username=f'farmer{i}_{j}', email=f'farmer{i}_{j}@example.com', password='test-pass-123',
+                    role=self.farmer_role, created_by=officer,
+                )
+                plot = Plot(gat_number=f'GAT{i}_{j}', village='Village', farmer=farmer, created_by=officer)
+                plot._skip_fastapi_sync = True
+                plot.save()
+                Farm.objects.create(
+                    farm_owner=farmer, created_by=officer, plot=plot, address='Farm address', area_size='1.00',
+                    crop_type=self.crop_type,
+                )
+
+    def _count_queries(self, user, url):
+        cache.clear()
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries.captured_queries), response
+
+    def _assert_fixed_query_count(self, user, url):
+        self._create_officers(1)
+        small_count, _ = self._count_queries(user, url)
+
+        self._create_officers(4, start=1)
+        large_count, response = self._count_queries(user, url)
+        self.assertEqual(small_count, large_count)
+        return response
+
+    def test_manager_view(self):
+        response = self._assert_fixed_query_count(self.manager, '/api/users/my-field-officers/')
+
+        self.assertEqual(response.data['summary']['total_field_officers'], 5)
+        self.assertEqual(sum(len(officer['farmers']) for officer in response.data['field_officers']), 10)
+
+    def test_owner_hierarchy(self):
+        response = self._assert_fixed_query_count(self.owner, '/api/users/owner-hierarchy/')
+
+        officers = response.data['managers'][0]['field_officers']
+        self.assertEqual(len(officers), 5)
+        self.assertEqual(sum(len(officer['farmers']) for officer in officers), 10)
+        self.assertEqual(officers[0]['farmers'][0]['plots'][0]['farms'][0]['crop_type'], 'Sugarcane')
@@ -0,0 +1,85 @@
+from collections import defaultdict
+from typing import Dict, Optional, Sequence
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.functions import Upper
+
+User = get_user_model()
+
+
+class UserUniquenessService:
+    """
+    Checks the usernames and emails of users about to be created, as a set.
+
+    One IN query per field covers a whole registration or import, and every
+    conflict is reported at once instead of stopping at the first. Checking
+    first cannot stop a concurrent request taking a name in between; the
+    unique constraints on username and email reject that insert.
+
+    Emails are compared ignoring case, like login and the user_email_unique
+    constraint (on UPPER(email)); usernames are case-sensitive.
+    """
+
+    FIELDS = (('username', 'Username'), ('email', 'Email'))
+    CASE_INSENSITIVE_FIELDS = ('email',)
+
+    @staticmethod
+    def find_conflicts(users: Sequence[dict]) -> Dict[int, Dict[str, Optional[int]]]:
+        """
+        Find usernames and emails that are taken or repeated.
+
+        Args:
+            users: User data dicts (with 'username' and/or 'email')
+
+        Returns:
+            dict: {index: {field: None if taken in the database, else the index of the earlier entry repeating it}}
+        """
+        key = UserUniquenessService._key
+        taken = {}
+        for field, _ in UserUniquenessService.FIELDS:
+            column = Upper(field) if field in UserUniquenessService.CASE_INSENSITIVE_FIELDS else F(field)
+            taken[field] = set(
+                User.objects.exclude(**{field: ''}).annotate(key=column)
+                .filter(key__in={key(field, data.get(field)) for data in users if data.get(field)})
+                .values_list('key', flat=True)
+            )
+
+        conflicts = defaultdict(dict)
+        first_seen = {field: {} for field, _ in UserUniquenessService.FIELDS}
+        for index, data in enumerate(users):
+            for field, _ in UserUniquenessService.FIELDS:
+                value = data.get(field)
+                if not value:
+                    continue
+                value = key(field, value)
+                if value in taken[field]:
+                    conflicts[index][field] = None
+                elif value in first_seen[field]:
+                    conflicts[index][field] = first_seen[field][value]
+                first_seen[field].setdefault(value, index)
+        return dict(conflicts)
+
+    @staticmethod
+    def _key(field: str, value: str) -> str:
+        """The value as the database compares it (upper-cased for emails, like UPPER(email))"""
+        return value.upper() if field in UserUniquenessService.CASE_INSENSITIVE_FIELDS else value
+
+    @staticmethod
+    def describe(field: str, value: str, earlier_index: Optional[int], entry_label: str = 'entry') -> str:
+        """
+        Message for one conflict from find_conflicts.
+
+        Args:
+            field: 'username' or 'email'
+            value: The conflicting value
+            earlier_index: None (taken) or the index of the earlier entry
+            entry_label: What entries are called in the message ('entry', 'row', ...)
+
+        Returns:
+            str: e.g. "Username 'ram' already exists"
+        """
+        label = dict(UserUniquenessService.FIELDS)[field]
+        if earlier_index is None:
+            return f"{label} '{value}' already exists"
+        return f"{label} '{value}' repeats {entry_label} {earlier_index + 1}"
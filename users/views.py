@@ -1,12 +1,14 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
 import random
+import secrets
 import string
 from .models import Role
 from .serializers import (
@@ -18,13 +20,38 @@ from .serializers import (
     ManagerHierarchySerializer
 )
 from .permissions import IsManager, IsOwner
+from farm_management.mixins import IdempotentPostMixin, ResponseCacheMixin, RoleScopedQuerysetMixin
+from farm_management.pagination import SelectablePagination
+from farm_management.serializers import setup_eager_loading
+from .hierarchy_service import UserHierarchyService
+from .hierarchy_cache_service import HierarchyCacheService
+from .stats_service import UserStatsService
 
 User = get_user_model()
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(IdempotentPostMixin, ResponseCacheMixin, RoleScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
+    # Users, their hierarchy and the plot/farm summaries shown with them
+    version_models = ('users.User', 'users.Role', 'farms.Plot', 'farms.Farm', 'farms.FarmIrrigation', 'farms.CropType')
+    response_cache_actions = ('list', 'retrieve', 'contact_details', 'hierarchy_summary', 'me')
+    # Creating users (and lists of users) is the expensive, retried POST
+    idempotent_actions = ('create',)
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Set per action (send-otp, verify-otp) for ScopedRateThrottle
+    throttle_scope = None
+    pagination_class = SelectablePagination
+    keyset_ordering = ('-date_joined', '-id')
+    # Super Admin can see all users
+    unscoped_roles = ('admin',)
+    role_scopes = {
+        # Manager sees agronomists, quality control, field officers, farmers
+        'manager': lambda qs, user: qs.filter(role__name__in=['agronomist', 'qualitycontrol', 'fieldofficer', 'farmer']),
+        # Owner can monitor all managers and their subordinates
+        'owner': lambda qs, user: qs.filter(role__name__in=['manager', 'fieldofficer', 'farmer']),
+        # Default: only own record
+        '*': lambda qs, user: qs.filter(id=user.id),
+    }
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -39,6 +66,9 @@ class UserViewSet(viewsets.ModelViewSet):
         - Owner can monitor the manager who created them
         - Owner gets elevated permissions to view all managers
         """
+        if isinstance(request.data, list):
+            return self._create_many(request)
+
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
@@ -77,6 +107,18 @@ class UserViewSet(viewsets.ModelViewSet):
             headers = self.get_success_headers(serializer.data)
             return Response(serializer.data, status=201, headers=headers)
     
+    def _create_many(self, request):
+        """
+        Create a list of users (an import) in one request.
+
+        Passwords are hashed in parallel across cores before the users are
+        inserted; owners in the list are created like any other user.
+        """
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=201)
+
     def get_permissions(self):
         if self.action == 'create':
             return [IsManager()]
@@ -89,21 +131,8 @@ class UserViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
     
     def get_queryset(self):
-        user = self.request.user
-        # Super Admin can see all users
-        if user.is_superuser or user.has_role('admin'):
-            return User.objects.all()
-        # Manager sees agronomists, quality control, field officers, farmers
-        if user.has_role('manager'):
-            return User.objects.filter(role__name__in=['agronomist', 'qualitycontrol', 'fieldofficer', 'farmer'])
-        # Owner can see all managers (including the one who created them) and their hierarchy
-        if user.has_role('owner'):
-            # Special case: Owner can monitor all managers and their subordinates
-            return User.objects.filter(
-                role__name__in=['manager', 'fieldofficer', 'farmer']
-            )
-        # Default: only own record
-        return User.objects.filter(id=user.id)
+        queryset = setup_eager_loading(self.get_serializer_class(), User.objects.select_related('role'), self.request)
+        return self.scope_queryset(queryset)
     
     @action(detail=False, methods=['get'], url_path='my-field-officers')
     def my_field_officers(self, request):
@@ -115,42 +144,48 @@ class UserViewSet(viewsets.ModelViewSet):
         user = request.user
 
         if user.has_role('manager'):
-            # Manager's view: their own field officers
-            field_officers = user.created_users.filter(role__name='fieldofficer')
-            
-            total_farmers = 0
-            total_plots = 0
-            for fo in field_officers:
-                farmers_under_fo = fo.created_users.filter(role__name='farmer')
-                total_farmers += farmers_under_fo.count()
-                for farmer in farmers_under_fo:
-                    total_plots += farmer.plots.count()
-
-            serializer = FieldOfficerWithFarmersSerializer(field_officers, many=True, context={'request': request})
-            
-            return Response({
-                "manager": {
-                    "id": user.id,
-                    "username": user.username,
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                },
-                "summary": {
-                    "total_field_officers": field_officers.count(),
-                    "total_farmers": total_farmers,
-                    "total_plots": total_plots,
-                },
-                "field_officers": serializer.data
-            })
+            def build_manager_view():
+                from farms.models import Plot
+
+                # Manager's view: their own field officers, with their farmers and plots loaded level by level
+                field_officers = list(FieldOfficerWithFarmersSerializer.setup_queryset(
+                    user.created_users.filter(role__name='fieldofficer')
+                ))
+
+                # Totals cover every farmer below this manager in the hierarchy
+                farmers = UserHierarchyService.get_descendants(user, 'farmer')
+                total_plots = Plot.objects.filter(farmer__in=farmers).count()
+
+                serializer = FieldOfficerWithFarmersSerializer(field_officers, many=True, context={'request': request})
+
+                return {
+                    "manager": {
+                        "id": user.id,
+                        "username": user.username,
+                        "first_name": user.first_name,
+                        "last_name": user.last_name,
+                    },
+                    "summary": {
+                        "total_field_officers": len(field_officers),
+                        "total_farmers": HierarchyCacheService.get_count('farmer', user.id),
+                        "total_plots": total_plots,
+                    },
+                    "field_officers": serializer.data
+                }
+
+            return Response(HierarchyCacheService.get_snapshot('manager', user.id, build_manager_view))
 
         elif user.has_role('owner'):
-            # Owner's view: all managers and their hierarchies
-            managers = User.objects.filter(role__name='manager')
-            serializer = ManagerHierarchySerializer(managers, many=True)
-            return Response({
-                "owner_view": True,
-                "managers": serializer.data
-            })
+            def build_owner_view():
+                # Owner's view: all managers and their hierarchies
+                managers = ManagerHierarchySerializer.setup_queryset(User.objects.filter(role__name='manager'))
+                serializer = ManagerHierarchySerializer(managers, many=True)
+                return {
+                    "owner_view": True,
+                    "managers": serializer.data
+                }
+
+            return Response(HierarchyCacheService.get_snapshot('owner_managers', None, build_owner_view))
 
         else:
             return Response({"error": "You do not have permission to access this endpoint."}, status=status.HTTP_403_FORBIDDEN)
@@ -168,9 +203,10 @@ class UserViewSet(viewsets.ModelViewSet):
         # Get the current owner user
         owner = request.user
         
-        # Serialize the owner with complete hierarchy
-        serializer = OwnerHierarchySerializer(owner)
-        return Response(serializer.data)
+        # Serialize the owner with complete hierarchy (cached until anything in it changes)
+        return Response(HierarchyCacheService.get_snapshot(
+            'owner', owner.id, lambda: OwnerHierarchySerializer(owner).data
+        ))
     
     @action(detail=False, methods=['get'], url_path='my-creator')
     def my_creator(self, request):
@@ -206,6 +242,14 @@ class UserViewSet(viewsets.ModelViewSet):
                 'error': 'Only owners can access this endpoint'
             }, status=403)
     
+    # Subordinate roles each contact-details scope can list, with the
+    # contacts key and label used for them
+    CONTACT_ROLES = {
+        'manager': ('managers', 'Manager'),
+        'fieldofficer': ('field_officers', 'Field Officer'),
+        'farmer': ('farmers', 'Farmer'),
+    }
+
     @action(detail=False, methods=['get'], url_path='contact-details')
     def contact_details(self, request):
         """
@@ -214,6 +258,11 @@ class UserViewSet(viewsets.ModelViewSet):
         - Manager: Shows owner, field officers, and farmers contact details
         - Field Officer: Shows manager, owner, and farmers contact details  
         - Farmer: Shows field officer, manager, and owner contact details
+        - Owner: Shows managers, field officers and farmers contact details
+
+        Subordinate lists are cursor paginated (?cursor=...&page_size=100)
+        and can be narrowed with ?role=farmer|fieldofficer|manager and a
+        name/username/phone prefix search (?search=...).
         """
         user = request.user
         
@@ -229,233 +278,179 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({
                 'error': 'Invalid user role for contact details'
             }, status=403)
+
+    @staticmethod
+    def _contact_queryset(queryset):
+        """Select only what a contact row needs, with the address built in SQL"""
+        from django.db.models import CharField, Func, Value
+        from django.db.models.functions import NullIf
+
+        address_parts = [NullIf(field, Value('')) for field in ('address', 'village', 'district', 'state')]
+        return queryset.select_related('role', 'created_by').only(
+            'id', 'username', 'first_name', 'last_name', 'email', 'phone_number', 'date_joined',
+            'role__name', 'created_by__username'
+        ).annotate(
+            contact_address=Func(Value(', '), *address_parts, function='CONCAT_WS', output_field=CharField())
+        )
+
+    @staticmethod
+    def _contact_row(contact, role_label, **extra):
+        """Serialize one annotated contact"""
+        return {
+            'id': contact.id,
+            'name': f"{contact.first_name} {contact.last_name}".strip() or contact.username,
+            'role': role_label,
+            'email': contact.email,
+            'phone': contact.phone_number,
+            'address': contact.contact_address,
+            **extra
+        }
+
+    def _get_single_contact(self, queryset, role_label):
+        """First contact of a small upward list (owner, manager, field officer)"""
+        contact = self._contact_queryset(queryset).first()
+        return self._contact_row(contact, role_label) if contact else None
+
+    def _paginate_contacts(self, request, scope, allowed_roles):
+        """
+        Cursor-paginated subordinate contacts, grouped under their contacts keys.
+
+        Args:
+            request: Current request (role, search, cursor and page_size params)
+            scope: User queryset the caller is allowed to see
+            allowed_roles: Role names listed in this scope
+
+        Returns:
+            tuple: (contacts dict, summary dict, pagination dict) or an error Response
+        """
+        from django.db.models import Count, Q
+        from farm_management.pagination import StandardCursorPagination
+
+        roles = list(allowed_roles)
+        if role := request.query_params.get('role'):
+            if role not in allowed_roles:
+                return Response({
+                    'error': f"role must be one of: {', '.join(allowed_roles)}"
+                }, status=400)
+            roles = [role]
+        scope = scope.filter(role__name__in=roles)
+
+        if search := request.query_params.get('search', '').strip():
+            # Prefix matches, served by the upper()/pattern_ops indexes on User
+            scope = scope.filter(
+                Q(username__istartswith=search)
+                | Q(first_name__istartswith=search)
+                | Q(last_name__istartswith=search)
+                | Q(phone_number__startswith=search)
+            )
+
+        summary = scope.aggregate(**{
+            f"total_{self.CONTACT_ROLES[role_name][0]}": Count('id', filter=Q(role__name=role_name))
+            for role_name in roles
+        })
+
+        # Subordinate counts are the maintained UserStats columns, joined by primary key
+        contacts_qs = self._contact_queryset(scope).select_related('stats').only(
+            'id', 'username', 'first_name', 'last_name', 'email', 'phone_number', 'date_joined',
+            'role__name', 'created_by__username',
+            'stats__field_officers_count', 'stats__descendant_farmers_count'
+        )
+
+        paginator = StandardCursorPagination()
+        page = paginator.paginate_queryset(contacts_qs, request, view=self)
+
+        contacts = {self.CONTACT_ROLES[role_name][0]: [] for role_name in roles}
+        for contact in page:
+            key, label = self.CONTACT_ROLES[contact.role.name]
+            creator = contact.created_by.username if contact.created_by else None
+            if contact.role.name == 'manager':
+                extra = {'field_officers_count': UserStatsService.for_user(contact).field_officers_count}
+            elif contact.role.name == 'fieldofficer':
+                extra = {'manager': creator, 'farmers_count': UserStatsService.for_user(contact).descendant_farmers_count}
+            else:
+                extra = {'field_officer': creator}
+            contacts[key].append(self._contact_row(contact, label, **extra))
+
+        return contacts, summary, paginator.get_page_metadata()
     
     def _get_manager_contacts(self, manager):
         """Get contact details for manager"""
-        # Get owner (if manager was created by owner, or any owner in system)
-        owners = User.objects.filter(role__name='owner')
-        owner_contact = None
-        if owners.exists():
-            owner = owners.first()
-            owner_contact = {
-                'id': owner.id,
-                'name': f"{owner.first_name} {owner.last_name}".strip() or owner.username,
-                'role': 'Owner',
-                'email': owner.email,
-                'phone': owner.phone_number,
-                'address': f"{owner.address}, {owner.village}, {owner.district}, {owner.state}".replace(', , ', ', ').strip(', ')
-            }
-        
-        # Get field officers created by this manager
-        field_officers = manager.created_users.filter(role__name='fieldofficer')
-        field_officer_contacts = []
-        for fo in field_officers:
-            field_officer_contacts.append({
-                'id': fo.id,
-                'name': f"{fo.first_name} {fo.last_name}".strip() or fo.username,
-                'role': 'Field Officer',
-                'email': fo.email,
-                'phone': fo.phone_number,
-                'address': f"{fo.address}, {fo.village}, {fo.district}, {fo.state}".replace(', , ', ', ').strip(', '),
-                'farmers_count': fo.created_users.filter(role__name='farmer').count()
-            })
-        
-        # Get farmers created by field officers under this manager
-        farmers = User.objects.filter(
-            role__name='farmer',
-            created_by__in=field_officers
+        result = self._paginate_contacts(
+            self.request, UserHierarchyService.get_descendants(manager), ['fieldofficer', 'farmer']
         )
-        farmer_contacts = []
-        for farmer in farmers:
-            farmer_contacts.append({
-                'id': farmer.id,
-                'name': f"{farmer.first_name} {farmer.last_name}".strip() or farmer.username,
-                'role': 'Farmer',
-                'email': farmer.email,
-                'phone': farmer.phone_number,
-                'address': f"{farmer.address}, {farmer.village}, {farmer.district}, {farmer.state}".replace(', , ', ', ').strip(', '),
-                'field_officer': farmer.created_by.username if farmer.created_by else None
-            })
-        
+        if isinstance(result, Response):
+            return result
+        contacts, summary, pagination = result
+
         return Response({
             'user_role': 'Manager',
             'user_name': f"{manager.first_name} {manager.last_name}".strip() or manager.username,
             'contacts': {
-                'owner': owner_contact,
-                'field_officers': field_officer_contacts,
-                'farmers': farmer_contacts
+                # Get owner (if manager was created by owner, or any owner in system)
+                'owner': self._get_single_contact(User.objects.filter(role__name='owner'), 'Owner'),
+                **contacts
             },
-            'summary': {
-                'total_field_officers': len(field_officer_contacts),
-                'total_farmers': len(farmer_contacts)
-            }
+            'summary': summary,
+            'pagination': pagination
         })
     
     def _get_field_officer_contacts(self, field_officer):
         """Get contact details for field officer"""
-        # Get manager who created this field officer
-        manager_contact = None
-        if field_officer.created_by and field_officer.created_by.has_role('manager'):
-            manager = field_officer.created_by
-            manager_contact = {
-                'id': manager.id,
-                'name': f"{manager.first_name} {manager.last_name}".strip() or manager.username,
-                'role': 'Manager',
-                'email': manager.email,
-                'phone': manager.phone_number,
-                'address': f"{manager.address}, {manager.village}, {manager.district}, {manager.state}".replace(', , ', ', ').strip(', ')
-            }
-        
-        # Get owner (any owner in system)
-        owners = User.objects.filter(role__name='owner')
-        owner_contact = None
-        if owners.exists():
-            owner = owners.first()
-            owner_contact = {
-                'id': owner.id,
-                'name': f"{owner.first_name} {owner.last_name}".strip() or owner.username,
-                'role': 'Owner',
-                'email': owner.email,
-                'phone': owner.phone_number,
-                'address': f"{owner.address}, {owner.village}, {owner.district}, {owner.state}".replace(', , ', ', ').strip(', ')
-            }
-        
-        # Get farmers created by this field officer
-        farmers = field_officer.created_users.filter(role__name='farmer')
-        farmer_contacts = []
-        for farmer in farmers:
-            farmer_contacts.append({
-                'id': farmer.id,
-                'name': f"{farmer.first_name} {farmer.last_name}".strip() or farmer.username,
-                'role': 'Farmer',
-                'email': farmer.email,
-                'phone': farmer.phone_number,
-                'address': f"{farmer.address}, {farmer.village}, {farmer.district}, {farmer.state}".replace(', , ', ', ').strip(', ')
-            })
-        
+        result = self._paginate_contacts(
+            self.request, UserHierarchyService.get_descendants(field_officer), ['farmer']
+        )
+        if isinstance(result, Response):
+            return result
+        contacts, summary, pagination = result
+
         return Response({
             'user_role': 'Field Officer',
             'user_name': f"{field_officer.first_name} {field_officer.last_name}".strip() or field_officer.username,
             'contacts': {
-                'manager': manager_contact,
-                'owner': owner_contact,
-                'farmers': farmer_contacts
+                # Manager who created this field officer
+                'manager': self._get_single_contact(
+                    User.objects.filter(pk=field_officer.created_by_id, role__name='manager'), 'Manager'
+                ),
+                'owner': self._get_single_contact(User.objects.filter(role__name='owner'), 'Owner'),
+                **contacts
             },
-            'summary': {
-                'total_farmers': len(farmer_contacts)
-            }
+            'summary': summary,
+            'pagination': pagination
         })
     
     def _get_farmer_contacts(self, farmer):
         """Get contact details for farmer"""
-        # Get field officer who created this farmer
-        field_officer_contact = None
-        if farmer.created_by and farmer.created_by.has_role('fieldofficer'):
-            fo = farmer.created_by
-            field_officer_contact = {
-                'id': fo.id,
-                'name': f"{fo.first_name} {fo.last_name}".strip() or fo.username,
-                'role': 'Field Officer',
-                'email': fo.email,
-                'phone': fo.phone_number,
-                'address': f"{fo.address}, {fo.village}, {fo.district}, {fo.state}".replace(', , ', ', ').strip(', ')
-            }
-        
-        # Get manager (through field officer)
-        manager_contact = None
-        if farmer.created_by and farmer.created_by.created_by and farmer.created_by.created_by.has_role('manager'):
-            manager = farmer.created_by.created_by
-            manager_contact = {
-                'id': manager.id,
-                'name': f"{manager.first_name} {manager.last_name}".strip() or manager.username,
-                'role': 'Manager',
-                'email': manager.email,
-                'phone': manager.phone_number,
-                'address': f"{manager.address}, {manager.village}, {manager.district}, {manager.state}".replace(', , ', ', ').strip(', ')
-            }
-        
-        # Get owner (any owner in system)
-        owners = User.objects.filter(role__name='owner')
-        owner_contact = None
-        if owners.exists():
-            owner = owners.first()
-            owner_contact = {
-                'id': owner.id,
-                'name': f"{owner.first_name} {owner.last_name}".strip() or owner.username,
-                'role': 'Owner',
-                'email': owner.email,
-                'phone': owner.phone_number,
-                'address': f"{owner.address}, {owner.village}, {owner.district}, {owner.state}".replace(', , ', ', ').strip(', ')
-            }
-        
+        # Field officer who created this farmer, and the manager above them
+        field_officer = User.objects.filter(pk=farmer.created_by_id, role__name='fieldofficer')
+        manager = User.objects.filter(
+            pk__in=field_officer.values('created_by_id'), role__name='manager'
+        )
+
         return Response({
             'user_role': 'Farmer',
             'user_name': f"{farmer.first_name} {farmer.last_name}".strip() or farmer.username,
             'contacts': {
-                'field_officer': field_officer_contact,
-                'manager': manager_contact,
-                'owner': owner_contact
+                'field_officer': self._get_single_contact(field_officer, 'Field Officer'),
+                'manager': self._get_single_contact(manager, 'Manager'),
+                'owner': self._get_single_contact(User.objects.filter(role__name='owner'), 'Owner')
             }
         })
     
     def _get_owner_contacts(self, owner):
         """Get contact details for owner"""
-        # Get all managers
-        managers = User.objects.filter(role__name='manager')
-        manager_contacts = []
-        for manager in managers:
-            manager_contacts.append({
-                'id': manager.id,
-                'name': f"{manager.first_name} {manager.last_name}".strip() or manager.username,
-                'role': 'Manager',
-                'email': manager.email,
-                'phone': manager.phone_number,
-                'address': f"{manager.address}, {manager.village}, {manager.district}, {manager.state}".replace(', , ', ', ').strip(', '),
-                'field_officers_count': manager.created_users.filter(role__name='fieldofficer').count()
-            })
-        
-        # Get all field officers
-        field_officers = User.objects.filter(role__name='fieldofficer')
-        field_officer_contacts = []
-        for fo in field_officers:
-            field_officer_contacts.append({
-                'id': fo.id,
-                'name': f"{fo.first_name} {fo.last_name}".strip() or fo.username,
-                'role': 'Field Officer',
-                'email': fo.email,
-                'phone': fo.phone_number,
-                'address': f"{fo.address}, {fo.village}, {fo.district}, {fo.state}".replace(', , ', ', ').strip(', '),
-                'manager': fo.created_by.username if fo.created_by else None,
-                'farmers_count': fo.created_users.filter(role__name='farmer').count()
-            })
-        
-        # Get all farmers
-        farmers = User.objects.filter(role__name='farmer')
-        farmer_contacts = []
-        for farmer in farmers:
-            farmer_contacts.append({
-                'id': farmer.id,
-                'name': f"{farmer.first_name} {farmer.last_name}".strip() or farmer.username,
-                'role': 'Farmer',
-                'email': farmer.email,
-                'phone': farmer.phone_number,
-                'address': f"{farmer.address}, {farmer.village}, {farmer.district}, {farmer.state}".replace(', , ', ', ').strip(', '),
-                'field_officer': farmer.created_by.username if farmer.created_by else None
-            })
-        
+        result = self._paginate_contacts(
+            self.request, User.objects.all(), ['manager', 'fieldofficer', 'farmer']
+        )
+        if isinstance(result, Response):
+            return result
+        contacts, summary, pagination = result
+
         return Response({
             'user_role': 'Owner',
             'user_name': f"{owner.first_name} {owner.last_name}".strip() or owner.username,
-            'contacts': {
-                'managers': manager_contacts,
-                'field_officers': field_officer_contacts,
-                'farmers': farmer_contacts
-            },
-            'summary': {
-                'total_managers': len(manager_contacts),
-                'total_field_officers': len(field_officer_contacts),
-                'total_farmers': len(farmer_contacts)
-            }
+            'contacts': contacts,
+            'summary': summary,
+            'pagination': pagination
         })
     
     @action(detail=False, methods=['get'], url_path='hierarchy-summary')
@@ -469,17 +464,15 @@ class UserViewSet(viewsets.ModelViewSet):
             # Owner sees summary of all levels
             summary = {
                 'role': 'owner',
-                'total_managers': User.objects.filter(role__name='manager').count(),
-                'total_field_officers': User.objects.filter(role__name='fieldofficer').count(),
-                'total_farmers': User.objects.filter(role__name='farmer').count(),
+                'total_managers': HierarchyCacheService.get_count('manager'),
+                'total_field_officers': HierarchyCacheService.get_count('fieldofficer'),
+                'total_farmers': HierarchyCacheService.get_count('farmer'),
                 'message': 'Use /owner-hierarchy/ for complete details'
             }
         elif user.has_role('manager'):
             # Manager sees their field officers and farmers
             field_officers = user.created_users.filter(role__name='fieldofficer')
-            total_farmers = 0
-            for fo in field_officers:
-                total_farmers += fo.created_users.filter(role__name='farmer').count()
+            total_farmers = HierarchyCacheService.get_count('farmer', user.id)
             
             summary = {
                 'role': 'manager',
@@ -523,7 +516,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
         try:
             # Find user by email
-            user = User.objects.filter(email=email).first()
+            user = User.find_by_email(email)
             if not user:
                 return Response({
                     'detail': 'Invalid email or password'
@@ -541,31 +534,183 @@ class UserViewSet(viewsets.ModelViewSet):
                     'detail': 'Account is deactivated'
                 }, status=status.HTTP_401_UNAUTHORIZED)
             
-            # Generate JWT tokens
-            from rest_framework_simplejwt.tokens import RefreshToken
-            refresh = RefreshToken.for_user(user)
+            return Response(self._login_response(user))
             
+        except Exception as e:
             return Response({
-                'access': str(refresh.access_token),
-                'refresh': str(refresh),
-                'user': {
-                    'id': user.id,
-                    'username': user.username,
-                    'email': user.email,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name,
-                    'role': {
-                        'id': user.role.id,
-                        'name': user.role.name,
-                        'display_name': user.role.display_name
-                    } if user.role else None
-                }
+                'detail': f'Login error: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def _login_response(self, user):
+        """JWT tokens and the user summary returned by the login endpoints"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        refresh = RefreshToken.for_user(user)
+
+        return {
+            'access': str(refresh.access_token),
+            'refresh': str(refresh),
+            'user': {
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'role': {
+                    'id': user.role.id,
+                    'name': user.role.name,
+                    'display_name': user.role.display_name
+                } if user.role else None
+            }
+        }
+
+    def _find_otp_farmer(self, request):
+        """
+        Active farmer without a usable password identified by phone_number or
+        email in the request, or None.
+
+        Only farmers registered without a password (FARMER_OTP_ONLY_REGISTRATION)
+        can log in with an OTP, and only until they set one; everyone else uses
+        their password.
+        """
+        from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+
+        phone_number = request.data.get('phone_number')
+        email = request.data.get('email')
+        if phone_number:
+            lookup = {'phone_number': phone_number}
+        elif email:
+            lookup = {'email__iexact': email.strip()}
+        else:
+            return None
+        return User.objects.select_related('role').filter(
+            **lookup, role__name='farmer', is_active=True, password__startswith=UNUSABLE_PASSWORD_PREFIX
+        ).first()
+
+    @action(detail=False, methods=['post'], url_path='send-otp',
+            throttle_classes=[ScopedRateThrottle], throttle_scope='otp_send')
+    def send_otp(self, request):
+        """
+        Send a login OTP to a farmer (WhatsApp, with email fallback).
+
+        The OTP is queued for background delivery and the response returns
+        right away; repeated requests for the same recipient are rate-limited,
+        and each client IP is throttled (otp_send rate).
+
+        Farmers registered without a password (FARMER_OTP_ONLY_REGISTRATION)
+        log in this way and then set a password with set-initial-password.
+        """
+        if not request.data.get('phone_number') and not request.data.get('email'):
+            return Response({
+                'detail': 'Phone number or email is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            from .otp_delivery import OTPDeliveryService
+
+            user = self._find_otp_farmer(request)
+            if user:
+                otp_code = ''.join(secrets.choice(string.digits) for _ in range(6))
+                # Sent in the background; None when rate-limited (the previous OTP stays valid)
+                method = OTPDeliveryService.enqueue(user, otp_code)
+                if method:
+                    user.otp = otp_code
+                    user.otp_created_at = timezone.now()
+                    user.otp_delivery_method = method
+                    user.otp_failed_attempts = 0
+                    user.save(update_fields=['otp', 'otp_created_at', 'otp_delivery_method', 'otp_failed_attempts'])
+
+            # For security, don't reveal if the account exists or not
+            return Response({
+                'detail': 'If the account exists, an OTP has been sent.'
             })
-            
+
+        except Exception as e:
+            return Response({
+                'detail': f'OTP error: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['post'], url_path='verify-otp',
+            throttle_classes=[ScopedRateThrottle], throttle_scope='otp_verify')
+    def verify_otp(self, request):
+        """
+        Log a farmer in with the OTP from send-otp.
+
+        Every attempt is counted against the OTP before the code is compared,
+        so concurrent guesses cannot exceed OTP_MAX_FAILED_ATTEMPTS; after that
+        the OTP is discarded and a new one must be requested. Client IPs are
+        also throttled (otp_verify rate).
+
+        password_setup_required tells the app to ask for a password
+        (set-initial-password) for farmers registered without one.
+        """
+        otp_code = request.data.get('otp')
+        if not otp_code:
+            return Response({
+                'detail': 'OTP is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            from django.db.models import F
+
+            user = self._find_otp_farmer(request)
+            invalid = Response({
+                'detail': 'Invalid or expired OTP'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+            if (
+                not user or not user.otp or not user.otp_created_at
+                or timezone.now() - user.otp_created_at > timedelta(minutes=settings.OTP_VALIDITY_MINUTES)
+            ):
+                return invalid
+
+            # Claim an attempt on this OTP; none left once the limit is reached
+            otp = User.objects.filter(pk=user.pk, otp=user.otp, otp_created_at=user.otp_created_at)
+            claimed = otp.filter(otp_failed_attempts__lt=settings.OTP_MAX_FAILED_ATTEMPTS).update(
+                otp_failed_attempts=F('otp_failed_attempts') + 1
+            )
+            if not claimed:
+                otp.update(otp=None, otp_created_at=None)
+                return invalid
+            if not secrets.compare_digest(user.otp, str(otp_code)):
+                otp.filter(otp_failed_attempts__gte=settings.OTP_MAX_FAILED_ATTEMPTS).update(otp=None, otp_created_at=None)
+                return invalid
+
+            # One use per OTP: only the request that clears it logs in
+            if not otp.update(otp=None, otp_created_at=None, otp_failed_attempts=0):
+                return invalid
+            user.otp = None
+            user.otp_created_at = None
+            user.otp_failed_attempts = 0
+            user.last_login = timezone.now()
+            user.save(update_fields=['last_login'])
+
+            response = self._login_response(user)
+            response['password_setup_required'] = not user.has_usable_password()
+            return Response(response)
+
         except Exception as e:
             return Response({
                 'detail': f'Login error: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['post'], url_path='set-initial-password')
+    def set_initial_password(self, request):
+        """Set the first password of a farmer registered without one (after an OTP login)"""
+        user = request.user
+        new_password = request.data.get('new_password')
+
+        if user.has_usable_password():
+            return Response({
+                'detail': 'Password is already set; use change_password'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if not new_password or len(new_password) < 8:
+            return Response({
+                'detail': 'Password must be at least 8 characters long'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        user.set_password(new_password)
+        user.save(update_fields=['password'])
+        return Response({'status': 'password set'})
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def change_password(self, request, pk=None):
@@ -588,7 +733,8 @@ class UserViewSet(viewsets.ModelViewSet):
         # Check if user is a farmer (role ID 1)
         if user.role and user.role.id == 1:  # farmer role
             from .serializers import FarmerDetailSerializer
-            serializer = FarmerDetailSerializer(user)
+            farmer = FarmerDetailSerializer.setup_queryset(User.objects.filter(pk=user.pk)).get()
+            serializer = FarmerDetailSerializer(farmer)
         else:
             # Use default serializer for non-farmers
             serializer = self.get_serializer(user)
@@ -2,7 +2,6 @@
 WhatsApp OTP Service for Farm Management Backend
 """
 
-from twilio.rest import Client
 from django.conf import settings
 from django.core.mail import send_mail
 import logging
@@ -13,6 +12,9 @@ class WhatsAppOTPService:
     """WhatsApp OTP sending service using Twilio"""
     
     def __init__(self):
+        # twilio is optional: only needed when WhatsApp OTPs are enabled
+        from twilio.rest import Client
+
         self.client = Client(
             settings.TWILIO_ACCOUNT_SID,
             settings.TWILIO_AUTH_TOKEN